@@ -0,0 +1,137 @@
+"""Advice shown when a player decides if they keep playing the turn.
+The odds of the next hand are exact, the win probabilities are estimated with Monte Carlo rollouts playing the rest of
+the game from a snapshot, until the time budget runs out or the confidence intervals of both choices separate.
+"""
+
+
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import odds
+import snapshot
+from bots import STRATEGIES
+from config import Rules
+from engine import Seat, TurnEngine
+from rng import StreamRandom
+
+
+BUDGET = 0.05  # Seconds spent on the rollouts of a decision
+MIN_ROLLOUTS = 32  # Rollouts of each choice before checking if they are apart
+Z_SCORE = 1.96  # Confidence of 95% that the best choice is right
+ROLLOUT_STRATEGY = STRATEGIES["steady"]  # Strategy of every player in the rollouts
+CACHE_SIZE = 4096
+
+
+@dataclass(frozen=True)
+class Advice:
+    """Odds of a decision, for the player whose turn is being played.
+
+    :param bust: Probability of losing the turn on the next hand.
+    :param brains: Expected change of the turn brains on the next hand, counting the brains lost on a bust.
+    :param win_continue: Estimated probability of winning the game by continuing.
+    :param win_stop: Estimated probability of winning the game by stopping.
+    :param rollouts: Number of games played to estimate the win probabilities.
+    """
+    bust: float
+    brains: float
+    win_continue: float
+    win_stop: float
+    rollouts: int
+
+
+_cache: OrderedDict[tuple, Advice] = OrderedDict()
+
+
+def canonical_state(turn: TurnEngine) -> tuple:
+    """Key of a decision, telling apart only what changes its odds, so the same position is found again.
+
+    :param turn: Turn deciding if the player keeps playing.
+    :return: Tuple of rules, turn state, turn player, scores in seat order and players of the round.
+    """
+    game = turn.game
+    return (game.rules, odds.turn_state(turn), turn.player.index, tuple(player.score for player in game.players),
+            tuple(player.index for player in game.round_players))
+
+
+def next_hand(turn: TurnEngine) -> tuple[float, float]:
+    """Exact odds of continuing for one more hand.
+
+    :param turn: Turn deciding if the player keeps playing.
+    :return: Bust probability and expected change of the turn brains.
+    """
+    rules = turn.game.rules
+    state = odds.turn_state(turn)
+    bust = brains = 0.0
+    for (rolled_brains, runs, shotguns), probability in odds.roll_distribution(state, rules):
+        if state.shotguns + shotguns >= rules.shots_limit:
+            bust += probability
+            brains -= probability * state.brains
+        else:
+            brains += probability * rolled_brains
+    return bust, brains
+
+
+def rollout(data: bytes, keep_playing: bool, seats: list[Seat], rng: StreamRandom, rules: Rules) -> int:
+    """Play the rest of a game from a snapshot, after the decision.
+
+    :param data: Snapshot of the game, taken while the player decides.
+    :param keep_playing: Decision of the player.
+    :param seats: Seats of the players in seat order, reused by every rollout.
+    :param rng: Random generator of the rollout.
+    :param rules: Rules the game is played with.
+    :return: Seat of the winner.
+    """
+    game, turn = snapshot.load(data, seats, rng, rules)
+    turn.choose(keep_playing)
+    return game.play(turn).index
+
+
+def separated(wins: list[int], played: list[int]) -> bool:
+    """Check if the confidence interval of the difference of both win rates excludes zero.
+    A win and a loss are added to each choice, so choices always winning or losing still have some variance.
+
+    :param wins: Wins by continuing and by stopping.
+    :param played: Rollouts by continuing and by stopping.
+    :return: If one choice is better than the other.
+    """
+    rates = [(win + 1) / (amount + 2) for win, amount in zip(wins, played)]
+    error = math.sqrt(sum(rate * (1 - rate) / (amount + 2) for rate, amount in zip(rates, played)))
+    return abs(rates[0] - rates[1]) > Z_SCORE * error
+
+
+def advise(turn: TurnEngine, budget: float = BUDGET) -> Advice:
+    """Odds of continuing and stopping the turn, cached by the canonical state.
+
+    :param turn: Turn deciding if the player keeps playing, its players need a name.
+    :param budget: Seconds spent on the decision, working out the odds and playing the rollouts.
+    :return: Advice for the decision.
+    """
+    key = canonical_state(turn)
+    if key in _cache:
+        _cache.move_to_end(key)
+        return _cache[key]
+
+    deadline = time.perf_counter() + budget
+    # The exact odds are worked out on the first decisions reaching a hand, their time counts against the budget
+    bust, brains = next_hand(turn)
+    rules = turn.game.rules
+    data = snapshot.dump(turn.game, turn)
+    rng = StreamRandom()
+    seats = [Seat(ROLLOUT_STRATEGY) for _ in turn.game.players]
+    player = turn.player.index
+    wins = [0, 0]
+    played = [0, 0]
+    while True:
+        for choice, keep_playing in enumerate((True, False)):
+            wins[choice] += rollout(data, keep_playing, seats, rng, rules) == player
+            played[choice] += 1
+        if time.perf_counter() > deadline or (played[0] >= MIN_ROLLOUTS and separated(wins, played)):
+            break
+
+    advice = Advice(bust, brains, wins[0] / played[0], wins[1] / played[1], sum(played))
+    _cache[key] = advice
+    if len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+    return advice
@@ -0,0 +1,237 @@
+"""Batch turn simulator, plays many turns at once as NumPy arrays.
+Requires NumPy, the rest of the game does not depend on it.
+"""
+
+
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Callable, Union
+
+import numpy as np
+
+from config import BRAIN, RUN, SHOTGUN, DEFAULT_RULES, Rules
+from stats import SCORE, BUSTS, HANDS, RECYCLES, SimulationStats
+from strings import StatsStrings
+
+
+# Turns played at once when streaming them into statistics
+CHUNK_SIZE = 1_000_000
+
+
+# Columns of the side probabilities table
+SIDES = (BRAIN, RUN, SHOTGUN)
+
+# Decide which turns keep playing, receives the turn brains, shotguns and RUN dices in hand arrays
+BatchRule = Callable[[np.ndarray, np.ndarray, np.ndarray], np.ndarray]
+
+
+@dataclass
+class DiceTables:
+    """Dices configuration turned into arrays, one row per color.
+    """
+    colors: tuple
+    amounts: np.ndarray
+    probabilities: np.ndarray
+
+
+@dataclass
+class TurnOutcomes:
+    """Result of each simulated turn, one entry per turn.
+    """
+    score: np.ndarray
+    brains: np.ndarray
+    shotguns: np.ndarray
+    busted: np.ndarray
+    hands: np.ndarray
+    picked: np.ndarray
+    recycles: np.ndarray
+    elapsed: float
+
+    @property
+    def turns_per_second(self) -> float:
+        """Returns the simulation speed.
+
+        :return: Number of turns simulated per second.
+        """
+        return len(self.score) / self.elapsed if self.elapsed else float("inf")
+
+
+def dice_tables(rules: Rules = DEFAULT_RULES) -> DiceTables:
+    """Turn the dices configuration into amount and side probability arrays.
+
+    :param rules: Rules holding the dices configuration.
+    :return: Tables indexed by color.
+    """
+    colors = tuple(rules.dices)
+    amounts = np.array([rules.dices[color].amount for color in colors], dtype=np.int64)
+    probabilities = np.array([[rules.dices[color].sides.count(side) / len(rules.dices[color].sides)
+                               for side in SIDES] for color in colors])
+    return DiceTables(colors, amounts, probabilities)
+
+
+def threshold_rule(brains: int, shotguns: int) -> BatchRule:
+    """Create a rule that keeps playing while below both thresholds.
+
+    :param brains: Amount of turn brains to stop at.
+    :param shotguns: Amount of turn shotguns to stop at.
+    :return: Batch rule.
+    """
+    def rule(turn_brains: np.ndarray, turn_shotguns: np.ndarray, hand_runs: np.ndarray) -> np.ndarray:
+        return (turn_brains < brains) & (turn_shotguns < shotguns)
+    return rule
+
+
+def pick_dices(rng: np.random.Generator, pool: np.ndarray, hand: np.ndarray, need: np.ndarray) -> None:
+    """Get dices from the pool to the hand, one at a time without replacement, changing the arrays in place.
+
+    :param rng: Random generator.
+    :param pool: Dices per color in the pool, one row per turn.
+    :param hand: Dices per color in hand, one row per turn.
+    :param need: Amount of dices each turn picks, at most the dices in its pool.
+    """
+    for pick in range(int(need.max(initial=0))):
+        drawing = need > pick
+        cumulative = pool.cumsum(axis=1)
+        target = rng.random(len(pool)) * cumulative[:, -1]
+        color = (target[:, None] < cumulative).argmax(axis=1)
+        rows = np.flatnonzero(drawing)
+        pool[rows, color[rows]] -= 1
+        hand[rows, color[rows]] += 1
+
+
+def roll_hand(rng: np.random.Generator, tables: DiceTables, hand: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Roll every dice in hand, RUN dices stay in hand to be re-rolled, changing the hand in place.
+
+    :param rng: Random generator.
+    :param tables: Dices tables.
+    :param hand: Dices per color in hand, one row per turn.
+    :return: BRAIN dices rolled per color and SHOTGUN dices rolled, one row per turn.
+    """
+    rolled_brains = np.zeros_like(hand)
+    rolled_shotguns = np.zeros(len(hand), dtype=np.int64)
+    for index in range(hand.shape[1]):
+        sides = rng.multinomial(hand[:, index], tables.probabilities[index])
+        rolled_brains[:, index] = sides[:, 0]
+        hand[:, index] = sides[:, 1]
+        rolled_shotguns += sides[:, 2]
+    return rolled_brains, rolled_shotguns
+
+
+def play_turns(rng: np.random.Generator, tables: DiceTables, amount: int, rule: BatchRule,
+               rules: Rules = DEFAULT_RULES) -> TurnOutcomes:
+    """Play many independent turns at once, each starting from a full dice pool.
+
+    :param rng: Random generator.
+    :param tables: Dices tables.
+    :param amount: Number of turns to play.
+    :param rule: Rule deciding which turns keep playing after each hand.
+    :param rules: Rules to play the turns with.
+    :return: Outcome of each turn, without the elapsed time.
+    """
+    colors = len(tables.colors)
+
+    # Dices per color in each zone, one row per turn
+    pool = np.tile(tables.amounts, (amount, 1))
+    hand = np.zeros((amount, colors), dtype=np.int64)
+    table_brains = np.zeros((amount, colors), dtype=np.int64)
+
+    brains = np.zeros(amount, dtype=np.int64)
+    shotguns = np.zeros(amount, dtype=np.int64)
+    hands = np.zeros(amount, dtype=np.int64)
+    picked = np.zeros(amount, dtype=np.int64)
+    recycles = np.zeros(amount, dtype=np.int64)
+    busted = np.zeros(amount, dtype=bool)
+    active = np.arange(amount)
+
+    while active.size:
+        # Get dices from the pool
+        pool_rows = pool[active]
+        hand_rows = hand[active]
+        need = np.minimum(rules.dices_per_round - hand_rows.sum(axis=1), pool_rows.sum(axis=1))
+        picked[active] += need
+        pick_dices(rng, pool_rows, hand_rows, need)
+
+        # Roll every dice in hand
+        rolled_brains, rolled_shotguns = roll_hand(rng, tables, hand_rows)
+        hands[active] += 1
+        brains[active] += rolled_brains.sum(axis=1)
+        shotguns[active] += rolled_shotguns
+        table_brains[active] += rolled_brains
+
+        # Check who lost the turn and who keeps playing
+        lost = shotguns[active] >= rules.shots_limit
+        busted[active[lost]] = True
+        keep = ~lost & rule(brains[active], shotguns[active], hand_rows.sum(axis=1))
+
+        # Not enough dices to continue the turn, return BRAIN dices to the pool
+        need = rules.dices_per_round - hand_rows.sum(axis=1)
+        recycle = keep & (pool_rows.sum(axis=1) < need)
+        if recycle.any():
+            rows = active[recycle]
+            pool_rows[recycle] += table_brains[rows]
+            table_brains[rows] = 0
+            recycles[rows] += 1
+        # Nothing left to roll, the turn ends keeping its brains
+        keep &= pool_rows.sum(axis=1) + hand_rows.sum(axis=1) > 0
+
+        pool[active] = pool_rows
+        hand[active] = hand_rows
+        active = active[keep]
+
+    score = np.where(busted, 0, brains)
+    return TurnOutcomes(score, brains, shotguns, busted, hands, picked, recycles, 0.0)
+
+
+def simulate_turns(amount: int, rule: BatchRule, seed: Union[int, None] = None,
+                   rules: Rules = DEFAULT_RULES) -> TurnOutcomes:
+    """Simulate many independent turns at once, each starting from a full dice pool.
+
+    :param amount: Number of turns to simulate.
+    :param rule: Rule deciding which turns keep playing after each hand.
+    :param seed: Seed of the random generator.
+    :param rules: Rules to play the turns with.
+    :return: Outcome of each turn.
+    """
+    start = perf_counter()
+    outcomes = play_turns(np.random.default_rng(seed), dice_tables(rules), amount, rule, rules)
+    outcomes.elapsed = perf_counter() - start
+    return outcomes
+
+
+def add_outcomes(stats: SimulationStats, outcomes: TurnOutcomes) -> None:
+    """Add simulated turns to streaming statistics, counting the unique values of each metric.
+
+    :param stats: Statistics to add the turns to.
+    :param outcomes: Outcome of each turn.
+    """
+    for name, values in ((SCORE, outcomes.score), (BUSTS, outcomes.busted), (HANDS, outcomes.hands),
+                         (RECYCLES, outcomes.recycles)):
+        unique, counts = np.unique(values.astype(np.int64), return_counts=True)
+        stats.add_counts(name, unique.tolist(), counts.tolist())
+
+
+def stream_turns(amount: int, rule: BatchRule, seed: Union[int, None] = None, rules: Rules = DEFAULT_RULES,
+                 chunk: int = CHUNK_SIZE) -> SimulationStats:
+    """Simulate turns in chunks added to streaming statistics, the memory used doesn't grow with the number of turns.
+
+    :param amount: Number of turns to simulate.
+    :param rule: Rule deciding which turns keep playing after each hand.
+    :param seed: Seed of the random generator.
+    :param rules: Rules to play the turns with.
+    :param chunk: Number of turns simulated at once.
+    :return: Statistics of the turns.
+    """
+    rng = np.random.default_rng(seed)
+    tables = dice_tables(rules)
+    stats = SimulationStats()
+    for first in range(0, amount, chunk):
+        add_outcomes(stats, play_turns(rng, tables, min(chunk, amount - first), rule, rules))
+    return stats
+
+
+if __name__ == '__main__':
+    start = perf_counter()
+    stats = stream_turns(1_000_000, threshold_rule(4, 2))
+    elapsed = perf_counter() - start
+    print(f"{stats.turns} turnos em {elapsed:.2f}s ({stats.turns / elapsed:,.0f} turnos/s)")
+    print(StatsStrings.summary(stats.summary(), stats.metrics[SCORE].histogram.counts))
@@ -0,0 +1,309 @@
+"""Benchmarks of the hot paths of every module.
+Results are saved as JSON and compared against a stored baseline, so slowdowns show up as diffs. Timings depend on the
+machine, so the baseline isn't kept in the repository: the first run on a machine has to save it with --save-baseline.
+"""
+
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tracemalloc
+from functools import partial
+from itertools import count
+from statistics import quantiles
+from time import perf_counter_ns
+from typing import Callable, Union
+
+import odds
+import snapshot
+import style
+from bots import STRATEGIES
+from config import GREEN, BRAIN, RUN, SHOTGUN, DICES_PER_ROUND
+from dice import Dice, roll_buffer
+from engine import GameEngine, TurnEngine, Seat
+from rng import StreamRandom
+from strings import GameStrings, TurnStrings, BenchmarkStrings as Strings
+
+
+# Default files, kept out of the source tree
+BUILD_DIR = "build"
+RESULTS_FILE = os.path.join(BUILD_DIR, "benchmark.json")
+BASELINE_FILE = os.path.join(BUILD_DIR, "benchmark_baseline.json")
+
+# Slowdown tolerated before a benchmark is reported as a regression
+TOLERANCE = 0.10
+
+# Startup budget in seconds of the modules short-lived workers import, and the modules they must not load
+HEADLESS = ("strings", "style", "utils", "shutil", "termios", "tty", "msvcrt")
+IMPORT_BUDGET: dict[str, tuple[float, tuple[str, ...]]] = {
+    "engine": (0.1, HEADLESS),
+    "bots": (0.1, HEADLESS),
+    "game": (0.15, ("shutil", "termios", "tty", "msvcrt")),
+}
+
+
+def _roll_dice() -> Callable[[], None]:
+    """Roll a single dice.
+    """
+    dice = Dice(GREEN)
+    buffer = roll_buffer(StreamRandom(0))
+    return lambda: dice.roll_dice(buffer)
+
+
+def _take_return_dice() -> Callable[[], None]:
+    """Take a dice from the pool and put it back.
+    """
+    game = GameEngine([Seat(STRATEGIES["steady"])], StreamRandom(0))
+    game.seat_players()
+    return lambda: game.return_dice(game.take_dice())
+
+
+def _create_dices() -> Callable[[], None]:
+    """Refill the dice pool.
+    """
+    game = GameEngine([Seat(STRATEGIES["steady"])], StreamRandom(0))
+    return game.create_dices
+
+
+def _turn() -> Callable[[], None]:
+    """Play a whole turn and refill the pool.
+    """
+    game = GameEngine([Seat(STRATEGIES["steady"])], StreamRandom(0))
+    game.seat_players()
+    player = game.players[0]
+
+    def turn() -> None:
+        TurnEngine(game, player).play(player.strategy)
+        game.end_turn(player)
+    return turn
+
+
+def _game() -> Callable[[], None]:
+    """Play a whole game between two strategies.
+    """
+    rng = StreamRandom(0)
+    return lambda: GameEngine([Seat(STRATEGIES["steady"]), Seat(STRATEGIES["greedy"])], rng).play()
+
+
+def _deciding_turn() -> TurnEngine:
+    """Start a turn and roll hands until the player has to decide if they keep playing.
+    """
+    for seed in count():
+        game = GameEngine([Seat(STRATEGIES["steady"], "Jogador"), Seat(STRATEGIES["greedy"], "Outro")],
+                          StreamRandom(seed))
+        game.seat_players()
+        game.start_round()
+        turn = TurnEngine(game, game.players[0])
+        turn.get_dices()
+        turn.roll_dices()
+        if turn.deciding:
+            return turn
+
+
+def _outcomes() -> Callable[[], None]:
+    """Ask the sides rolled on the first hand of a turn, answered from the cache.
+    """
+    state = odds.start_state()
+    return lambda: odds.outcomes(state.pool, state.hand, DICES_PER_ROUND)
+
+
+def _snapshot_dump() -> Callable[[], None]:
+    """Save a game while a player decides.
+    """
+    turn = _deciding_turn()
+    return lambda: snapshot.dump(turn.game, turn)
+
+
+def _snapshot_load() -> Callable[[], None]:
+    """Restore a game saved while a player decides.
+    """
+    turn = _deciding_turn()
+    data = snapshot.dump(turn.game, turn)
+    return lambda: snapshot.load(data)
+
+
+def _display_dices() -> Callable[[], None]:
+    """Render the full dice pool.
+    """
+    game = GameEngine([Seat(STRATEGIES["steady"])], StreamRandom(0))
+    game.seat_players()
+    colors, counts = game.pool.colors, game.pool.counts
+    return lambda: GameStrings.display_dices(colors, counts)
+
+
+def _display_turn() -> Callable[[], None]:
+    """Render the turn status.
+    """
+    stats = {BRAIN: 3, RUN: 1, SHOTGUN: 2}
+    return lambda: TurnStrings.display_turn(1, "Jogador", stats, 6, 7)
+
+
+def _greet_user() -> Callable[[], None]:
+    """Render the game banner and rules.
+    """
+    return GameStrings.greet_user
+
+
+def _style_text() -> Callable[[], None]:
+    """Style a text with 3 styles.
+    """
+    return lambda: style.style_text("Zombie Dice", style.BOLD, style.UND, GREEN)
+
+
+def _import(module: str) -> Callable[[], None]:
+    """Start a new interpreter that imports a module, failing if it loads a forbidden module.
+    """
+    forbidden = IMPORT_BUDGET[module][1]
+    code = f"import sys, {module}; sys.exit(any(name in sys.modules for name in {forbidden!r}))"
+    return lambda: subprocess.run([sys.executable, "-c", code], stdin=subprocess.DEVNULL, check=True)
+
+
+# Benchmark name, setup returning the operation to time and calls per sample
+BENCHMARKS: dict[str, tuple[Callable[[], Callable[[], None]], int]] = {
+    "dice.roll_dice": (_roll_dice, 10000),
+    "engine.take_dice+return_dice": (_take_return_dice, 10000),
+    "engine.create_dices": (_create_dices, 10000),
+    "engine.turn": (_turn, 1000),
+    "engine.game": (_game, 50),
+    "odds.outcomes": (_outcomes, 10000),
+    "snapshot.dump": (_snapshot_dump, 10000),
+    "snapshot.load": (_snapshot_load, 2000),
+    "strings.display_dices": (_display_dices, 500),
+    "strings.display_turn": (_display_turn, 2000),
+    "strings.greet_user": (_greet_user, 500),
+    "style.style_text": (_style_text, 10000),
+    **{f"import.{module}": (partial(_import, module), 1) for module in IMPORT_BUDGET},
+}
+
+
+def measure(operation: Callable[[], None], number: int, samples: int = 30) -> dict[str, float]:
+    """Time an operation.
+
+    :param operation: Operation to time.
+    :param number: Calls of the operation in each sample.
+    :param samples: Number of samples.
+    :return: Dict with operations per second, latency percentiles in nanoseconds and peak memory in bytes.
+    """
+    operation()  # Warm up caches before timing
+    times = []
+    for sample in range(samples):
+        start = perf_counter_ns()
+        for i in range(number):
+            operation()
+        times.append((perf_counter_ns() - start) / number)
+
+    tracemalloc.start()
+    for i in range(number):
+        operation()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    percentiles = quantiles(times, n=100)
+    return {
+        "ops_per_sec": 1e9 / percentiles[49],
+        "p50_ns": percentiles[49],
+        "p90_ns": percentiles[89],
+        "p99_ns": percentiles[98],
+        "peak_memory_bytes": peak,
+    }
+
+
+def run(pattern: str = "", samples: int = 30) -> dict[str, dict[str, float]]:
+    """Run the benchmarks.
+
+    :param pattern: Run only the benchmarks with the pattern in the name.
+    :param samples: Number of samples of each benchmark.
+    :return: Dict of benchmark name and its measures.
+    """
+    results = {}
+    for name, (setup, number) in BENCHMARKS.items():
+        if pattern in name:
+            results[name] = measure(setup(), number, samples)
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float = TOLERANCE) -> list[tuple[str, float, bool]]:
+    """Compare the results with the baseline.
+
+    :param results: Benchmark results.
+    :param baseline: Baseline results.
+    :param tolerance: Slowdown tolerated before a regression.
+    :return: List of benchmark name, relative change of the median latency and if it is a regression.
+    """
+    changes = []
+    for name, measures in results.items():
+        if name in baseline:
+            change = measures["p50_ns"] / baseline[name]["p50_ns"] - 1
+            changes.append((name, change, change > tolerance))
+    return changes
+
+
+def over_budget(results: dict) -> list[tuple[str, float, float]]:
+    """List the imports slower than their startup budget.
+
+    :param results: Benchmark results.
+    :return: List of benchmark name, median startup time and budget, in seconds.
+    """
+    slow = []
+    for module, (budget, forbidden) in IMPORT_BUDGET.items():
+        name = f"import.{module}"
+        if name in results and results[name]["p50_ns"] / 1e9 > budget:
+            slow.append((name, results[name]["p50_ns"] / 1e9, budget))
+    return slow
+
+
+def load(path: str) -> Union[dict, None]:
+    """Load saved results.
+
+    :param path: Path of the JSON file.
+    :return: Saved results, None if the file doesn't exist.
+    """
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+
+
+def save(results: dict, path: str) -> None:
+    """Save results as JSON.
+
+    :param results: Benchmark results.
+    :param path: Path of the JSON file, its directory is created if needed.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as file:
+        json.dump(results, file, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=Strings.description)
+    parser.add_argument("pattern", nargs="?", default="", help=Strings.help_pattern)
+    parser.add_argument("-n", "--samples", type=int, default=30, help=Strings.help_samples)
+    parser.add_argument("-o", "--output", default=RESULTS_FILE, help=Strings.help_output)
+    parser.add_argument("-b", "--baseline", default=BASELINE_FILE, help=Strings.help_baseline)
+    parser.add_argument("--save-baseline", action="store_true", help=Strings.help_save_baseline)
+    args = parser.parse_args()
+
+    benchmark_results = run(args.pattern, args.samples)
+    print(Strings.results(benchmark_results))
+    save(benchmark_results, args.output)
+    failed = False
+    slow_imports = over_budget(benchmark_results)
+    if slow_imports:
+        print(Strings.over_budget(slow_imports))
+        failed = True
+    if args.save_baseline:
+        save(benchmark_results, args.baseline)
+    else:
+        baseline_results = load(args.baseline)
+        if baseline_results:
+            regressions = compare(benchmark_results, baseline_results)
+            print(Strings.comparison(regressions))
+            failed = failed or any(regression for name, change, regression in regressions)
+        else:
+            print(Strings.no_baseline(args.baseline))
+    if failed:
+        raise SystemExit(1)
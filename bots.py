@@ -0,0 +1,70 @@
+"""Computer players strategies for the rules engine.
+Strategies are module level objects so they can be sent to worker processes.
+"""
+
+
+from typing import Union
+
+import engine
+import odds
+from config import BRAIN, SHOTGUN
+
+
+class Threshold:
+    """Keep playing while the turn is below both thresholds.
+
+    :param brains: Amount of turn brains to stop at.
+    :param shotguns: Amount of turn shotguns to stop at.
+    """
+    __slots__ = ("brains", "shotguns")
+
+    def __init__(self, brains: int, shotguns: int) -> None:
+        self.brains = brains
+        self.shotguns = shotguns
+
+    def __call__(self, turn: "engine.TurnEngine") -> bool:
+        status = turn.round_status
+        return status[BRAIN] < self.brains and status[SHOTGUN] < self.shotguns
+
+
+class BustRisk:
+    """Keep playing while the exact probability of losing the turn on the next hand is low enough.
+
+    :param risk: Highest bust probability accepted.
+    """
+    __slots__ = ("risk",)
+
+    def __init__(self, risk: float) -> None:
+        self.risk = risk
+
+    def __call__(self, turn: "engine.TurnEngine") -> bool:
+        return odds.bust_probability(odds.turn_state(turn), turn.game.rules) <= self.risk
+
+
+class Optimal:
+    """Play the solved optimal stop policy, the lookup table is loaded on the first decision.
+
+    :param path: Path of the policy table file.
+    """
+    __slots__ = ("path", "table")
+
+    def __init__(self, path: Union[str, None] = None) -> None:
+        self.path = path
+        self.table = None
+
+    def __call__(self, turn: "engine.TurnEngine") -> bool:
+        if self.table is None:
+            import solver
+            self.table = solver.PolicyTable.load(self.path or solver.POLICY_FILE)
+        return self.table(turn)
+
+
+# Available strategies by name
+STRATEGIES: dict[str, "engine.Strategy"] = {
+    "careful": Threshold(99, 1),
+    "steady": Threshold(4, 2),
+    "greedy": Threshold(8, 2),
+    "daring": Threshold(99, 2),
+    "odds": BustRisk(0.2),
+    "optimal": Optimal(),
+}
@@ -2,7 +2,7 @@
 
 
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 
 # General settings
@@ -39,7 +39,40 @@ DICES: dict[str, DiceType] = {
 }
 
 
+@dataclass(frozen=True, eq=False)
+class Rules:
+    """Set of rules a game is played with, defaults to the settings above.
+    """
+    score_limit: int = SCORE_LIMIT
+    shots_limit: int = SHOTS_LIMIT
+    dices_per_round: int = DICES_PER_ROUND
+    dices: dict[str, DiceType] = field(default_factory=lambda: DICES)
+
+
+DEFAULT_RULES = Rules()
+
+
 # Environment settings
 USE_STYLES = True
+GAME_LOG = None  # Path of the binary game log, None to not record games
+RESULTS_DB = None  # Path of the SQLite database finished games are saved to, None to not save them
+ADVISOR = False  # Show the odds and the chances of winning when asked to keep playing
+WARM_ODDS = False  # Compute the odds of every reachable hand when the game starts, instead of on the first decisions
+INSTRUMENT = None  # Path the phase timings are written to when a game ends, None to not time the phases
+BOT_THINK_TIME = 1.0  # Seconds a computer player searches each decision
+BOT_WORKERS = None  # Worker processes searching the computer players decisions, None for one per core
 OS = os.name
-TERMINAL_WIDTH = os.get_terminal_size().columns
+
+
+def __getattr__(name: str) -> int:
+    """Read the terminal size on each use, so importing the settings never touches the terminal and a resized
+    terminal is followed by the next frame.
+
+    :param name: Name of the missing setting.
+    :return: Terminal width or height, falls back to 80 columns and 24 lines when headless.
+    """
+    if name in ("TERMINAL_WIDTH", "TERMINAL_HEIGHT"):
+        import shutil  # Only loaded by programs drawing on the terminal
+        size = shutil.get_terminal_size()
+        return size.columns if name == "TERMINAL_WIDTH" else size.lines
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
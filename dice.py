@@ -2,23 +2,74 @@
 """
 
 
-from random import choice
-from typing import Union
+from functools import lru_cache, partial
+from itertools import chain
+from random import Random, choice
+from typing import Iterator, Union
 
 from config import DICES
-import strings
+
+
+# Random bytes drawn at once to roll dices
+BUFFER_SIZE = 256
+
+
+@lru_cache(maxsize=None)
+def side_table(sides: tuple) -> tuple:
+    """Map every byte value to a side of the dice.
+    Bytes above the highest multiple of the number of sides map to None and are rejected, keeping sides uniform.
+
+    :param sides: Sides of the dice.
+    :return: Tuple of 256 sides.
+    """
+    limit = 256 - 256 % len(sides)
+    return tuple(sides[byte % len(sides)] if byte < limit else None for byte in range(256))
+
+
+def roll_buffer(rng: Random) -> Iterator[int]:
+    """Stream of random bytes drawn in bulk from the random generator, each roll consumes a single byte.
+
+    :param rng: Random generator filling the buffer.
+    :return: Endless iterator of bytes.
+    """
+    return chain.from_iterable(iter(partial(rng.randbytes, BUFFER_SIZE), b""))
+
+
+def random_below(buffer: Iterator[int], amount: int) -> int:
+    """Draw a uniform random integer from the stream of random bytes.
+    Values above the highest multiple of the amount are rejected.
+
+    :param buffer: Stream of random bytes.
+    :param amount: Number of possible values.
+    :return: Integer between 0 and amount, excluded.
+    """
+    size = 1
+    while 256 ** size < amount:
+        size += 1
+    span = 256 ** size
+    limit = span - span % amount
+    while True:
+        value = next(buffer)
+        for i in range(size - 1):
+            value = value << 8 | next(buffer)
+        if value < limit:
+            return value % amount
 
 
 class Dice:
     """Class to represent the dice.
     """
+    __slots__ = ("__color", "__sides", "__table", "__side")
 
-    def __init__(self, color: str) -> None:
+    def __init__(self, color: str, sides: Union[tuple, None] = None) -> None:
         """Init dice instance. The dice start having no chosen side.
 
         :param color: Color of the dice representing its difficult.
+        :param sides: Sides of the dice, defaults to the sides of its color in the dices configuration.
         """
         self.__color = color
+        self.__sides = sides or DICES[color].sides
+        self.__table = side_table(self.__sides)  # Shared by every dice with the same sides
         self.__side: Union[str, None] = None
 
     def __str__(self) -> str:
@@ -26,13 +77,23 @@ class Dice:
 
         :return: String representing the dice.
         """
+        import strings  # The presentation layer is only loaded when something is shown
+
         return strings.DiceStrings.display_dice(self.__color, self.__side)
 
-    def roll_dice(self) -> None:
+    def roll_dice(self, buffer: Union[Iterator[int], None] = None) -> None:
         """Roll dice.
         Choose a side for the dice randomly.
+
+        :param buffer: Random bytes to roll with, defaults to the global random generator.
         """
-        self.__side = choice(DICES[self.__color].sides)
+        if buffer is None:
+            self.__side = choice(self.__sides)
+            return
+        side = self.__table[next(buffer)]
+        while side is None:
+            side = self.__table[next(buffer)]  # Byte rejected to keep the sides uniform
+        self.__side = side
 
     def reset_side(self) -> None:
         """Reset dice side to None, it can be re-rolled.
@@ -54,3 +115,11 @@ class Dice:
         :return: String of the dice rolled value.
         """
         return self.__side
+
+    @value.setter
+    def value(self, side: Union[str, None]) -> None:
+        """Set dice rolled value, as when restoring a saved game.
+
+        :param side: One of the dice sides, None if not rolled.
+        """
+        self.__side = side
@@ -0,0 +1,592 @@
+"""Rules engine, plays games and turns without any user interaction.
+The interactive Game and Turn classes are clients of this module.
+"""
+
+
+from random import Random
+from typing import Callable, Iterator, Union
+
+from dice import Dice, roll_buffer
+from pool import DiceCounts, DicePool
+from rng import StreamRandom
+import instrument
+from gamelog import Events, GameRecorder
+from leaderboard import Leaderboard
+from config import BRAIN, RUN, SHOTGUN, DEFAULT_RULES, Rules
+
+
+# Store game states
+class _GameStates:
+    """Class to store game states.
+    """
+    SETUP = "setup"
+    GAME = "game"
+    DRAW = "draw"
+    END = "end"
+
+
+class _TurnStates:
+    """Class to store turn states
+    """
+    GAME = "game"
+    END = "end"
+    LOST = "lost"
+    EXIT = "exit"
+
+
+# Decide if the player keeps playing the turn, receives the turn being played
+Strategy = Callable[["TurnEngine"], bool]
+
+
+class Seat:
+    """Class representing a player without any user interaction.
+    """
+    __slots__ = ("index", "score", "name", "strategy")
+
+    def __init__(self, strategy: Strategy, name: str = "") -> None:
+        """Init seat.
+
+        :param strategy: Function deciding if the player keeps playing the turn.
+        :param name: Name of the player.
+        """
+        self.index: Union[int, None] = None
+        self.score = 0
+        self.name = name
+        self.strategy = strategy
+
+
+class GameEngine:
+    """Class holding the rules and state of a game.
+
+    :param players: Players of the game, any object with index and score attributes.
+    :param rng: Random generator used by the game, defaults to a new randomly seeded stream.
+    :param rules: Rules to play the game with.
+    :param recorder: Recorder of the game events, if the game is logged.
+    """
+
+    def __init__(self, players: list, rng: Union[Random, None] = None, rules: Rules = DEFAULT_RULES,
+                 recorder: Union[GameRecorder, None] = None) -> None:
+        self.__players = players
+        self.__recorder = recorder
+        self.__rng = rng or StreamRandom()
+        self.__roll_buffer = roll_buffer(self.__rng)
+        self.__rules = rules
+        self.__dice_pool = DicePool(rules)
+        self.__leaderboard = Leaderboard([])
+        self.__winners: list = []
+        self.__round_players: list = []
+        self.__round_count = 0
+        self.__highest_score = 0
+        self.__state = _GameStates.SETUP
+
+    @property
+    def players(self) -> list:
+        """Returns game players.
+
+        :return: List of players in seat order.
+        """
+        return self.__players
+
+    @property
+    def rng(self) -> Random:
+        """Returns the game random generator.
+
+        :return: Random generator.
+        """
+        return self.__rng
+
+    @property
+    def roll_buffer(self) -> Iterator[int]:
+        """Returns the random bytes the dices are rolled with.
+
+        :return: Iterator of bytes.
+        """
+        return self.__roll_buffer
+
+    @property
+    def recorder(self) -> Union[GameRecorder, None]:
+        """Returns the recorder of the game events.
+
+        :return: Game recorder, None if the game isn't logged.
+        """
+        return self.__recorder
+
+    @property
+    def rules(self) -> Rules:
+        """Returns the game rules.
+
+        :return: Rules of the game.
+        """
+        return self.__rules
+
+    @property
+    def pool(self) -> DicePool:
+        """Returns the dice pool.
+
+        :return: Dice pool.
+        """
+        return self.__dice_pool
+
+    @property
+    def dice_pool(self) -> list[Dice]:
+        """Returns current dice pool.
+
+        :return: List of dices in the dice pool.
+        """
+        return self.__dice_pool.dices
+
+    @property
+    def leaderboard(self) -> Leaderboard:
+        """Returns the players ranked by score.
+
+        :return: Leaderboard of the game.
+        """
+        return self.__leaderboard
+
+    @property
+    def winners(self) -> list:
+        """Returns the players with the highest score once someone reached the score limit.
+
+        :return: List of players.
+        """
+        return self.__winners
+
+    @property
+    def round_players(self) -> list:
+        """Returns the players playing the current round, in playing order.
+
+        :return: List of players.
+        """
+        return self.__round_players
+
+    @property
+    def round_count(self) -> int:
+        """Returns current round count.
+
+        :return: Number of the current round count.
+        """
+        return self.__round_count
+
+    @property
+    def highest_score(self) -> int:
+        """Returns the highest score in the game.
+
+        :return: Highest score.
+        """
+        return self.__highest_score
+
+    @property
+    def state(self) -> str:
+        """Returns current game state.
+
+        :return: Game state.
+        """
+        return self.__state
+
+    def take_dice(self) -> Dice:
+        """Pop 1 dice from the dice pool and return it.
+
+        :return: Single dice.
+        """
+        return self.__dice_pool.take(self.__roll_buffer)
+
+    def return_dice(self, dice: Dice) -> None:
+        """Return dice to the dice pool.
+
+        :param dice: Dice to return to the dice pool.
+        """
+        self.__dice_pool.put(dice)
+
+    @instrument.phase("engine.create_dices")
+    def create_dices(self) -> None:
+        """Fill the dice pool with every dice of the game.
+        """
+        self.__dice_pool.reset()
+
+    def seat_players(self) -> None:
+        """Shuffle the players, number their seats and start the game.
+        """
+        self.__rng.shuffle(self.__players)
+        for index, player in enumerate(self.__players):
+            player.index = index
+        self.__leaderboard = Leaderboard(self.__players)
+        self.create_dices()
+        self.__state = _GameStates.GAME
+        if self.__recorder:
+            self.__recorder.record(Events.GAME, len(self.__players))
+
+    def start_round(self) -> list:
+        """Start a game round.
+
+        :return: Players playing the round, all of them or only the tied ones on a draw.
+        """
+        self.__round_count += 1
+        if self.__state == _GameStates.DRAW:
+            self.__round_players = self.__winners.copy()
+        else:
+            self.__round_players = self.__players
+        if self.__recorder:
+            self.__recorder.record(Events.ROUND, self.__round_count)
+        return self.__round_players
+
+    def end_turn(self, player) -> None:
+        """Refill the dice pool and update the ranking and the highest score after a player turn.
+
+        :param player: Player that played the turn.
+        """
+        self.create_dices()
+        self.__leaderboard.update(player)
+        self.__highest_score = self.__leaderboard.leader_score
+
+    def end_round(self, players: list) -> None:
+        """Check if someone wins or if it's a draw.
+        Only players of the round can hold the highest score, so the winners are the leaders of the ranking.
+
+        :param players: Players that played the round.
+        """
+        self.__winners.clear()
+        if self.__highest_score >= self.__rules.score_limit:
+            self.__winners.extend(self.__leaderboard.leaders)  # Save each player that reached the highest score
+            self.__state = _GameStates.DRAW
+        if len(self.__winners) == 1:
+            # There is only one player with the highest score
+            self.__state = _GameStates.END
+
+        if self.__recorder:
+            self.__recorder.record(Events.ROUND_END, self.__highest_score)
+            if self.__state == _GameStates.DRAW:
+                self.__recorder.record(Events.DRAW, len(self.__winners))
+            elif self.__state == _GameStates.END:
+                self.__recorder.end(self.__winners[0].index)
+
+    def restore(self, state: str, round_count: int, highest_score: int, winners: list,
+                counts: tuple[int, ...]) -> list[list[Dice]]:
+        """Put the game back in a state saved in a snapshot, the players must already be seated.
+
+        :param state: Game state.
+        :param round_count: Current round count.
+        :param highest_score: Highest score in the game.
+        :param winners: Players with the highest score, or tied in a draw.
+        :param counts: Amount of dices of each color in the pool.
+        :return: Dices of each color left out of the pool, to be put in the hand or on the table.
+        """
+        self.__state = state
+        self.__round_count = round_count
+        self.__highest_score = highest_score
+        self.__winners = winners
+        self.__round_players = winners.copy() if state == _GameStates.DRAW else self.__players
+        self.__leaderboard = Leaderboard(self.__players)
+        return self.__dice_pool.restore(counts)
+
+    def play(self, turn: Union["TurnEngine", None] = None) -> Seat:
+        """Play a whole game, each player deciding through its strategy.
+
+        :param turn: Turn in progress to resume the game from, as restored from a snapshot.
+        :return: Winner of the game.
+        """
+        if turn is None:
+            self.seat_players()
+        else:
+            self.__play_round(self.__round_players, turn)
+        while self.__state != _GameStates.END:
+            self.__play_round(self.start_round())
+        return self.__winners[0]
+
+    def __play_round(self, players: list, turn: Union["TurnEngine", None] = None) -> None:
+        """Play the turns of a round, starting from the turn in progress if there is one.
+
+        :param players: Players playing the round.
+        :param turn: Turn in progress.
+        """
+        first = 0 if turn is None else players.index(turn.player)
+        for player in players[first:]:
+            if turn is None:
+                turn = TurnEngine(self, player)
+            turn.play(player.strategy)
+            turn = None
+            self.end_turn(player)
+        self.end_round(players)
+
+
+class TurnEngine:
+    """Class holding the rules and state of a player turn.
+
+    :param game_ref: Reference to the game engine.
+    :param player_ref: Reference to the player playing the turn.
+    """
+
+    def __init__(self, game_ref: GameEngine, player_ref) -> None:
+        self.__game = game_ref
+        self.__player = player_ref
+        self.__rules = game_ref.rules
+        self.__recorder = game_ref.recorder
+        self.__round_status = {
+            BRAIN: 0,
+            RUN: 0,
+            SHOTGUN: 0
+        }
+        self.__amount_picked_dices = 0
+        self.__hand_dices: list[Dice] = []
+        self.__table_dices: dict[str, list[Dice]] = {BRAIN: [], SHOTGUN: []}  # Dices put aside, by side
+        self.__table_counts = DiceCounts(game_ref.pool.color_index)
+        self.__get_dices_amount = self.__rules.dices_per_round
+        self.__picked_now = 0
+        self.__deciding = False  # If the hand was rolled and the player didn't choose yet
+        self.__state = _TurnStates.GAME
+        if self.__recorder:
+            self.__recorder.record(Events.TURN, player_ref.index)
+
+    @property
+    def game(self) -> GameEngine:
+        """Returns the game the turn belongs to.
+
+        :return: Game engine.
+        """
+        return self.__game
+
+    @property
+    def player(self):
+        """Returns the player playing the turn.
+
+        :return: Player.
+        """
+        return self.__player
+
+    @property
+    def round_status(self) -> dict[str, int]:
+        """Returns the amount of each dice side accumulated in the turn.
+
+        :return: Dict of side and amount.
+        """
+        return self.__round_status
+
+    @property
+    def amount_picked_dices(self) -> int:
+        """Returns the amount of dices picked from the pool in the turn.
+
+        :return: Number of picked dices.
+        """
+        return self.__amount_picked_dices
+
+    @property
+    def get_dices_amount(self) -> int:
+        """Returns the amount of dices to pick from the pool on the next hand.
+
+        :return: Number of dices.
+        """
+        return self.__get_dices_amount
+
+    @property
+    def hand_dices(self) -> list[Dice]:
+        """Returns the dices in hand.
+
+        :return: List of dices.
+        """
+        return self.__hand_dices
+
+    @property
+    def table_dices(self) -> list[Dice]:
+        """Returns the dices put aside on the table.
+
+        :return: List of dices, BRAIN dices first.
+        """
+        return self.__table_dices[BRAIN] + self.__table_dices[SHOTGUN]
+
+    @property
+    def hand_counts(self) -> DiceCounts:
+        """Returns the amount of dices in hand by color and side.
+        The hand never holds more dices than a hand is rolled with, so it's counted when asked.
+
+        :return: Counts of the hand.
+        """
+        counts = DiceCounts(self.__game.pool.color_index)
+        counts.extend(self.__hand_dices)
+        return counts
+
+    @property
+    def table_counts(self) -> DiceCounts:
+        """Returns the amount of dices put aside on the table by color and side.
+
+        :return: Counts of the table.
+        """
+        return self.__table_counts
+
+    @property
+    def picked_now(self) -> int:
+        """Returns the amount of dices picked from the pool on the last hand.
+
+        :return: Number of dices.
+        """
+        return self.__picked_now
+
+    @property
+    def deciding(self) -> bool:
+        """Returns if the hand was rolled and the player has to choose if they keep playing.
+
+        :return: If the player is deciding.
+        """
+        return self.__deciding
+
+    @property
+    def state(self) -> str:
+        """Returns current turn state.
+
+        :return: Turn state.
+        """
+        return self.__state
+
+    def get_dices(self) -> list[Dice]:
+        """Get dices from dice pool and store them in the hand.
+
+        :return: List of picked dices.
+        """
+        self.__picked_now = self.__get_dices_amount
+        # Skip if player already have sufficient dices in hand to roll
+        if self.__get_dices_amount == 0:
+            return []
+
+        self.__amount_picked_dices += self.__get_dices_amount
+        picked_dices = [self.__game.take_dice() for i in range(self.__get_dices_amount)]
+        self.__hand_dices.extend(picked_dices)
+        return picked_dices
+
+    def roll_dices(self) -> None:
+        """Roll dices in hand, randomly choosing a side for each.
+        Check if the player lost the turn.
+        """
+        self.__round_status[RUN] = 0  # Reset previous RUN dices count
+
+        # Roll all dices in hand
+        buffer = self.__game.roll_buffer
+        for dice in self.__hand_dices:
+            dice.roll_dice(buffer)
+            self.__round_status[dice.value] += 1  # Save result player score
+
+        if self.__recorder:
+            first_picked = len(self.__hand_dices) - self.__picked_now
+            for index, dice in enumerate(self.__hand_dices):
+                self.__recorder.roll(dice.color, dice.value, index >= first_picked)
+
+        # Check if player lost the turn
+        if self.__round_status[SHOTGUN] >= self.__rules.shots_limit:
+            self.__state = _TurnStates.LOST
+            if self.__recorder:
+                self.__recorder.record(Events.BUST, self.__round_status[SHOTGUN])
+            return
+
+        # Calculate how many dices to get from the pool on the next turn
+        self.__get_dices_amount = self.__rules.dices_per_round - self.__round_status[RUN]
+        self.__deciding = True
+
+    def choose(self, keep_playing: bool) -> bool:
+        """Apply the player decision to continue playing more hands or end the turn.
+
+        :param keep_playing: If the player wants to continue playing the turn.
+        :return: If BRAIN dices had to be returned to the pool to keep playing.
+        """
+        self.__deciding = False
+        if self.__recorder:
+            self.__recorder.record(Events.DECISION, keep_playing)
+        if not keep_playing:
+            self.__state = _TurnStates.END
+            return False
+        self.__clear_hand_dices()  # Clear hand dices for next throw
+
+        if len(self.__game.pool) < self.__get_dices_amount:
+            # Not enough dices to continue the player turn
+            recycled = self.__continue_playing()
+            if self.__recorder:
+                self.__recorder.record(Events.RECYCLE, recycled)
+            # A small dice set can still be short, the next hand is rolled with the dices left
+            self.__get_dices_amount = min(self.__get_dices_amount, len(self.__game.pool))
+            if not self.__get_dices_amount and not self.__hand_dices:
+                self.__state = _TurnStates.END  # Nothing left to roll, the turn ends keeping its brains
+            return True
+        return False
+
+    def end_round(self) -> None:
+        """Finish the turn and update player score.
+        """
+        self.__player.score += self.__round_status[BRAIN]
+        self.__state = _TurnStates.EXIT
+        if self.__recorder:
+            self.__recorder.record(Events.SCORE, self.__player.score)
+
+    def lost(self) -> None:
+        """Finish the turn without saving the score accumulated in the turn.
+        """
+        self.__state = _TurnStates.EXIT
+
+    def restore(self, state: str, deciding: bool, round_status: tuple[int, int, int], amount_picked_dices: int,
+                get_dices_amount: int, picked_now: int, hand_dices: list[Dice], table_dices: list[Dice]) -> None:
+        """Put the turn back in a state saved in a snapshot.
+
+        :param state: Turn state.
+        :param deciding: If the hand was rolled and the player has to choose if they keep playing.
+        :param round_status: Amount of BRAIN, RUN and SHOTGUN sides accumulated in the turn.
+        :param amount_picked_dices: Amount of dices picked from the pool in the turn.
+        :param get_dices_amount: Amount of dices to pick on the next hand.
+        :param picked_now: Amount of dices picked on the last hand.
+        :param hand_dices: Dices in hand, with their sides.
+        :param table_dices: Dices put aside on the table, with their sides.
+        """
+        self.__state = state
+        self.__deciding = deciding
+        self.__round_status = dict(zip((BRAIN, RUN, SHOTGUN), round_status))
+        self.__amount_picked_dices = amount_picked_dices
+        self.__get_dices_amount = get_dices_amount
+        self.__picked_now = picked_now
+        self.__hand_dices = hand_dices
+        self.__table_dices = {BRAIN: [], SHOTGUN: []}
+        self.__table_counts = DiceCounts(self.__game.pool.color_index)
+        self.__table_counts.extend(table_dices)
+        for dice in table_dices:
+            self.__table_dices[dice.value].append(dice)
+
+    def play(self, strategy: Strategy) -> None:
+        """Play the whole turn, the strategy decides after each hand if the player continues.
+
+        :param strategy: Function deciding if the player keeps playing the turn.
+        """
+        while True:
+            match self.__state:
+                case _TurnStates.GAME:
+                    if not self.__deciding:  # A restored turn may already have rolled the hand
+                        self.get_dices()
+                        self.roll_dices()
+                    if self.__state == _TurnStates.GAME:
+                        self.choose(strategy(self))
+                case _TurnStates.END:
+                    self.end_round()
+                case _TurnStates.LOST:
+                    self.lost()
+                case _TurnStates.EXIT:
+                    return
+
+    @instrument.phase("engine.continue_playing")
+    def __continue_playing(self) -> int:
+        """Return all BRAIN dices to the pool to keep playing.
+
+        :return: Number of dices returned to the pool.
+        """
+        brains = self.__table_dices[BRAIN]
+        for dice in brains:
+            self.__game.return_dice(dice)
+        self.__table_dices[BRAIN] = []
+        self.__table_counts.discard(BRAIN)
+        return len(brains)
+
+    def __clear_hand_dices(self) -> None:
+        """Remove all dices that aren't RUN from the hand, preparing for the next throw.
+        """
+        hand_dices = []
+        table_dices = []
+        for dice in self.__hand_dices:
+            side = dice.value
+            if side == RUN:
+                hand_dices.append(dice)
+            else:
+                self.__table_dices[side].append(dice)
+                table_dices.append(dice)
+        self.__hand_dices = hand_dices
+        self.__table_counts.extend(table_dices)
@@ -0,0 +1,350 @@
+"""Training environments where an agent decides, after each hand, if it keeps playing the turn.
+ZombieDiceEnv plays a single game over the rules engine, VectorEnv steps many games at once as NumPy arrays.
+Both follow the Gym API, requires NumPy.
+"""
+
+
+from time import perf_counter
+from typing import Generator, Union
+
+import numpy as np
+
+from batch import BatchRule, dice_tables, pick_dices, play_turns, roll_hand, threshold_rule
+from bots import STRATEGIES
+from engine import GameEngine, TurnEngine, Seat, Strategy, _GameStates, _TurnStates
+from rng import StreamRandom
+from config import BRAIN, RUN, SHOTGUN, DEFAULT_RULES, Rules
+
+
+# Actions
+STOP = 0
+ROLL = 1
+
+# Rewards given at the end of the game
+WIN_REWARD = 1.0
+LOSS_REWARD = -1.0
+
+
+def observation_size(players: int, rules: Rules = DEFAULT_RULES) -> int:
+    """Length of an observation: turn brains, turn shotguns, RUN dices in hand, dices of each color in the pool, then
+    the agent score followed by the other scores in seat order.
+
+    :param players: Number of players.
+    :param rules: Rules to play with.
+    :return: Number of values in an observation.
+    """
+    return 3 + len(rules.dices) + players
+
+
+class ZombieDiceEnv:
+    """Game against computer players, the agent stops or rolls again after each hand of its turns.
+    The reward is given when the game ends, the agent wins or loses.
+
+    :param players: Number of players, including the agent.
+    :param opponent: Strategy of the other players.
+    :param rules: Rules to play with.
+    """
+
+    def __init__(self, players: int = 2, opponent: Strategy = STRATEGIES["steady"],
+                 rules: Rules = DEFAULT_RULES) -> None:
+        self.__players = players
+        self.__opponent = opponent
+        self.__rules = rules
+        self.__rng = StreamRandom()
+        self.__agent = Seat(None, "agent")
+        self.__game = GameEngine([])
+        self.__decisions: Union[Generator[TurnEngine, bool, None], None] = None
+        self.__turn: Union[TurnEngine, None] = None
+
+    def reset(self, seed: Union[int, None] = None) -> tuple[np.ndarray, dict]:
+        """Start a new game, played until the agent first decides.
+
+        :param seed: Seed of the random generator, keeps the current one if None.
+        :return: Observation and info.
+        """
+        if seed is not None:
+            self.__rng = StreamRandom(seed)
+        # A game can end before the agent ever decides, if it busts on every first hand
+        while True:
+            self.__agent = Seat(None, "agent")
+            seats = [self.__agent] + [Seat(self.__opponent) for i in range(self.__players - 1)]
+            self.__game = GameEngine(seats, self.__rng, self.__rules)
+            self.__decisions = self.__play()
+            self.__turn = next(self.__decisions, None)
+            if self.__turn is not None:
+                return self.__observe(), self.__info()
+
+    def step(self, action: int) -> tuple[np.ndarray, float, bool, bool, dict]:
+        """Apply the agent decision and play until it decides again or the game ends.
+
+        :param action: STOP or ROLL.
+        :return: Observation, reward, if the game ended, if it was cut short and info.
+        """
+        try:
+            self.__turn = self.__decisions.send(action == ROLL)
+        except StopIteration:
+            self.__turn = None
+            winner = self.__game.winners[0]
+            reward = WIN_REWARD if winner is self.__agent else LOSS_REWARD
+            return self.__observe(), reward, True, False, self.__info()
+        return self.__observe(), 0.0, False, False, self.__info()
+
+    def __play(self) -> Generator[TurnEngine, bool, None]:
+        """Play the game, pausing on each decision of the agent.
+
+        :return: Generator of the agent turn when it decides, receiving if it keeps playing.
+        """
+        game = self.__game
+        game.seat_players()
+        while game.state != _GameStates.END:
+            players = game.start_round()
+            for player in players:
+                turn = TurnEngine(game, player)
+                if player is self.__agent:
+                    while turn.state == _TurnStates.GAME:
+                        turn.get_dices()
+                        turn.roll_dices()
+                        if turn.state == _TurnStates.GAME:
+                            turn.choose((yield turn))
+                turn.play(player.strategy)
+                game.end_turn(player)
+            game.end_round(players)
+
+    def __observe(self) -> np.ndarray:
+        """Build the observation of the agent.
+
+        :return: Observation array.
+        """
+        turn = self.__turn
+        status = turn.round_status if turn else {BRAIN: 0, RUN: 0, SHOTGUN: 0}
+        players = self.__game.players
+        seat = self.__agent.index
+        scores = [players[(seat + offset) % len(players)].score for offset in range(len(players))]
+        return np.array([status[BRAIN], status[SHOTGUN], status[RUN], *self.__game.pool.counts, *scores],
+                        dtype=np.int64)
+
+    def __info(self) -> dict:
+        """Build the info of the current step.
+
+        :return: Dict with the agent seat and the round.
+        """
+        return {"seat": self.__agent.index, "round": self.__game.round_count}
+
+
+class VectorEnv:
+    """Many independent games stepped at once, the state of all games kept in arrays with one row per game.
+    A finished game restarts right away, the observation returned for it is the first of the new game and the last
+    one of the finished game goes in the info.
+
+    :param amount: Number of games.
+    :param players: Number of players in each game, including the agent.
+    :param opponent: Batch rule of the other players.
+    :param rules: Rules to play with.
+    """
+
+    def __init__(self, amount: int, players: int = 2, opponent: BatchRule = threshold_rule(4, 2),
+                 rules: Rules = DEFAULT_RULES) -> None:
+        self.__amount = amount
+        self.__players = players
+        self.__opponent = opponent
+        self.__rules = rules
+        self.__tables = dice_tables(rules)
+        self.__rng = np.random.default_rng()
+        colors = len(self.__tables.colors)
+
+        # Game state
+        self.__scores = np.zeros((amount, players), dtype=np.int64)
+        self.__agent = np.zeros(amount, dtype=np.int64)  # Seat of the agent
+        self.__seat = np.zeros(amount, dtype=np.int64)  # Seat playing the turn
+        self.__round_players = np.ones((amount, players), dtype=bool)
+        self.__rounds = np.zeros(amount, dtype=np.int64)
+
+        # Agent turn state, dices per color in each zone
+        self.__pool = np.zeros((amount, colors), dtype=np.int64)
+        self.__hand = np.zeros((amount, colors), dtype=np.int64)
+        self.__table_brains = np.zeros((amount, colors), dtype=np.int64)
+        self.__brains = np.zeros(amount, dtype=np.int64)
+        self.__shotguns = np.zeros(amount, dtype=np.int64)
+
+    @property
+    def amount(self) -> int:
+        """Returns the number of games.
+
+        :return: Number of games.
+        """
+        return self.__amount
+
+    def reset(self, seed: Union[int, None] = None) -> tuple[np.ndarray, dict]:
+        """Start every game, played until the agent first decides.
+
+        :param seed: Seed of the random generator, keeps the current one if None.
+        :return: Observations and info.
+        """
+        if seed is not None:
+            self.__rng = np.random.default_rng(seed)
+        self.__restart(np.arange(self.__amount))
+        return self.__observe(), {"round": self.__rounds.copy()}
+
+    def step(self, actions: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, dict]:
+        """Apply the agent decision of every game and play each until it decides again or ends.
+
+        :param actions: STOP or ROLL of each game.
+        :return: Observations, rewards, which games ended, which were cut short and info.
+        """
+        rules = self.__rules
+        keep = np.asarray(actions) == ROLL
+        stop = np.flatnonzero(~keep)
+        self.__scores[stop, self.__agent[stop]] += self.__brains[stop]
+
+        # Not enough dices to continue the turn, return BRAIN dices to the pool
+        rows = np.flatnonzero(keep)
+        need = rules.dices_per_round - self.__hand[rows].sum(axis=1)
+        recycle = rows[self.__pool[rows].sum(axis=1) < need]
+        self.__pool[recycle] += self.__table_brains[recycle]
+        self.__table_brains[recycle] = 0
+        busted = rows[self.__roll(rows)]
+
+        ended, winners = self.__advance(np.concatenate((stop, busted)))
+        rewards = np.zeros(self.__amount)
+        rewards[ended] = np.where(winners == self.__agent[ended], WIN_REWARD, LOSS_REWARD)
+        terminated = np.zeros(self.__amount, dtype=bool)
+        terminated[ended] = True
+        info = {"final_observation": self.__observe(), "round": self.__rounds.copy()}
+        self.__restart(ended)
+        return self.__observe(), rewards, terminated, np.zeros(self.__amount, dtype=bool), info
+
+    def __restart(self, rows: np.ndarray) -> None:
+        """Start new games, played until the agent first decides.
+
+        :param rows: Games to start.
+        """
+        # A game can end before the agent ever decides, if it busts on every first hand
+        while rows.size:
+            self.__scores[rows] = 0
+            self.__agent[rows] = self.__rng.integers(self.__players, size=rows.size)
+            self.__seat[rows] = -1
+            self.__round_players[rows] = True
+            self.__rounds[rows] = 1
+            rows = self.__advance(rows)[0]
+
+    def __advance(self, rows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Play the next turns of games whose turn ended, until the agent has to decide or the game ends.
+
+        :param rows: Games whose turn ended.
+        :return: Games that ended and the seat of their winners.
+        """
+        ended = []
+        winners = []
+        while rows.size:
+            rows, ended_rows, winner_seats = self.__next_seat(rows)
+            ended.append(ended_rows)
+            winners.append(winner_seats)
+
+            agent = self.__seat[rows] == self.__agent[rows]
+            others = rows[~agent]
+            if others.size:
+                outcomes = play_turns(self.__rng, self.__tables, others.size, self.__opponent, self.__rules)
+                self.__scores[others, self.__seat[others]] += outcomes.score
+
+            # Start the agent turns, the first hand may already bust
+            agent_rows = rows[agent]
+            self.__pool[agent_rows] = self.__tables.amounts
+            for zone in (self.__hand, self.__table_brains):
+                zone[agent_rows] = 0
+            self.__brains[agent_rows] = 0
+            self.__shotguns[agent_rows] = 0
+            rows = np.concatenate((others, agent_rows[self.__roll(agent_rows)]))
+        return np.concatenate(ended or [rows]), np.concatenate(winners or [rows])
+
+    def __next_seat(self, rows: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Move to the next player of the round, ending the round after its last player.
+
+        :param rows: Games whose turn ended.
+        :return: Games still playing, games that ended and the seat of their winners.
+        """
+        seats = np.arange(self.__players)
+        later = self.__round_players[rows] & (seats > self.__seat[rows, None])
+        has_next = later.any(axis=1)
+        self.__seat[rows] = later.argmax(axis=1)
+
+        # Check if someone wins or if it's a draw
+        over = rows[~has_next]
+        scores = self.__scores[over]
+        highest = scores.max(axis=1)
+        winners = self.__round_players[over] & (scores == highest[:, None])
+        reached = highest >= self.__rules.score_limit
+        single = reached & (winners.sum(axis=1) == 1)
+        draw = reached & ~single
+        self.__round_players[over] = np.where(draw[:, None], winners, True)
+        self.__rounds[over] += 1
+        self.__seat[over] = self.__round_players[over].argmax(axis=1)
+        playing = np.concatenate((rows[has_next], over[~single]))
+        return playing, over[single], winners[single].argmax(axis=1)
+
+    def __roll(self, rows: np.ndarray) -> np.ndarray:
+        """Pick dices and roll the hand of the agent turns.
+
+        :param rows: Games where the agent rolls.
+        :return: Which of the games lost the turn.
+        """
+        pool = self.__pool[rows]
+        hand = self.__hand[rows]
+        need = np.minimum(self.__rules.dices_per_round - hand.sum(axis=1), pool.sum(axis=1))
+        pick_dices(self.__rng, pool, hand, need)
+        rolled_brains, rolled_shotguns = roll_hand(self.__rng, self.__tables, hand)
+        self.__pool[rows] = pool
+        self.__hand[rows] = hand
+        self.__table_brains[rows] += rolled_brains
+        self.__brains[rows] += rolled_brains.sum(axis=1)
+        self.__shotguns[rows] += rolled_shotguns
+        return self.__shotguns[rows] >= self.__rules.shots_limit
+
+    def __observe(self) -> np.ndarray:
+        """Build the observations of the agents.
+
+        :return: Observations array, one row per game.
+        """
+        order = (self.__agent[:, None] + np.arange(self.__players)) % self.__players
+        return np.column_stack((self.__brains, self.__shotguns, self.__hand.sum(axis=1), self.__pool,
+                                np.take_along_axis(self.__scores, order, axis=1)))
+
+
+def threshold_actions(observations: np.ndarray, brains: int = 4, shotguns: int = 2) -> np.ndarray:
+    """Keep playing while below both thresholds, the same as the steady strategy.
+
+    :param observations: Observations array, one row per game.
+    :param brains: Amount of turn brains to stop at.
+    :param shotguns: Amount of turn shotguns to stop at.
+    :return: Actions array.
+    """
+    return np.where((observations[..., 0] < brains) & (observations[..., 1] < shotguns), ROLL, STOP)
+
+
+if __name__ == '__main__':
+    # A Python loop over the rules engine against the vectorized environment, both playing the steady strategy
+    env = ZombieDiceEnv()
+    observation, info = env.reset(seed=0)
+    steps = games = wins = 0
+    start = perf_counter()
+    while perf_counter() - start < 3:
+        observation, reward, terminated, truncated, info = env.step(int(threshold_actions(observation)))
+        steps += 1
+        if terminated:
+            games += 1
+            wins += reward == WIN_REWARD
+            observation, info = env.reset()
+    loop_speed = steps / (perf_counter() - start)
+    print(f"Ambiente único:   {loop_speed:>12,.0f} passos/s, {games} partidas, {wins / games:.2%} vitórias")
+
+    vector_env = VectorEnv(4096)
+    observations, info = vector_env.reset(seed=0)
+    steps = games = wins = 0
+    start = perf_counter()
+    while perf_counter() - start < 3:
+        observations, rewards, terminated, truncated, info = vector_env.step(threshold_actions(observations))
+        steps += vector_env.amount
+        games += terminated.sum()
+        wins += (rewards == WIN_REWARD).sum()
+    vector_speed = steps / (perf_counter() - start)
+    print(f"Ambiente vetorial: {vector_speed:>11,.0f} passos/s, {games} partidas, {wins / games:.2%} vitórias "
+          f"({vector_speed / loop_speed:.1f}x)")
@@ -2,24 +2,20 @@
 """
 
 
-from random import randrange, shuffle
-
-from player import Player
+from player import Player, ComputerPlayer
 from dice import Dice
 from turn import Turn
+from engine import GameEngine, _GameStates
 from strings import GameStrings as Strings
-from config import DICES, SCORE_LIMIT, MIN_PLAYERS, MAX_PLAYERS
+from gamelog import GameLog
+import instrument
+from config import MIN_PLAYERS, MAX_PLAYERS, GAME_LOG, RESULTS_DB, INSTRUMENT, WARM_ODDS
+from screen import screen
 from utils import int_input, bool_input, clear_console, stringify
 
 
-# Store game states
-class _GameStates:
-    """Class to store game states.
-    """
-    SETUP = "setup"
-    GAME = "game"
-    DRAW = "draw"
-    END = "end"
+# Players shown in each page of the final ranking
+PAGE_SIZE = 20
 
 
 class Game:
@@ -29,10 +25,13 @@ class Game:
     def __init__(self) -> None:
         """Init game class."""
         self.__players: list[Player] = []
-        self.__dice_pool: list[Dice] = []
-        self.__winners: list[Player] = []
-        self.__round_count = 0
-        self.__highest_score = 0
+        self.__log = GameLog(GAME_LOG) if GAME_LOG else None
+        self.__results = self.__batch = None
+        if RESULTS_DB:
+            import results  # Only loaded when the games are saved
+            self.__results = results.ResultsStore(RESULTS_DB)
+            self.__batch = results.ResultsBatch()
+        self.__engine = self.__create_engine()
         self.__state = _GameStates.SETUP
         self.__game_loop()
 
@@ -41,14 +40,22 @@ class Game:
 
         :return: Single dice.
         """
-        return self.__dice_pool.pop(randrange(0, len(self.__dice_pool)))
+        return self.__engine.take_dice()
 
     def return_dice(self, dice: Dice) -> None:
         """Return dice to the dice pool.
 
         :param dice: Dice to return to the dice pool.
         """
-        self.__dice_pool.append(dice)
+        self.__engine.return_dice(dice)
+
+    @property
+    def engine(self) -> GameEngine:
+        """Returns the rules engine of the game.
+
+        :return: Game engine.
+        """
+        return self.__engine
 
     @property
     def round_count(self) -> int:
@@ -56,7 +63,7 @@ class Game:
 
         :return: Number of the current round count.
         """
-        return self.__round_count
+        return self.__engine.round_count
 
     @property
     def dice_pool(self) -> list[Dice]:
@@ -64,93 +71,97 @@ class Game:
 
         :return: List of dices in the dice pool.
         """
-        return self.__dice_pool
+        return self.__engine.dice_pool
 
-    def shuffle_dice_pool(self) -> None:
-        """Shuffle dices in the dice pool.
-        """
-        shuffle(self.__dice_pool)
+    def __create_engine(self) -> GameEngine:
+        """Create the rules engine for a new game, recording it if the game log or the results database are enabled.
 
-    def __create_dices(self) -> None:
-        """Create dices and fill the dice pool.
+        :return: Game engine.
         """
-        self.__dice_pool.clear()
-        for dice_type in DICES:
-            # Create dices of each color
-            for i in range(DICES[dice_type].amount):
-                dice = Dice(dice_type)
-                self.__dice_pool.append(dice)
-
-        self.shuffle_dice_pool()  # Shuffle dices in dice pool
+        recorder = self.__log.recorder() if self.__log is not None else None
+        if self.__results is not None:
+            import results
+            recorder = results.ResultsRecorder(self.__batch, self.__players, recorder)
+        return GameEngine(self.__players, recorder=recorder)
 
     def display_dices(self) -> None:
         """Show dices in the dice pool.
         """
-        print(Strings.display_dices(self.__dice_pool))
+        screen.print(Strings.display_dices(self.__engine.pool.colors, self.__engine.pool.counts))
 
     def __setup_game(self) -> None:
         """Setup game, players and dices.
         """
         clear_console()
-        print(Strings.greet_user())  # Greet user
-        self.__create_dices()  # Create dices
+        screen.print(Strings.greet_user())  # Greet user
         self.__create_players()   # Create players
-        self.__state = _GameStates.GAME  # Change state to GAME
+        self.__engine.seat_players()  # Shuffle players and create dices
+        if WARM_ODDS:
+            import odds  # Only loaded when the odds are warmed up
+            odds.warm(self.__engine.rules)
+        self.__state = self.__engine.state  # Change state to GAME
 
     def __create_players(self) -> None:
-        """Asks players names, create and store them in the players list, then shuffle it.
+        """Asks players names, create and store them in the players list.
+        Any of the players can be controlled by the computer.
         """
         number_of_players = int_input(Strings.ask_num_players, MIN_PLAYERS, MAX_PLAYERS)  # Ask number of players
-        for player in range(number_of_players):
+        number_of_bots = int_input(Strings.ask_num_bots(number_of_players), 0, number_of_players)
+        for player in range(number_of_players - number_of_bots):
             self.__players.append(Player())
-        shuffle(self.__players)
-        for index, player in enumerate(self.__players):
-            player.index = index
+        for bot in range(number_of_bots):
+            self.__players.append(ComputerPlayer(Strings.bot_name(bot + 1)))
 
     def __end_game(self) -> None:
-        """End game. Show players score and congrats winner.
+        """End game. Save it, show players score and congrats winner.
         """
-        print(Strings.end_game_players(stringify(self.__players), self.__winners[0].name))
-        input(Strings.end_game)
+        if self.__results is not None:
+            self.__results.add(self.__batch)
+            self.__batch.clear()
+        leaderboard = self.__engine.leaderboard
+        pages = leaderboard.pages(PAGE_SIZE)
+        for page in range(pages):
+            if page:
+                clear_console()
+            rows = [(rank, str(player)) for rank, player in leaderboard.page(page, PAGE_SIZE)]
+            screen.print(Strings.end_game_players(rows, self.__engine.winners[0].name, page + 1, pages))
+            if page + 1 == pages or not bool_input(Strings.ask_next_page):
+                break
+        screen.input(Strings.end_game)
         clear_console()
         answer = bool_input(Strings.ask_continue)  # Ask if user wants to play again
         if answer:
             self.__reset_game()  # Set game for next play
         else:
+            if self.__log is not None:
+                self.__log.close()
+            if self.__results is not None:
+                self.__results.close()
+            if INSTRUMENT:
+                instrument.write(INSTRUMENT)
             quit()  # Exit game
 
     def __reset_game(self) -> None:
         """Reset game memory back to initialization.
         """
         self.__players.clear()
-        self.__dice_pool.clear()
-        self.__winners.clear()
-        self.__highest_score = 0
-        self.__round_count = 0
+        self.__engine = self.__create_engine()
         self.__state = _GameStates.SETUP
 
-    def __game_round(self, players: list[Player]) -> None:
+    @instrument.phase("game.game_round")
+    def __game_round(self) -> None:
         """Run a game turn, looping through all players.
         """
-        self.__round_count += 1
+        players = self.__engine.start_round()
         for player in players:
             Turn(self, player)
-            self.__create_dices()
-            if player.score > self.__highest_score:
-                self.__highest_score = player.score  # Update the highest score in the game
+            self.__engine.end_turn(player)  # Refill dice pool and update the highest score
 
         # Check if someone wins or if it's a draw
-        self.__winners.clear()
-        if self.__highest_score >= SCORE_LIMIT:
-            for player in players:
-                if player.score == self.__highest_score:
-                    self.__winners.append(player)  # Save each player that reached the highest score
-                    self.__state = _GameStates.DRAW
-        if self.__winners and len(self.__winners) < 2:
-            # There is only one player with the highest score
-            self.__state = _GameStates.END
-        else:
-            print(Strings.draw(stringify(self.__winners)))  # Inform the user there is a draw
+        self.__engine.end_round(players)
+        self.__state = self.__engine.state
+        if self.__state == _GameStates.DRAW:
+            screen.print(Strings.draw(stringify(self.__engine.winners)))  # Inform the user there is a draw
 
     def __game_loop(self) -> None:
         """All the game happens inside this loop.
@@ -160,9 +171,7 @@ class Game:
             match self.__state:
                 case _GameStates.SETUP:
                     self.__setup_game()  # Set the game up
-                case _GameStates.GAME:
-                    self.__game_round(self.__players)  # Game turn with all players
-                case _GameStates.DRAW:
-                    self.__game_round(self.__winners)  # Game turn with draw players
+                case _GameStates.GAME | _GameStates.DRAW:
+                    self.__game_round()  # Game turn with all players, or only the draw players
                 case _GameStates.END:
                     self.__end_game()  # End the game
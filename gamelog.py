@@ -0,0 +1,254 @@
+"""Append-only binary log of game events, with a side index to seek and replay any game.
+Records are 2 bytes, 4 bits of event type and 12 bits of payload, in the byte order of the host. Larger payloads are
+preceded by EXTEND records holding their high bits, 12 at a time.
+The index holds the first record and the number of records of each game.
+"""
+
+
+import mmap
+from array import array
+from typing import Iterator, Union
+
+from config import BRAIN, RUN, SHOTGUN, DEFAULT_RULES, Rules
+
+
+class Events:
+    """Class to store event types, the payload of each is described next to it.
+    """
+    GAME = 0        # Number of players
+    ROUND = 1       # Round number
+    TURN = 2        # Player index
+    ROLL = 3        # Picked from the pool flag, color index and side index
+    DECISION = 4    # 1 to continue playing, 0 to stop
+    RECYCLE = 5     # Number of BRAIN dices returned to the pool
+    BUST = 6        # Shotguns taken
+    SCORE = 7       # Player score after the turn
+    ROUND_END = 8   # Highest score
+    DRAW = 9        # Number of tied players
+    END = 10        # Winner index
+    EXTEND = 11     # Next 12 high bits of the payload of the following record
+
+
+SIDES = (BRAIN, RUN, SHOTGUN)
+PAYLOAD_MASK = 0x0FFF
+PICKED = 0x0100
+
+# Suffix of the index file
+INDEX_SUFFIX = ".idx"
+
+
+class GameRecorder:
+    """Class recording the events of a single game, written to the log when the game ends.
+
+    :param log: Log the game is appended to.
+    :param colors: Dice colors, in the order of the dices configuration.
+    """
+    __slots__ = ("__log", "__color_index", "__records")
+
+    def __init__(self, log: "GameLog", colors: tuple) -> None:
+        self.__log = log
+        self.__color_index = {color: index for index, color in enumerate(colors)}
+        self.__records = array("H")
+
+    def record(self, event: int, payload: int = 0) -> None:
+        """Record an event.
+
+        :param event: Event type.
+        :param payload: Event payload, the bits above the first 12 go in EXTEND records.
+        """
+        if payload > PAYLOAD_MASK:
+            self.__extend(payload >> 12)
+        self.__records.append(event << 12 | payload & PAYLOAD_MASK)
+
+    def __extend(self, high: int) -> None:
+        """Record the high bits of a payload, from the highest.
+
+        :param high: Payload without its 12 low bits.
+        """
+        if high > PAYLOAD_MASK:
+            self.__extend(high >> 12)
+        self.__records.append(Events.EXTEND << 12 | high & PAYLOAD_MASK)
+
+    def roll(self, color: str, side: str, picked: bool) -> None:
+        """Record a rolled dice.
+
+        :param color: Dice color.
+        :param side: Rolled side.
+        :param picked: If the dice was picked from the pool in this hand, otherwise it was a RUN dice in hand.
+        """
+        payload = picked * PICKED | self.__color_index[color] << 2 | SIDES.index(side)
+        self.__records.append(Events.ROLL << 12 | payload)
+
+    def end(self, winner: int) -> None:
+        """Record the end of the game and append it to the log.
+
+        :param winner: Winner index.
+        """
+        self.record(Events.END, winner)
+        self.__log.append(self.__records)
+
+
+class GameLog:
+    """Class writing and reading the log files.
+
+    :param path: Path of the records file, the index file has the same path plus a suffix.
+    :param rules: Rules the games are played with.
+    """
+
+    def __init__(self, path: str, rules: Rules = DEFAULT_RULES) -> None:
+        self.__path = path
+        self.__rules = rules
+        self.__records_file = None
+        self.__index_file = None
+        self.__maps: list[mmap.mmap] = []
+        self.__records = None
+        self.__index = None
+        self.__stale = True  # If games were appended since the files were mapped
+
+    def __len__(self) -> int:
+        """Return the number of games in the log.
+
+        :return: Number of games.
+        """
+        if self.__stale:
+            self.__map()
+        return len(self.__index) // 2
+
+    def recorder(self) -> GameRecorder:
+        """Create a recorder for a new game.
+
+        :return: Game recorder.
+        """
+        return GameRecorder(self, tuple(self.__rules.dices))
+
+    def append(self, records: array) -> None:
+        """Append the records of a game to the log.
+
+        :param records: Game records.
+        """
+        if self.__records_file is None:
+            self.__records_file = open(self.__path, "ab")
+            self.__index_file = open(self.__path + INDEX_SUFFIX, "ab")
+        first = self.__records_file.tell() // records.itemsize
+        self.__records_file.write(records.tobytes())
+        self.__index_file.write(array("Q", (first, len(records))).tobytes())
+        self.__stale = True
+
+    def close(self) -> None:
+        """Flush and close the log files and their maps.
+        """
+        for file in (self.__records_file, self.__index_file):
+            if file is not None:
+                file.close()
+        self.__records_file = self.__index_file = None
+        self.__unmap()
+
+    def __map(self) -> None:
+        """Memory-map the log files for reading, flushing pending writes first.
+        """
+        for file in (self.__records_file, self.__index_file):
+            if file is not None:
+                file.flush()
+        self.__unmap()
+        self.__records = self.__map_file(self.__path).cast("H")
+        self.__index = self.__map_file(self.__path + INDEX_SUFFIX).cast("Q")
+        self.__stale = False
+
+    def __unmap(self) -> None:
+        """Release the views of the log files and close their maps.
+        """
+        for view in (self.__records, self.__index):
+            if view is not None:
+                view.release()
+        for file_map in self.__maps:
+            file_map.close()
+        self.__maps.clear()
+        self.__records = self.__index = None
+        self.__stale = True
+
+    def __map_file(self, path: str) -> memoryview:
+        """Memory-map a whole file.
+
+        :param path: Path of the file.
+        :return: Read only view of the file, empty if the file doesn't exist yet.
+        """
+        try:
+            with open(path, "rb") as file:
+                self.__maps.append(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+        except FileNotFoundError:
+            return memoryview(b"")  # No game was logged yet
+        except ValueError:
+            return memoryview(b"")  # Empty files can't be mapped
+        return memoryview(self.__maps[-1])
+
+    def events(self, game: int) -> Iterator[tuple[int, int]]:
+        """Decode the events of a game.
+
+        :param game: Index of the game in the log.
+        :return: Iterator of event type and payload.
+        """
+        if self.__stale:
+            self.__map()
+        first, amount = self.__index[2 * game], self.__index[2 * game + 1]
+        high = 0
+        # Copied, so the maps can be closed while the events are read
+        for record in self.__records[first:first + amount].tolist():
+            event, payload = record >> 12, record & PAYLOAD_MASK
+            if event == Events.EXTEND:
+                high = high << 12 | payload
+                continue
+            yield event, high << 12 | payload
+            high = 0
+
+    def replay(self, game: int, names: Union[list[str], None] = None) -> Iterator[str]:
+        """Rebuild what the game showed at each step: the dice pool before picking and the turn after rolling.
+
+        :param game: Index of the game in the log.
+        :param names: Players names, in seat order.
+        :return: Iterator of screens.
+        """
+        import strings
+
+        colors = tuple(self.__rules.dices)
+        amounts = [dice_type.amount for dice_type in self.__rules.dices.values()]
+        scores: list[int] = []
+        player = 0
+        status = {BRAIN: 0, RUN: 0, SHOTGUN: 0}
+        pool: list[int] = []
+        table: list[int] = []
+        picked = 0
+        rolling = picking = False
+        for event, payload in self.events(game):
+            if event != Events.ROLL and rolling:
+                # The hand ended, the turn status was shown
+                rolling = False
+                name = names[player] if names else str(player + 1)
+                yield strings.TurnStrings.display_turn(player + 1, name, status, picked, scores[player])
+            match event:
+                case Events.GAME:
+                    scores = [0] * payload
+                case Events.TURN:
+                    player = payload
+                    status = {BRAIN: 0, RUN: 0, SHOTGUN: 0}
+                    pool = amounts.copy()
+                    table = [0] * len(colors)
+                    picked = 0
+                case Events.ROLL:
+                    color, side = payload >> 2 & 0x3F, SIDES[payload & 0x3]
+                    if not rolling:
+                        rolling, picking = True, False
+                        status[RUN] = 0
+                    if payload & PICKED:
+                        if not picking:
+                            picking = True
+                            yield strings.GameStrings.display_dices(colors, tuple(pool))
+                        pool[color] -= 1
+                        picked += 1
+                    status[side] += 1
+                    if side == BRAIN:
+                        table[color] += 1
+                case Events.RECYCLE:
+                    pool = [count + brains for count, brains in zip(pool, table)]
+                    table = [0] * len(colors)
+                case Events.SCORE:
+                    scores[player] = payload
@@ -0,0 +1,162 @@
+"""Timing and counting of the phases of the game and turn state machines.
+Phases are timed by decorating their methods, the time spent waiting for the user is kept apart from the compute time.
+Decorators are only applied when the instrumentation is turned on in the settings, otherwise the methods are left
+untouched and cost nothing.
+"""
+
+
+import json
+from functools import wraps
+from time import perf_counter_ns
+from typing import Callable, TypeVar
+
+import config
+from stats import QuantileSketch
+
+
+# Quantiles of the latencies exported
+QUANTILES = (0.5, 0.9, 0.99)
+# Prefix of the exported metrics
+PREFIX = "zombie_dice_phase"
+
+Function = TypeVar("Function", bound=Callable)
+
+
+class PhaseTiming:
+    """Calls and latencies of a phase, in nanoseconds.
+    """
+    __slots__ = ("calls", "total", "waited", "latency", "compute")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.total = 0  # Time spent in the phase, waiting included
+        self.waited = 0  # Time spent waiting for the user
+        self.latency = QuantileSketch()
+        self.compute = QuantileSketch()
+
+    def add(self, elapsed: int, waited: int) -> None:
+        """Add a call of the phase.
+
+        :param elapsed: Time spent in the call.
+        :param waited: Part of the time spent waiting for the user.
+        """
+        self.calls += 1
+        self.total += elapsed
+        self.waited += waited
+        self.latency.add(elapsed)
+        self.compute.add(elapsed - waited)
+
+
+# Timing of each phase by name
+phases: dict[str, PhaseTiming] = {}
+# Time spent waiting for the user since the start, phases subtract the waits made during their call
+_waited = [0]
+
+
+def phase(name: str) -> Callable[[Function], Function]:
+    """Decorate a method to time it as a phase, if the instrumentation is on.
+
+    :param name: Name of the phase.
+    :return: Decorator.
+    """
+    def decorate(function: Function) -> Function:
+        if not config.INSTRUMENT:
+            return function
+        timing = phases.setdefault(name, PhaseTiming())
+        waited = _waited
+
+        @wraps(function)
+        def timed(*args, **kwargs):
+            start, start_waited = perf_counter_ns(), waited[0]
+            try:
+                return function(*args, **kwargs)
+            finally:
+                timing.add(perf_counter_ns() - start, waited[0] - start_waited)
+        return timed
+    return decorate
+
+
+def waiting(name: str) -> Callable[[Function], Function]:
+    """Decorate a method waiting for the user, its whole time is waiting and not compute.
+
+    :param name: Name of the phase.
+    :return: Decorator.
+    """
+    def decorate(function: Function) -> Function:
+        if not config.INSTRUMENT:
+            return function
+        timing = phases.setdefault(name, PhaseTiming())
+        waited = _waited
+
+        @wraps(function)
+        def timed(*args, **kwargs):
+            start, start_waited = perf_counter_ns(), waited[0]
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = perf_counter_ns() - start
+                waited[0] = start_waited + elapsed
+                timing.add(elapsed, elapsed)
+        return timed
+    return decorate
+
+
+def snapshot() -> dict[str, dict[str, float]]:
+    """Return the timings of every phase called so far.
+
+    :return: Dict of phase name to its calls, seconds and latency quantiles in seconds.
+    """
+    result = {}
+    for name, timing in phases.items():
+        if not timing.calls:
+            continue
+        result[name] = {
+            "calls": timing.calls,
+            "seconds": timing.total / 1e9,
+            "wait_seconds": timing.waited / 1e9,
+            "compute_seconds": (timing.total - timing.waited) / 1e9,
+            **{f"p{round(q * 100)}_seconds": timing.latency.quantile(q) / 1e9 for q in QUANTILES},
+            **{f"compute_p{round(q * 100)}_seconds": timing.compute.quantile(q) / 1e9 for q in QUANTILES},
+        }
+    return result
+
+
+def prometheus() -> str:
+    """Return the timings of every phase called so far in the Prometheus text format.
+
+    :return: Exposition text.
+    """
+    lines = [f"# HELP {PREFIX}_calls_total Calls of each phase.",
+             f"# TYPE {PREFIX}_calls_total counter"]
+    timings = [(name, timing) for name, timing in phases.items() if timing.calls]
+    for name, timing in timings:
+        lines.append(f'{PREFIX}_calls_total{{phase="{name}"}} {timing.calls}')
+    lines += [f"# HELP {PREFIX}_seconds_total Time spent in each phase, computing or waiting for the user.",
+              f"# TYPE {PREFIX}_seconds_total counter"]
+    for name, timing in timings:
+        lines.append(f'{PREFIX}_seconds_total{{phase="{name}",kind="compute"}} {(timing.total - timing.waited) / 1e9}')
+        lines.append(f'{PREFIX}_seconds_total{{phase="{name}",kind="wait"}} {timing.waited / 1e9}')
+    for metric, kind, help_text in (("latency", "latency", "Latency of each phase, waiting included."),
+                                    ("compute", "compute_latency", "Latency of each phase, without waiting.")):
+        lines += [f"# HELP {PREFIX}_{kind}_seconds {help_text}", f"# TYPE {PREFIX}_{kind}_seconds summary"]
+        for name, timing in timings:
+            sketch = getattr(timing, metric)
+            for q in QUANTILES:
+                lines.append(f'{PREFIX}_{kind}_seconds{{phase="{name}",quantile="{q}"}} {sketch.quantile(q) / 1e9}')
+            total = timing.total if metric == "latency" else timing.total - timing.waited
+            lines.append(f'{PREFIX}_{kind}_seconds_sum{{phase="{name}"}} {total / 1e9}')
+            lines.append(f'{PREFIX}_{kind}_seconds_count{{phase="{name}"}} {timing.calls}')
+    return "\n".join(lines) + "\n"
+
+
+def write(path: str) -> None:
+    """Write the timings to a file, as a JSON snapshot if its name ends in .json, otherwise in the Prometheus text
+    format.
+
+    :param path: Path of the file.
+    """
+    with open(path, "w") as file:
+        if path.endswith(".json"):
+            json.dump(snapshot(), file, indent=2)
+        else:
+            file.write(prometheus())
@@ -0,0 +1,147 @@
+"""Leaderboard of the players of a game, indexed by score.
+Players are kept in buckets by score, with the distinct scores sorted apart. Scores only take a few distinct values,
+so moving a player after a turn, finding the leader and its tie set, and ranking players don't depend on the number of
+players in the game.
+"""
+
+
+from bisect import bisect_left, insort
+from typing import Iterator
+
+
+class Leaderboard:
+    """Class ranking the players by score, ties are ranked by seat.
+
+    :param players: Seated players, any object with index and score attributes.
+    """
+    __slots__ = ("__buckets", "__scores", "__seat_scores")
+
+    def __init__(self, players: list) -> None:
+        self.__buckets: dict[int, dict[int, object]] = {}  # Players by seat, by score
+        self.__scores: list[int] = []  # Distinct scores, in ascending order
+        self.__seat_scores: dict[int, int] = {}  # Score each player is ranked by, by seat
+        for player in players:
+            self.__add(player)
+
+    def __len__(self) -> int:
+        """Return the number of ranked players.
+
+        :return: Number of players.
+        """
+        return len(self.__seat_scores)
+
+    @property
+    def leader_score(self) -> int:
+        """Returns the highest score.
+
+        :return: Highest score, 0 without players.
+        """
+        return self.__scores[-1] if self.__scores else 0
+
+    @property
+    def leaders(self) -> list:
+        """Returns the players with the highest score.
+
+        :return: List of the tied leaders, in seat order.
+        """
+        return self.__bucket(self.leader_score) if self.__scores else []
+
+    def update(self, player) -> None:
+        """Move a player to the bucket of its current score, usually after its turn.
+
+        :param player: Player whose score may have changed.
+        """
+        if self.__seat_scores.get(player.index) == player.score:
+            return
+        self.__remove(player.index)
+        self.__add(player)
+
+    def rank(self, player) -> int:
+        """Return the position of a player, tied players share the same position.
+
+        :param player: Ranked player.
+        :return: 1 for the leaders, plus 1 for each player with a higher score.
+        """
+        score = self.__seat_scores[player.index]
+        higher = self.__scores[bisect_left(self.__scores, score) + 1:]
+        return 1 + sum(len(self.__buckets[higher_score]) for higher_score in higher)
+
+    def ranking(self) -> Iterator[tuple[int, object]]:
+        """Iterate over the players from the highest score down.
+
+        :return: Iterator of position and player.
+        """
+        rank = 1
+        for score in reversed(self.__scores):
+            bucket = self.__bucket(score)
+            for player in bucket:
+                yield rank, player
+            rank += len(bucket)
+
+    def page(self, number: int, size: int) -> list[tuple[int, object]]:
+        """Return a page of the ranking, skipping whole buckets before the page.
+
+        :param number: Page number, starting from 0.
+        :param size: Players in each page.
+        :return: List of position and player.
+        """
+        skip = number * size
+        rank = 1
+        rows = []
+        for score in reversed(self.__scores):
+            players = len(self.__buckets[score])
+            if skip >= players:
+                skip -= players
+                rank += players
+                continue
+            bucket = self.__bucket(score)
+            for player in bucket[skip:skip + size - len(rows)]:
+                rows.append((rank, player))
+            skip = 0
+            rank += players
+            if len(rows) == size:
+                break
+        return rows
+
+    def pages(self, size: int) -> int:
+        """Return the number of pages of the ranking.
+
+        :param size: Players in each page.
+        :return: Number of pages, at least 1.
+        """
+        return max(1, -(-len(self) // size))
+
+    def __bucket(self, score: int) -> list:
+        """Return the players with a score, sorting by seat only the bucket asked for.
+
+        :param score: Score of the bucket.
+        :return: List of players in seat order.
+        """
+        bucket = self.__buckets[score]
+        return [bucket[index] for index in sorted(bucket)]
+
+    def __add(self, player) -> None:
+        """Put a player in the bucket of its score.
+
+        :param player: Player to add.
+        """
+        bucket = self.__buckets.get(player.score)
+        if bucket is None:
+            bucket = self.__buckets[player.score] = {}
+            insort(self.__scores, player.score)
+        bucket[player.index] = player
+        self.__seat_scores[player.index] = player.score
+
+    def __remove(self, index: int) -> None:
+        """Take a player out of its bucket.
+
+        :param index: Seat of the player.
+        """
+        score = self.__seat_scores.pop(index, None)
+        if score is None:
+            return
+        bucket = self.__buckets[score]
+        del bucket[index]
+        if not bucket:
+            del self.__buckets[score]
+            del self.__scores[bisect_left(self.__scores, score)]
@@ -0,0 +1,269 @@
+"""Monte Carlo Tree Search of the decision to keep playing a turn.
+The tree holds the decisions left in the turn being played, each playout finishes the game with every player following
+a threshold strategy. Playouts work on turn states counted per color and on the exact distribution of the brains
+banked by the threshold strategy, so no Dice object is created and each decision gets tens of thousands of playouts.
+"""
+
+
+import atexit
+import math
+import os
+import time
+from bisect import bisect
+from dataclasses import dataclass
+from functools import lru_cache
+from random import Random
+from typing import TYPE_CHECKING, Union
+
+import odds
+from config import DEFAULT_RULES, Rules
+from engine import TurnEngine
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+
+# Actions of a decision
+STOP = 0
+CONTINUE = 1
+
+EXPLORATION = math.sqrt(2)  # Weight of the less visited actions in the tree policy
+ROLLOUT_BRAINS = 4  # Turn brains the playout strategy stops at
+ROLLOUT_SHOTGUNS = 2  # Turn shotguns the playout strategy stops at
+
+
+@dataclass(frozen=True)
+class Position:
+    """Game seen by the player deciding, small enough to be sent to the worker processes.
+
+    :param turn: Turn state, as if the player chose to continue.
+    :param scores: Scores of the players in seat order.
+    :param player: Seat of the player deciding.
+    :param round_players: Seats playing the round, all of them or only the tied ones on a draw.
+    """
+    turn: odds.TurnState
+    scores: tuple[int, ...]
+    player: int
+    round_players: tuple[int, ...]
+
+
+def position(turn: TurnEngine) -> Position:
+    """Read the position of a turn being decided.
+
+    :param turn: Turn of the rules engine, after rolling the dices.
+    :return: Position of the player deciding.
+    """
+    game = turn.game
+    return Position(odds.turn_state(turn), tuple(player.score for player in game.players), turn.player.index,
+                    tuple(player.index for player in game.round_players))
+
+
+@lru_cache(maxsize=None)
+def _hands(state: odds.TurnState, rules: Rules) -> tuple[list[float], list[Union[odds.TurnState, None]]]:
+    """Cumulative distribution of the next hand, to draw it with a single random number.
+
+    :param state: Turn state, after the player chose to continue.
+    :param rules: Rules to play the turn with.
+    :return: Cumulative probabilities and the next turn states, None when the turn is lost.
+    """
+    cumulative = []
+    states = []
+    total = 0.0
+    for next_state, probability in odds.transitions(state, rules):
+        total += probability
+        cumulative.append(total)
+        states.append(None if next_state.shotguns >= rules.shots_limit else next_state)
+    return cumulative, states
+
+
+@lru_cache(maxsize=None)
+def banked(state: odds.TurnState, rules: Rules) -> dict[int, float]:
+    """Distribution of the brains banked by the threshold strategy, playing the turn from a state.
+    A hand of only RUN sides with a full hand leads back to the same state, that chance is spread over the others.
+
+    :param state: Turn state, after the player chose to continue.
+    :param rules: Rules to play the turn with.
+    :return: Dict of banked brains to its probability, lost turns bank nothing.
+    """
+    if state.brains >= ROLLOUT_BRAINS or state.shotguns >= ROLLOUT_SHOTGUNS:
+        return {state.brains: 1.0}
+    refilled = odds.refill(state, rules)
+    distribution: dict[int, float] = {}
+    repeated = 0.0
+    for next_state, probability in odds.transitions(state, rules):
+        if next_state.shotguns >= rules.shots_limit:
+            distribution[0] = distribution.get(0, 0.0) + probability
+        elif next_state == refilled:
+            repeated += probability
+        else:
+            for brains, chance in banked(next_state, rules).items():
+                distribution[brains] = distribution.get(brains, 0.0) + probability * chance
+    return {brains: probability / (1 - repeated) for brains, probability in distribution.items()}
+
+
+@lru_cache(maxsize=None)
+def _banked_table(state: odds.TurnState, rules: Rules) -> tuple[list[float], list[int]]:
+    """Cumulative distribution of the banked brains, to draw them with a single random number.
+
+    :param state: Turn state, after the player chose to continue.
+    :param rules: Rules to play the turn with.
+    :return: Cumulative probabilities and the banked brains.
+    """
+    cumulative = []
+    total = 0.0
+    for probability in banked(state, rules).values():
+        total += probability
+        cumulative.append(total)
+    return cumulative, list(banked(state, rules))
+
+
+def _draw(table: tuple[list[float], list], rng: Random):
+    """Draw an outcome from a cumulative distribution, rounding errors fall on the last outcome.
+
+    :param table: Cumulative probabilities and outcomes.
+    :param rng: Random generator.
+    :return: Drawn outcome.
+    """
+    cumulative, outcomes = table
+    return outcomes[min(bisect(cumulative, rng.random()), len(outcomes) - 1)]
+
+
+def playout(start: Position, brains: int, rng: Random, rules: Rules) -> int:
+    """Finish the game after the turn of the player deciding, the same way the rules engine ends rounds.
+
+    :param start: Position of the player deciding.
+    :param brains: Brains banked in the turn.
+    :param rng: Random generator.
+    :param rules: Rules to play the game with.
+    :return: Seat of the winner.
+    """
+    turn = _banked_table(odds.start_state(rules), rules)
+    scores = list(start.scores)
+    scores[start.player] += brains
+    round_players = start.round_players
+    for seat in round_players[round_players.index(start.player) + 1:]:
+        scores[seat] += _draw(turn, rng)
+    while True:
+        highest = max(scores)
+        if highest >= rules.score_limit:
+            winners = tuple(seat for seat in round_players if scores[seat] == highest)
+            if len(winners) == 1:
+                return winners[0]
+            round_players = winners  # Draw, only the tied players play the next round
+        for seat in round_players:
+            scores[seat] += _draw(turn, rng)
+
+
+# Rules received by this process, by their settings
+_known_rules: dict[tuple, Rules] = {}
+
+
+def _same_rules(rules: Rules) -> Rules:
+    """Return the first copy of equal rules, rules are compared by identity so unpickled copies would miss the caches.
+
+    :param rules: Rules received by a worker.
+    :return: Rules the caches are keyed by.
+    """
+    key = (rules.score_limit, rules.shots_limit, rules.dices_per_round,
+           tuple((color, dice_type.sides, dice_type.amount) for color, dice_type in rules.dices.items()))
+    return _known_rules.setdefault(key, rules)
+
+
+def search(root: Position, limit: float, seed: int, rules: Rules = DEFAULT_RULES) -> tuple[list[int], list[int]]:
+    """Search the decisions of the turn until the time limit, choosing actions in the tree with UCT.
+
+    :param root: Position of the player deciding.
+    :param limit: Seconds to search for.
+    :param seed: Seed of the random generator.
+    :param rules: Rules to play the game with.
+    :return: Visits and wins of each root action.
+    """
+    rules = _same_rules(rules)
+    rng = Random(seed)
+    tree = {root.turn: ([0, 0], [0, 0])}  # Visits and wins of each action by turn state
+    deadline = time.perf_counter() + limit
+    playouts = 0
+    while playouts % 64 or time.perf_counter() < deadline:
+        playouts += 1
+        path = []
+        state = root.turn
+        while True:
+            if state not in tree:
+                # Add the decision to the tree, then finish the turn with the threshold strategy
+                tree[state] = ([0, 0], [0, 0])
+                brains = _draw(_banked_table(state, rules), rng)
+                break
+            visits, wins = tree[state]
+            if not visits[STOP] or not visits[CONTINUE]:
+                action = CONTINUE if visits[STOP] else STOP
+            else:
+                log_total = math.log(visits[STOP] + visits[CONTINUE])
+                action = max((STOP, CONTINUE), key=lambda choice: wins[choice] / visits[choice]
+                             + EXPLORATION * math.sqrt(log_total / visits[choice]))
+            path.append((state, action))
+            if action == STOP:
+                brains = state.brains
+                break
+            state = _draw(_hands(state, rules), rng)
+            if state is None:
+                brains = 0  # Turn lost
+                break
+
+        won = playout(root, brains, rng, rules) == root.player
+        for state, action in path:
+            visits, wins = tree[state]
+            visits[action] += 1
+            wins[action] += won
+    return tree[root.turn]
+
+
+# Worker processes shared by every computer player, by number of workers, started on the first decision
+_executors: dict[int, "ProcessPoolExecutor"] = {}
+
+
+def _executor(workers: int) -> "ProcessPoolExecutor":
+    """Get the worker processes searching the decisions, starting them on their first use.
+
+    :param workers: Number of worker processes.
+    :return: Process pool executor.
+    """
+    executor = _executors.get(workers)
+    if executor is None:
+        from concurrent.futures import ProcessPoolExecutor  # Only loaded when a computer player decides
+        executor = _executors[workers] = ProcessPoolExecutor(workers)
+    return executor
+
+
+def shutdown() -> None:
+    """Stop the worker processes, they are started again by the next decision.
+    """
+    for executor in _executors.values():
+        executor.shutdown(cancel_futures=True)
+    _executors.clear()
+
+
+atexit.register(shutdown)
+
+
+def decide(root: Position, limit: float, workers: Union[int, None] = None,
+           rules: Rules = DEFAULT_RULES) -> tuple[bool, list[int], list[int]]:
+    """Search a decision in every worker process at once and merge their root statistics.
+
+    :param root: Position of the player deciding.
+    :param limit: Seconds each worker searches for.
+    :param workers: Number of worker processes, defaults to the number of cores.
+    :param rules: Rules to play the game with.
+    :return: If the player should keep playing, and the merged visits and wins of each action.
+    """
+    workers = workers or os.cpu_count()
+    executor = _executor(workers)
+    seed = int.from_bytes(os.urandom(8), "little")
+    futures = [executor.submit(search, root, limit, seed + worker, rules) for worker in range(workers)]
+    visits = [0, 0]
+    wins = [0, 0]
+    for future in futures:
+        worker_visits, worker_wins = future.result()
+        for action in (STOP, CONTINUE):
+            visits[action] += worker_visits[action]
+            wins[action] += worker_wins[action]
+    return visits[CONTINUE] > visits[STOP], visits, wins
@@ -0,0 +1,259 @@
+"""Exact turn outcome probabilities.
+Dices of the same color are interchangeable, so states count dices per color and transitions are memoized.
+The sides rolled on a hand only depend on the pool, the RUN dices in hand and the dices picked, so their distributions
+are kept in a bounded cache shared by every turn state reaching them.
+"""
+
+
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import product
+from math import comb, factorial
+from typing import TYPE_CHECKING
+
+from config import BRAIN, RUN, SHOTGUN, DEFAULT_RULES, Rules
+
+if TYPE_CHECKING:
+    import engine
+
+
+# Distributions of the sides rolled kept in memory, the least recently used are dropped first. Every hand reachable
+# with the dices configuration fits
+OUTCOMES_CACHE_SIZE = 4096
+
+
+@dataclass(frozen=True)
+class TurnState:
+    """Turn state with dices counted per color, in the order of the dices configuration.
+
+    :param brains: BRAIN sides accumulated in the turn.
+    :param shotguns: SHOTGUN sides accumulated in the turn.
+    :param hand: RUN dices in hand to be re-rolled.
+    :param pool: Dices left in the dice pool.
+    :param table: BRAIN dices on the table, returned to the pool when it runs short.
+    """
+    brains: int
+    shotguns: int
+    hand: tuple[int, ...]
+    pool: tuple[int, ...]
+    table: tuple[int, ...]
+
+
+def start_state(rules: Rules = DEFAULT_RULES) -> TurnState:
+    """Return the state at the start of a turn, with a full dice pool.
+
+    :param rules: Rules holding the dices configuration.
+    :return: Turn state.
+    """
+    empty = (0,) * len(rules.dices)
+    return TurnState(0, 0, empty, tuple(dice_type.amount for dice_type in rules.dices.values()), empty)
+
+
+def turn_state(turn: "engine.TurnEngine") -> TurnState:
+    """Count the dices of a turn being played, as if the player chose to continue.
+
+    :param turn: Turn of the rules engine, after rolling the dices.
+    :return: Turn state.
+    """
+    # BRAIN dices in hand go to the table when the player continues
+    hand, table = turn.hand_counts, turn.table_counts
+    brains = tuple(in_hand + on_table for in_hand, on_table in zip(hand.side(BRAIN), table.side(BRAIN)))
+    status = turn.round_status
+    return TurnState(status[BRAIN], status[SHOTGUN], hand.side(RUN), turn.game.pool.counts, brains)
+
+
+def refill(state: TurnState, rules: Rules = DEFAULT_RULES) -> TurnState:
+    """Return BRAIN dices from the table to the pool if there aren't enough dices to continue the turn.
+
+    :param state: Turn state.
+    :param rules: Rules to play the turn with.
+    :return: Turn state ready to get dices.
+    """
+    if sum(state.pool) >= rules.dices_per_round - sum(state.hand):
+        return state
+    pool = tuple(pool + table for pool, table in zip(state.pool, state.table))
+    return TurnState(state.brains, state.shotguns, state.hand, pool, (0,) * len(state.table))
+
+
+@lru_cache(maxsize=None)
+def _draws(pool: tuple[int, ...], amount: int) -> tuple[tuple[tuple[int, ...], float], ...]:
+    """Distribution of the dices picked from the pool, per color.
+
+    :param pool: Dices in the pool per color.
+    :param amount: Number of dices to pick.
+    :return: Pairs of picked dices per color and probability.
+    """
+    amount = min(amount, sum(pool))
+    total = comb(sum(pool), amount)
+    draws = []
+    for picked in product(*(range(min(count, amount) + 1) for count in pool)):
+        if sum(picked) == amount:
+            ways = 1
+            for count, taken in zip(pool, picked):
+                ways *= comb(count, taken)
+            draws.append((picked, ways / total))
+    return tuple(draws)
+
+
+@lru_cache(maxsize=None)
+def _color_rolls(amount: int, sides: tuple) -> tuple[tuple[int, int, int, float], ...]:
+    """Distribution of rolling many dices of the same color.
+
+    :param amount: Number of dices.
+    :param sides: Sides of the dices.
+    :return: Tuples of brains, runs, shotguns and probability.
+    """
+    brain, run, shotgun = (sides.count(side) / len(sides) for side in (BRAIN, RUN, SHOTGUN))
+    rolls = []
+    for brains in range(amount + 1):
+        for runs in range(amount - brains + 1):
+            shotguns = amount - brains - runs
+            ways = factorial(amount) // (factorial(brains) * factorial(runs) * factorial(shotguns))
+            probability = ways * brain ** brains * run ** runs * shotgun ** shotguns
+            if probability:
+                rolls.append((brains, runs, shotguns, probability))
+    return tuple(rolls)
+
+
+@lru_cache(maxsize=None)
+def _rolls(dices: tuple[int, ...], rules: Rules) -> tuple[tuple[tuple[int, ...], tuple[int, ...], int, float], ...]:
+    """Distribution of rolling dices of many colors together.
+
+    :param dices: Dices per color.
+    :param rules: Rules holding the dices configuration.
+    :return: Tuples of brains per color, runs per color, shotguns and probability.
+    """
+    per_color = [_color_rolls(amount, dice_type.sides) for amount, dice_type in zip(dices, rules.dices.values())]
+    rolls = []
+    for combination in product(*per_color):
+        probability = 1.0
+        for roll in combination:
+            probability *= roll[3]
+        rolls.append((tuple(roll[0] for roll in combination),
+                      tuple(roll[1] for roll in combination),
+                      sum(roll[2] for roll in combination),
+                      probability))
+    return tuple(rolls)
+
+
+@lru_cache(maxsize=None)
+def transitions(state: TurnState, rules: Rules = DEFAULT_RULES) -> tuple[tuple[TurnState, float], ...]:
+    """Distribution of the turn states after playing one more hand.
+    Shotguns reaching the shots limit mean the turn is lost.
+
+    :param state: Turn state, after the player chose to continue.
+    :param rules: Rules to play the turn with.
+    :return: Pairs of next turn state and probability.
+    """
+    state = refill(state, rules)
+    amount = rules.dices_per_round - sum(state.hand)
+    states: dict[TurnState, float] = {}
+    for picked, draw_probability in _draws(state.pool, amount):
+        pool = tuple(count - taken for count, taken in zip(state.pool, picked))
+        dices = tuple(hand + taken for hand, taken in zip(state.hand, picked))
+        for brains, runs, shotguns, roll_probability in _rolls(dices, rules):
+            next_state = TurnState(state.brains + sum(brains),
+                                   state.shotguns + shotguns,
+                                   runs,
+                                   pool,
+                                   tuple(table + brain for table, brain in zip(state.table, brains)))
+            states[next_state] = states.get(next_state, 0.0) + draw_probability * roll_probability
+    return tuple(states.items())
+
+
+@lru_cache(maxsize=OUTCOMES_CACHE_SIZE)
+def _outcomes(pool: tuple[int, ...], hand: tuple[int, ...], amount: int,
+              rules: Rules) -> tuple[tuple[tuple[int, int, int], float], ...]:
+    """Distribution of the sides rolled, memoized by the canonical key built by outcomes.
+
+    :param pool: Dices in the pool per color.
+    :param hand: RUN dices in hand per color.
+    :param amount: Number of dices picked, no more than the dices in the pool.
+    :param rules: Rules holding the dices configuration.
+    :return: Pairs of rolled brains, runs and shotguns and probability.
+    """
+    distribution: dict[tuple[int, int, int], float] = {}
+    for picked, draw_probability in _draws(pool, amount):
+        dices = tuple(runs + taken for runs, taken in zip(hand, picked))
+        for brains, runs, shotguns, roll_probability in _rolls(dices, rules):
+            key = (sum(brains), sum(runs), shotguns)
+            distribution[key] = distribution.get(key, 0.0) + draw_probability * roll_probability
+    return tuple(distribution.items())
+
+
+def outcomes(pool: tuple[int, ...], hand: tuple[int, ...], amount: int,
+             rules: Rules = DEFAULT_RULES) -> tuple[tuple[tuple[int, int, int], float], ...]:
+    """Distribution of the sides rolled after picking dices from the pool and rolling them with the RUN dices in hand.
+    Distributions are cached, repeated questions are answered without enumerating the draws and rolls again.
+
+    :param pool: Dices in the pool per color.
+    :param hand: RUN dices in hand per color.
+    :param amount: Number of dices to pick from the pool.
+    :param rules: Rules holding the dices configuration.
+    :return: Pairs of rolled brains, runs and shotguns and probability, shared by every caller.
+    """
+    total = sum(pool)
+    return _outcomes(pool, hand, amount if amount < total else total, rules)
+
+
+def outcomes_cache_info() -> tuple[int, int, int, int]:
+    """Return the statistics of the cache of the sides rolled.
+
+    :return: Named tuple of hits, misses, maximum size and current size.
+    """
+    return _outcomes.cache_info()
+
+
+def warm(rules: Rules = DEFAULT_RULES) -> int:
+    """Cache the sides rolled on every hand reachable from a fresh pool, before the first decision asks for them.
+
+    :param rules: Rules to play the turns with.
+    :return: Number of distributions cached.
+    """
+    start = start_state(rules)
+    total = sum(start.pool)
+    seen = {(start.pool, start.hand, start.table)}
+    stack = list(seen)
+    keys = set()
+    while stack:
+        pool, hand, table = stack.pop()
+        if total - sum(pool) - sum(hand) - sum(table) >= rules.shots_limit:
+            continue  # Dices out of the turn are the shotguns, the turn is lost
+        state = refill(TurnState(0, 0, hand, pool, table), rules)
+        amount = min(rules.dices_per_round - sum(state.hand), sum(state.pool))
+        keys.add((state.pool, state.hand, amount))
+        for picked, draw_probability in _draws(state.pool, amount):
+            left = tuple(count - taken for count, taken in zip(state.pool, picked))
+            dices = tuple(runs + taken for runs, taken in zip(state.hand, picked))
+            for brains, runs, shotguns, roll_probability in _rolls(dices, rules):
+                node = (left, runs, tuple(on_table + brain for on_table, brain in zip(state.table, brains)))
+                if node not in seen:
+                    seen.add(node)
+                    stack.append(node)
+    for pool, hand, amount in keys:
+        _outcomes(pool, hand, amount, rules)
+    return len(keys)
+
+
+def roll_distribution(state: TurnState, rules: Rules = DEFAULT_RULES) -> tuple[tuple[tuple[int, int, int], float], ...]:
+    """Distribution of the sides rolled on the next hand.
+
+    :param state: Turn state, after the player chose to continue.
+    :param rules: Rules to play the turn with.
+    :return: Pairs of rolled brains, runs and shotguns and probability.
+    """
+    state = refill(state, rules)
+    return outcomes(state.pool, state.hand, rules.dices_per_round - sum(state.hand), rules)
+
+
+@lru_cache(maxsize=None)
+def bust_probability(state: TurnState, rules: Rules = DEFAULT_RULES) -> float:
+    """Probability of reaching the shots limit on the next hand.
+
+    :param state: Turn state, after the player chose to continue.
+    :param rules: Rules to play the turn with.
+    :return: Probability of losing the turn.
+    """
+    shotguns_left = rules.shots_limit - state.shotguns
+    return sum(probability for (brains, runs, shotguns), probability in roll_distribution(state, rules)
+               if shotguns >= shotguns_left)
@@ -2,18 +2,26 @@
 """
 
 
+from typing import TYPE_CHECKING, Union
+
+from config import BOT_THINK_TIME, BOT_WORKERS
 from strings import PlayerStrings as Strings
 from utils import bool_input, text_input
 
+if TYPE_CHECKING:
+    import engine
+
 
 class Player:
     """Class representing the player.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, name: Union[str, None] = None) -> None:
         """Init player.
+
+        :param name: Name of the player, asked to the user if not given.
         """
-        self.__name = self.__ask_name()
+        self.__name = self.__ask_name() if name is None else name
         self.__score = 0
         self.__index = None
 
@@ -48,6 +56,14 @@ class Player:
         """
         return self.__name
 
+    @property
+    def human(self) -> bool:
+        """Returns if the player is a person, whose decisions are asked to the user.
+
+        :return: Boolean if the player is a person.
+        """
+        return True
+
     @property
     def score(self) -> int:
         """Returns player score.
@@ -73,10 +89,41 @@ class Player:
         return text_input(Strings.ask_name)
 
     @staticmethod
-    def ask_continue(get_dices_amount: int) -> bool:
+    def ask_continue(turn: "engine.TurnEngine") -> bool:
         """Ask if player wants to continue playing more hands in the current turn.
 
-        :param get_dices_amount: Amount of dices to get from the dice pool.
+        :param turn: Turn of the rules engine, after rolling the dices.
+        :return: Boolean if player wants or not to continue playing the turn.
+        """
+        return bool_input(Strings.ask_continue(turn.get_dices_amount))
+
+
+class ComputerPlayer(Player):
+    """Class representing a player controlled by the computer, deciding with a Monte Carlo Tree Search.
+
+    :param name: Name of the player.
+    :param think_time: Seconds spent searching each decision.
+    :param workers: Number of worker processes searching the decisions, defaults to the number of cores.
+    """
+
+    def __init__(self, name: str, think_time: float = BOT_THINK_TIME, workers: Union[int, None] = BOT_WORKERS) -> None:
+        super().__init__(name)
+        self.__think_time = think_time
+        self.__workers = workers
+
+    @property
+    def human(self) -> bool:
+        """Returns if the player is a person, whose decisions are asked to the user.
+
+        :return: Boolean if the player is a person.
+        """
+        return False
+
+    def ask_continue(self, turn: "engine.TurnEngine") -> bool:
+        """Search if it's better to continue playing more hands in the current turn.
+
+        :param turn: Turn of the rules engine, after rolling the dices.
         :return: Boolean if player wants or not to continue playing the turn.
         """
-        return bool_input(Strings.ask_continue(get_dices_amount))
+        import mcts  # Only loaded when a computer player decides
+        return mcts.decide(mcts.position(turn), self.__think_time, self.__workers, turn.game.rules)[0]
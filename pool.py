@@ -0,0 +1,171 @@
+"""Dice pool class, and counts of the dices in the other zones of the turn.
+"""
+
+
+from typing import Iterator
+
+from dice import Dice, random_below
+from config import BRAIN, RUN, SHOTGUN, DEFAULT_RULES, Rules
+
+
+class DicePool:
+    """Class representing the dice pool, dices are kept apart by color.
+    Dices of the same color are interchangeable, so picking a dice only draws its color weighted by the counts.
+
+    :param rules: Rules holding the dices configuration.
+    """
+
+    def __init__(self, rules: Rules = DEFAULT_RULES) -> None:
+        self.__colors = tuple(rules.dices)
+        self.__color_index = {color: index for index, color in enumerate(self.__colors)}
+        # Every dice of the game, created once and reused by all turns
+        self.__all_dices = tuple(tuple(Dice(color, dice_type.sides) for i in range(dice_type.amount))
+                                 for color, dice_type in rules.dices.items())
+        self.__dices: list[list[Dice]] = []
+        self.__total = 0
+        self.reset()
+
+    def __len__(self) -> int:
+        """Return the amount of dices in the pool.
+
+        :return: Number of dices.
+        """
+        return self.__total
+
+    @property
+    def colors(self) -> tuple[str, ...]:
+        """Returns the dice colors, in the order of the counts.
+
+        :return: Tuple of colors.
+        """
+        return self.__colors
+
+    @property
+    def color_index(self) -> dict[str, int]:
+        """Returns the position of each dice color in the counts.
+
+        :return: Dict of color and index.
+        """
+        return self.__color_index
+
+    @property
+    def counts(self) -> tuple[int, ...]:
+        """Returns the amount of dices of each color in the pool.
+
+        :return: Tuple of amounts, in the order of the colors.
+        """
+        return tuple(map(len, self.__dices))
+
+    @property
+    def dices(self) -> list[Dice]:
+        """Returns the dices in the pool.
+
+        :return: List of dices grouped by color, with no side chosen.
+        """
+        return [dice for dices in self.__dices for dice in dices]
+
+    def take(self, buffer: Iterator[int]) -> Dice:
+        """Pop 1 random dice from the pool and return it.
+
+        :param buffer: Stream of random bytes.
+        :return: Single dice, with no side chosen.
+        """
+        target = random_below(buffer, self.__total)
+        for dices in self.__dices:
+            if target < len(dices):
+                break
+            target -= len(dices)
+        self.__total -= 1
+        return dices.pop()
+
+    def put(self, dice: Dice) -> None:
+        """Put a dice back in the pool.
+
+        :param dice: Dice to return to the pool, its side is cleared.
+        """
+        dice.reset_side()
+        self.__dices[self.__color_index[dice.color]].append(dice)
+        self.__total += 1
+
+    def restore(self, counts: tuple[int, ...]) -> list[list[Dice]]:
+        """Set the amount of dices of each color in the pool, as saved in a snapshot.
+
+        :param counts: Amount of dices of each color, in the order of the colors.
+        :return: Dices of each color left out of the pool, to be put in the hand or on the table.
+        """
+        self.__dices = [list(dices[:count]) for dices, count in zip(self.__all_dices, counts)]
+        self.__total = sum(counts)
+        self.__reset_sides()
+        return [list(dices[count:]) for dices, count in zip(self.__all_dices, counts)]
+
+    def reset(self) -> None:
+        """Put every dice of the game back in the pool.
+        """
+        self.__dices = [list(dices) for dices in self.__all_dices]
+        self.__total = sum(len(dices) for dices in self.__all_dices)
+        self.__reset_sides()
+
+    def __reset_sides(self) -> None:
+        """Clear the side of every dice in the pool, dices put back at once still show the side of the last turn.
+        """
+        for dices in self.__dices:
+            for dice in dices:
+                dice.reset_side()
+
+
+class DiceCounts:
+    """Class counting the dices of a zone of the turn, such as the hand or the table, by color and by side.
+    Counts are updated as dices come in or go out, so they are read without walking the dices.
+
+    :param color_index: Position of each dice color in the counts.
+    """
+    __slots__ = ("__color_index", "__sides", "__total")
+
+    def __init__(self, color_index: dict[str, int]) -> None:
+        amount = len(color_index)
+        self.__color_index = color_index
+        # Dices of each color by side, dices not rolled yet are counted under None
+        self.__sides = {None: [0] * amount, BRAIN: [0] * amount, RUN: [0] * amount, SHOTGUN: [0] * amount}
+        self.__total = 0
+
+    def __len__(self) -> int:
+        """Return the amount of dices in the zone.
+
+        :return: Number of dices.
+        """
+        return self.__total
+
+    @property
+    def colors(self) -> tuple[int, ...]:
+        """Returns the amount of dices of each color, rolled or not.
+
+        :return: Tuple of amounts, in the order of the colors.
+        """
+        return tuple(map(sum, zip(*self.__sides.values())))
+
+    def side(self, side: str) -> tuple[int, ...]:
+        """Return the amount of dices of each color showing a side.
+
+        :param side: Dice side.
+        :return: Tuple of amounts, in the order of the colors.
+        """
+        return tuple(self.__sides[side])
+
+    def extend(self, dices: list[Dice]) -> None:
+        """Count the dices coming in the zone.
+
+        :param dices: Dices, rolled or not.
+        """
+        color_index, sides = self.__color_index, self.__sides
+        for dice in dices:
+            sides[dice.value][color_index[dice.color]] += 1
+        self.__total += len(dices)
+
+    def discard(self, side: str) -> None:
+        """Stop counting every dice showing a side, as they all leave the zone.
+
+        :param side: Dice side.
+        """
+        counts = self.__sides[side]
+        self.__total -= sum(counts)
+        counts[:] = (0,) * len(counts)
@@ -0,0 +1,241 @@
+"""Persistent store of finished games in a local SQLite database.
+Games are gathered in batches of rows, numbered from 0 until the store gives them their ids, so simulation workers can
+fill them apart and the store writes each batch at once in a single transaction.
+"""
+
+
+import argparse
+import sqlite3
+from typing import Iterable, Union
+
+from gamelog import Events, GameRecorder
+from strings import ResultsStrings as Strings
+
+
+SCHEMA = """
+PRAGMA journal_mode = WAL;
+PRAGMA synchronous = NORMAL;
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    players INTEGER NOT NULL,
+    rounds INTEGER NOT NULL,
+    draws INTEGER NOT NULL,  -- Draw rounds played after the score limit was reached
+    winner INTEGER NOT NULL  -- Seat of the winner
+);
+CREATE TABLE IF NOT EXISTS seats (
+    game INTEGER NOT NULL,
+    seat INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    winner INTEGER NOT NULL,
+    PRIMARY KEY (game, seat)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS turns (
+    game INTEGER NOT NULL,
+    round INTEGER NOT NULL,
+    seat INTEGER NOT NULL,
+    brains INTEGER NOT NULL,  -- Brains banked, 0 when the turn was lost
+    busted INTEGER NOT NULL,
+    hands INTEGER NOT NULL,
+    recycles INTEGER NOT NULL,
+    PRIMARY KEY (game, round, seat)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS seats_wins ON seats (seat, winner);
+CREATE INDEX IF NOT EXISTS seats_scores ON seats (name, score);
+CREATE INDEX IF NOT EXISTS games_rounds ON games (rounds);
+"""
+
+
+class ResultsBatch:
+    """Rows of finished games waiting to be written, games are numbered from 0 in the batch.
+    """
+    __slots__ = ("games", "seats", "turns")
+
+    def __init__(self) -> None:
+        self.games: list[tuple[int, int, int, int, int]] = []  # Game, players, rounds, draws and winner seat
+        self.seats: list[tuple[int, int, str, int, bool]] = []  # Game, seat, name, score and if it won
+        self.turns: list[tuple[int, int, int, int, bool, int, int]] = []  # Game, round, seat and turn outcome
+
+    def __len__(self) -> int:
+        """Return the number of games in the batch.
+
+        :return: Number of games.
+        """
+        return len(self.games)
+
+    def add_game(self, players: list, rounds: int, draws: int, winner: int,
+                 turns: Iterable[tuple[int, int, int, bool, int, int]]) -> None:
+        """Add a finished game.
+
+        :param players: Players in seat order, any object with index, name and score attributes.
+        :param rounds: Rounds of the game, draw rounds included.
+        :param draws: Draw rounds of the game.
+        :param winner: Winner index.
+        :param turns: Round, seat, brains banked, if it was lost, hands rolled and recycles of each turn.
+        """
+        game = len(self.games)
+        self.games.append((game, len(players), rounds, draws, winner))
+        self.seats.extend((game, player.index, player.name, player.score, player.index == winner)
+                          for player in players)
+        self.turns.extend((game, *turn) for turn in turns)
+
+    def clear(self) -> None:
+        """Forget the games once they are written.
+        """
+        self.games.clear()
+        self.seats.clear()
+        self.turns.clear()
+
+
+class ResultsRecorder:
+    """Recorder of the rules engine adding every game it's passed to a batch, in place of a game log recorder.
+    Events can be passed on to another recorder, so a game can also be logged.
+
+    :param batch: Batch the finished games are added to.
+    :param players: Players of the games, in seat order once they are seated.
+    :param forward: Recorder the events are passed on to, if any.
+    """
+    __slots__ = ("batch", "players", "__forward", "__turns", "__scores", "__player", "__hands", "__recycles",
+                 "__round", "__draws")
+
+    def __init__(self, batch: ResultsBatch, players: list, forward: Union[GameRecorder, None] = None) -> None:
+        self.batch = batch
+        self.players = players
+        self.__forward = forward
+        self.__turns: list[tuple[int, int, int, bool, int, int]] = []
+        self.__scores: list[int] = []
+        self.__player = 0
+        self.__hands = 0
+        self.__recycles = 0
+        self.__round = 0
+        self.__draws = 0
+
+    def record(self, event: int, payload: int = 0) -> None:
+        """Follow an event of the game.
+
+        :param event: Event type.
+        :param payload: Event payload.
+        """
+        match event:
+            case Events.GAME:
+                self.__scores = [0] * payload
+                self.__turns = []
+                self.__draws = 0
+            case Events.ROUND:
+                self.__round = payload
+            case Events.TURN:
+                self.__player = payload
+                self.__hands = 1
+                self.__recycles = 0
+            case Events.DECISION:
+                self.__hands += payload
+            case Events.RECYCLE:
+                self.__recycles += 1
+            case Events.BUST:
+                self.__turns.append((self.__round, self.__player, 0, True, self.__hands, self.__recycles))
+            case Events.SCORE:
+                self.__turns.append((self.__round, self.__player, payload - self.__scores[self.__player], False,
+                                     self.__hands, self.__recycles))
+                self.__scores[self.__player] = payload
+            case Events.DRAW:
+                self.__draws += 1
+        if self.__forward:
+            self.__forward.record(event, payload)
+
+    def roll(self, color: str, side: str, picked: bool) -> None:
+        """Rolled dices aren't stored, they are only passed on.
+
+        :param color: Dice color.
+        :param side: Rolled side.
+        :param picked: If the dice was picked from the pool in this hand.
+        """
+        if self.__forward:
+            self.__forward.roll(color, side, picked)
+
+    def end(self, winner: int) -> None:
+        """Add the game to the batch once it ends.
+
+        :param winner: Winner index.
+        """
+        self.batch.add_game(self.players, self.__round, self.__draws, winner, self.__turns)
+        if self.__forward:
+            self.__forward.end(winner)
+
+
+class ResultsStore:
+    """Class writing and querying the database of finished games.
+
+    :param path: Path of the database file, created if it doesn't exist.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.__connection = sqlite3.connect(path)
+        self.__connection.executescript(SCHEMA)
+
+    def __len__(self) -> int:
+        """Return the number of games stored.
+
+        :return: Number of games.
+        """
+        return self.__connection.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+
+    def add(self, batch: ResultsBatch) -> None:
+        """Write the games of a batch in a single transaction, after the games already stored.
+
+        :param batch: Batch of finished games.
+        """
+        if not batch:
+            return
+        with self.__connection:
+            first = self.__connection.execute("SELECT COALESCE(MAX(id) + 1, 0) FROM games").fetchone()[0]
+            self.__connection.executemany("INSERT INTO games VALUES (?, ?, ?, ?, ?)",
+                                          ((first + game, *row) for game, *row in batch.games))
+            self.__connection.executemany("INSERT INTO seats VALUES (?, ?, ?, ?, ?)",
+                                          ((first + game, *row) for game, *row in batch.seats))
+            self.__connection.executemany("INSERT INTO turns VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                          ((first + game, *row) for game, *row in batch.turns))
+
+    def seat_wins(self) -> list[tuple[int, int, int]]:
+        """Return the games played and won from each seat.
+
+        :return: List of seat, games and wins.
+        """
+        return self.__connection.execute("SELECT seat, COUNT(*), SUM(winner) FROM seats GROUP BY seat").fetchall()
+
+    def scores(self, name: str) -> list[tuple[int, int]]:
+        """Return the distribution of the final scores of a player.
+
+        :param name: Name of the player, or of the strategy of a computer player.
+        :return: List of score and games, from the lowest score.
+        """
+        return self.__connection.execute("SELECT score, COUNT(*) FROM seats WHERE name = ? GROUP BY score",
+                                         (name,)).fetchall()
+
+    def longest_games(self, amount: int) -> list[tuple[int, int, int, int]]:
+        """Return the games with the most rounds.
+
+        :param amount: Number of games.
+        :return: List of game id, rounds, draw rounds and players.
+        """
+        return self.__connection.execute("SELECT id, rounds, draws, players FROM games ORDER BY rounds DESC LIMIT ?",
+                                         (amount,)).fetchall()
+
+    def close(self) -> None:
+        """Close the database.
+        """
+        self.__connection.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=Strings.description)
+    parser.add_argument("database", help=Strings.help_database)
+    parser.add_argument("-n", "--name", action="append", default=[], help=Strings.help_name)
+    parser.add_argument("-l", "--longest", type=int, default=5, help=Strings.help_longest)
+    args = parser.parse_args()
+
+    store = ResultsStore(args.database)
+    print(Strings.seat_wins(store.seat_wins()))
+    for name in args.name:
+        print(Strings.scores(name, store.scores(name)))
+    print(Strings.longest_games(store.longest_games(args.longest)))
+    store.close()
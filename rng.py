@@ -0,0 +1,117 @@
+"""Counter-based random generator, every stream is keyed by a seed and stream indexes.
+Any stream can be recreated alone, without drawing the streams before it.
+"""
+
+
+import os
+from hashlib import blake2b
+from random import Random
+from typing import Union
+
+
+# Hash blocks generated at once, each block holds 64 random bytes
+BLOCKS = 8
+
+
+class StreamRandom(Random):
+    """Random generator whose bytes are the hash of a stream key and a block counter.
+    Bytes are generated in bulk, the usual Random methods draw from the generated bytes.
+
+    :param seed: Seed of the run, defaults to a random one.
+    :param stream: Indexes of the stream in the run, such as the game index.
+    """
+
+    def __init__(self, seed: Union[int, str, None] = None, *stream: int) -> None:
+        self.__stream = stream
+        super().__init__(seed)
+
+    def seed(self, a: Union[int, str, None] = None, version: int = 2) -> None:
+        """Start the stream from its first block.
+
+        :param a: Seed of the run, defaults to a random one.
+        :param version: Unused, kept for compatibility with Random.
+        """
+        if a is None:
+            a = int.from_bytes(os.urandom(16), "little")
+        self.__seed = a
+        self.__key = blake2b(repr((a, *self.__stream)).encode(), digest_size=32).digest()
+        self.__counter = 0
+        self.__buffer = b""
+        self.__position = 0
+        self.gauss_next = None
+
+    @property
+    def stream(self) -> tuple:
+        """Returns the seed and the indexes identifying the stream.
+
+        :return: Tuple of seed and stream indexes.
+        """
+        return (self.__seed, *self.__stream)
+
+    def getstate(self) -> tuple:
+        """Return the generator state, it only needs the stream and the position in it.
+
+        :return: Tuple of stream and position.
+        """
+        return self.stream, self.__counter, self.__position, self.gauss_next
+
+    def setstate(self, state: tuple) -> None:
+        """Restore a state returned by getstate.
+
+        :param state: Tuple of stream and position.
+        """
+        stream, counter, position, gauss_next = state
+        self.__stream = stream[1:]
+        self.seed(stream[0])
+        if counter:
+            self.__counter = counter - BLOCKS
+            self.__fill()
+        self.__position = position
+        self.gauss_next = gauss_next
+
+    def __fill(self) -> None:
+        """Generate the next blocks of random bytes.
+        """
+        key = self.__key
+        counter = self.__counter
+        self.__buffer = b"".join(blake2b(index.to_bytes(8, "little"), key=key).digest()
+                                 for index in range(counter, counter + BLOCKS))
+        self.__counter = counter + BLOCKS
+        self.__position = 0
+
+    def randbytes(self, n: int) -> bytes:
+        """Return n random bytes.
+
+        :param n: Number of bytes.
+        :return: Random bytes.
+        """
+        position = self.__position
+        if position + n <= len(self.__buffer):
+            self.__position = position + n
+            return self.__buffer[position:position + n]
+        chunks = [self.__buffer[position:]]
+        missing = n - len(chunks[0])
+        while missing > 0:
+            self.__fill()
+            chunk = self.__buffer[:missing]
+            self.__position = len(chunk)
+            chunks.append(chunk)
+            missing -= len(chunk)
+        return b"".join(chunks)
+
+    def getrandbits(self, k: int) -> int:
+        """Return an integer with k random bits.
+
+        :param k: Number of bits.
+        :return: Random integer.
+        """
+        if k < 0:
+            raise ValueError("number of bits must be non-negative")
+        return int.from_bytes(self.randbytes((k + 7) // 8), "little") >> (-k % 8)
+
+    def random(self) -> float:
+        """Return a random float in the interval [0, 1).
+
+        :return: Random float.
+        """
+        return (int.from_bytes(self.randbytes(7), "little") >> 3) * 2 ** -53
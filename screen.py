@@ -0,0 +1,122 @@
+"""Frame buffered terminal output.
+Each screen is built in a buffer and drawn with ANSI sequences, writing only the lines that changed since the last
+drawn frame, with a single write and flush per frame.
+"""
+
+
+import re
+import sys
+from typing import TextIO
+
+import config
+import instrument
+
+
+# ANSI sequences
+HOME_CLEAR = "\033[H\033[2J"
+CLEAR_LINE = "\033[K"
+CLEAR_BELOW = "\033[J"
+MOVE_TO_ROW = "\033[{}H"
+STYLE_CODE = re.compile(r"\033\[[0-9;]*m")
+
+
+class Screen:
+    """Class representing the terminal screen, frames are drawn from its top left corner.
+
+    :param stream: Stream the frames are written to.
+    """
+
+    def __init__(self, stream: TextIO = sys.stdout) -> None:
+        self.__stream = stream
+        self.__ansi = stream.isatty() and config.USE_STYLES  # Same as styles, ANSI sequences must be supported
+        self.__text = ""  # Text of the current frame
+        self.__written = 0  # Length of the text already drawn
+        self.__drawn: list[str] = []  # Lines shown in the terminal, from its top
+        self.__fresh = True  # If the terminal has to be cleared before drawing
+
+    def clear(self) -> None:
+        """Start a new frame, the previous one stays in the terminal until the new one is drawn over it.
+        Text printed and not yet drawn is discarded.
+        """
+        self.__text = ""
+        self.__written = 0
+
+    def print(self, *values: object, end: str = "\n") -> None:
+        """Add text to the frame, the same way the built-in print would.
+
+        :param values: Values to add.
+        :param end: String appended after the values.
+        """
+        self.__text += " ".join(str(value) for value in values) + end
+
+    def flush(self) -> None:
+        """Draw the frame.
+        """
+        if self.__written == len(self.__text):
+            return
+        if not self.__ansi or self.__written:
+            # Without a terminal, or once the frame was drawn, the new text just follows the cursor
+            output = self.__text[self.__written:]
+        else:
+            output = self.__diff(self.__text.split("\n"))
+        if self.__ansi:
+            self.__drawn = self.__text.split("\n")
+        self.__stream.write(output)
+        self.__stream.flush()
+        self.__written = len(self.__text)
+
+    @instrument.waiting("screen.input")
+    def input(self, prompt: str = "") -> str:
+        """Draw the frame with the prompt and read a line, as the built-in input would.
+
+        :param prompt: Prompt shown at the end of the frame.
+        :return: Line read, without the line break.
+        """
+        self.print(prompt, end="")
+        self.flush()
+        answer = input()
+        # The terminal echoed the answer and the line break
+        self.__text += answer + "\n"
+        self.__written = len(self.__text)
+        if self.__ansi:
+            self.__drawn = self.__text.split("\n")
+        return answer
+
+    def __diff(self, lines: list[str]) -> str:
+        """Build the output turning the drawn lines into the lines of a new frame.
+        It redraws the whole frame if either frame doesn't fit the terminal, as scrolled rows can't be reached.
+
+        :param lines: Lines of the frame, the last one holds the cursor.
+        :return: Output with the ANSI sequences.
+        """
+        width, height = config.TERMINAL_WIDTH, config.TERMINAL_HEIGHT
+        drawn = self.__drawn
+        rows, drawn_rows = self.__rows(lines, width), self.__rows(drawn, width)
+        if self.__fresh or rows[-1] > height or drawn_rows[-1] > height:
+            self.__fresh = False
+            return HOME_CLEAR + "\n".join(lines)
+
+        output = []
+        last = len(lines) - 1
+        for index, line in enumerate(lines):
+            # A line drawn with the same text on the same row is still right
+            if index == last or index >= len(drawn) or drawn[index] != line or drawn_rows[index] != rows[index]:
+                output.append(f"{MOVE_TO_ROW.format(rows[index] + 1)}{line}{CLEAR_LINE}")
+        return "".join(output) + CLEAR_BELOW
+
+    @staticmethod
+    def __rows(lines: list[str], width: int) -> list[int]:
+        """Find the terminal row each line starts at, long lines wrap into more rows.
+
+        :param lines: Lines of a frame.
+        :param width: Terminal width.
+        :return: List of the first row of each line, plus the row after the last line.
+        """
+        rows = [0]
+        for line in lines:
+            length = len(STYLE_CODE.sub("", line))
+            rows.append(rows[-1] + max(1, -(-length // width)))
+        return rows
+
+
+screen = Screen()
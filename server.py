@@ -0,0 +1,546 @@
+"""Multiplayer server hosting many game tables in a single process, players connect over TCP.
+Each table runs the game and turn state machines as a coroutine, waiting for the players decisions without blocking.
+
+Every message is a line of space separated fields, the first being the command or reply name.
+"""
+
+
+import argparse
+import asyncio
+import multiprocessing
+import random
+import time
+from collections import deque
+from statistics import median, quantiles
+from typing import Union
+
+from engine import GameEngine, TurnEngine, _GameStates, _TurnStates
+from config import BRAIN, SHOTGUN, MIN_PLAYERS, MAX_PLAYERS
+from strings import ServerStrings as Strings
+
+
+# Default address
+HOST = "127.0.0.1"
+PORT = 7777
+
+# Seconds a player has to join a table or to decide, the decision defaults to stopping the turn
+IDLE_TIMEOUT = 60
+
+# Latencies kept to report the server statistics
+LATENCY_SAMPLES = 100_000
+
+
+class Commands:
+    """Class to store the commands sent by the players, the arguments are described next to each.
+    """
+    JOIN = "JOIN"       # Table name, number of players and player name without spaces, the game starts when full
+    ROLL = "ROLL"       # Keep playing the turn
+    STOP = "STOP"       # End the turn, saving the brains
+    STATS = "STATS"     # Server statistics
+    QUIT = "QUIT"       # Leave the server
+
+
+class Replies:
+    """Class to store the replies sent to the players, the fields are described next to each.
+    """
+    WAIT = "WAIT"           # Players joined and table size
+    PLAYER = "PLAYER"       # Seat and name of a player, sent for each seat when the game starts
+    START = "START"         # Seat of the player receiving it
+    ROUND = "ROUND"         # Round number
+    TURN = "TURN"           # Seat playing the turn
+    ROLL = "ROLL"           # Seat and color:side of each rolled dice
+    HAND = "HAND"           # Seat, brains, shotguns and dices picked in the turn
+    ASK = "ASK"             # Dices to pick if the player keeps playing, only sent to the player deciding
+    RECYCLE = "RECYCLE"     # Seat, brain dices returned to the pool
+    BUST = "BUST"           # Seat and shotguns taken
+    SCORE = "SCORE"         # Seat and score
+    DRAW = "DRAW"           # Seats of the tied players
+    WIN = "WIN"             # Seat of the winner
+    TIMEOUT = "TIMEOUT"     # The player took too long, the turn was stopped
+    STATS = "STATS"         # Open tables, finished games, CPU seconds, steps, median and p99 latency in ms and
+                            # abandoned games
+    ERROR = "ERROR"         # Reason: command, size, name, full or turn
+
+
+class RemotePlayer:
+    """Class representing a player connected to the server.
+    """
+    __slots__ = ("index", "score", "name", "writer", "table", "decisions", "asked", "connected")
+
+    def __init__(self, name: str, writer: asyncio.StreamWriter, table: "Table") -> None:
+        """Init player.
+
+        :param name: Name of the player.
+        :param writer: Stream to the player connection.
+        :param table: Table the player joined.
+        """
+        self.index: Union[int, None] = None
+        self.score = 0
+        self.name = name
+        self.writer = writer
+        self.table = table
+        self.decisions: asyncio.Queue[tuple[bool, float]] = asyncio.Queue()
+        self.asked = False
+        self.connected = True
+
+    def send(self, *fields: object) -> None:
+        """Send a message to the player, buffered until the connection is free.
+
+        :param fields: Fields of the message.
+        """
+        if self.connected:
+            self.writer.write(f"{' '.join(str(field) for field in fields)}\n".encode())
+
+
+class Table:
+    """Class representing a game table, the game starts as soon as every seat is taken.
+
+    :param name: Name of the table.
+    :param size: Number of players.
+    :param server: Server hosting the table.
+    """
+
+    def __init__(self, name: str, size: int, server: "Server") -> None:
+        self.__name = name
+        self.__size = size
+        self.__server = server
+        self.__players: list[RemotePlayer] = []
+        self.__engine = GameEngine(self.__players)
+        self.__received: Union[float, None] = None  # When the last decision arrived
+
+    @property
+    def name(self) -> str:
+        """Returns the table name.
+
+        :return: Name of the table.
+        """
+        return self.__name
+
+    @property
+    def full(self) -> bool:
+        """Returns if every seat is taken.
+
+        :return: If the table is full.
+        """
+        return len(self.__players) == self.__size
+
+    @property
+    def players(self) -> list[RemotePlayer]:
+        """Returns the players at the table.
+
+        :return: List of players.
+        """
+        return self.__players
+
+    @property
+    def started(self) -> bool:
+        """Returns if the game started.
+
+        :return: If the game started.
+        """
+        return self.__engine.state != _GameStates.SETUP
+
+    @property
+    def finished(self) -> bool:
+        """Returns if the game was played until someone won, instead of being left by every player.
+
+        :return: If the game finished.
+        """
+        return self.__engine.state == _GameStates.END
+
+    def join(self, player: RemotePlayer) -> None:
+        """Seat a player, starting the game when the table is full.
+
+        :param player: Player joining.
+        """
+        self.__players.append(player)
+        self.broadcast(Replies.WAIT, len(self.__players), self.__size)
+        if self.full:
+            self.__engine.seat_players()  # Shuffle the players, no one else can join
+            self.__server.start(self)
+
+    def leave(self, player: RemotePlayer) -> None:
+        """Free the seat of a player that left before the game started.
+
+        :param player: Player leaving.
+        """
+        self.__players.remove(player)
+        self.broadcast(Replies.WAIT, len(self.__players), self.__size)
+
+    def broadcast(self, *fields: object) -> None:
+        """Send a message to every player at the table.
+
+        :param fields: Fields of the message.
+        """
+        for player in self.__players:
+            player.send(*fields)
+
+    async def play(self) -> None:
+        """Play the game through its states until someone wins or everyone leaves.
+        """
+        engine = self.__engine
+        for player in self.__players:
+            self.broadcast(Replies.PLAYER, player.index, player.name)
+        for player in self.__players:
+            player.send(Replies.START, player.index)
+
+        while True:
+            if not any(player.connected for player in self.__players):
+                return
+            match engine.state:
+                case _GameStates.GAME | _GameStates.DRAW:
+                    await self.__round()
+                case _GameStates.END:
+                    self.broadcast(Replies.WIN, engine.winners[0].index)
+                    self.__record_latency()
+                    await self.close()
+                    return
+
+    async def close(self) -> None:
+        """Send the pending messages and close every connection.
+        """
+        for player in self.__players:
+            if player.connected:
+                player.connected = False
+                player.writer.close()
+        await asyncio.gather(*(player.writer.wait_closed() for player in self.__players), return_exceptions=True)
+
+    async def __round(self) -> None:
+        """Play a round with all players, or only the tied ones on a draw.
+        """
+        engine = self.__engine
+        players = engine.start_round()
+        self.broadcast(Replies.ROUND, engine.round_count)
+        for player in players:
+            await self.__turn(player)
+            engine.end_turn(player)
+        engine.end_round(players)
+        if engine.state == _GameStates.DRAW:
+            self.broadcast(Replies.DRAW, *(player.index for player in engine.winners))
+
+    async def __turn(self, player: RemotePlayer) -> None:
+        """Play a player turn through its states.
+
+        :param player: Player playing the turn.
+        """
+        turn = TurnEngine(self.__engine, player)
+        self.broadcast(Replies.TURN, player.index)
+        while True:
+            match turn.state:
+                case _TurnStates.GAME:
+                    turn.get_dices()
+                    turn.roll_dices()
+                    self.broadcast(Replies.ROLL, player.index,
+                                   *(f"{dice.color}:{dice.value}" for dice in turn.hand_dices))
+                    self.broadcast(Replies.HAND, player.index, turn.round_status[BRAIN],
+                                   turn.round_status[SHOTGUN], turn.amount_picked_dices)
+                    if turn.state == _TurnStates.GAME:
+                        brains = len(turn.table_counts)
+                        if turn.choose(await self.__decide(player, turn.get_dices_amount)):
+                            self.broadcast(Replies.RECYCLE, player.index, brains - len(turn.table_counts))
+                case _TurnStates.END:
+                    turn.end_round()
+                    self.broadcast(Replies.SCORE, player.index, player.score)
+                case _TurnStates.LOST:
+                    turn.lost()
+                    self.broadcast(Replies.BUST, player.index, turn.round_status[SHOTGUN])
+                case _TurnStates.EXIT:
+                    return
+
+    async def __decide(self, player: RemotePlayer, amount: int) -> bool:
+        """Ask the player if they keep playing the turn, stopping it when they leave or take too long.
+
+        :param player: Player deciding.
+        :param amount: Dices to pick if the player keeps playing.
+        :return: If the player keeps playing the turn.
+        """
+        if not player.connected:
+            return False
+        player.send(Replies.ASK, amount)
+        self.__record_latency()
+        player.asked = True
+        try:
+            await player.writer.drain()
+            keep_playing, self.__received = await asyncio.wait_for(player.decisions.get(), IDLE_TIMEOUT)
+        except (asyncio.TimeoutError, ConnectionError):
+            player.send(Replies.TIMEOUT)
+            keep_playing = False
+        finally:
+            player.asked = False
+        return keep_playing
+
+    def __record_latency(self) -> None:
+        """Record the time taken to answer the last decision.
+        """
+        if self.__received is not None:
+            self.__server.latencies.append(time.perf_counter() - self.__received)
+            self.__received = None
+
+
+class Server:
+    """Class hosting the tables and handling the player connections.
+    """
+
+    def __init__(self) -> None:
+        self.__tables: dict[str, Table] = {}
+        self.__tasks: set[asyncio.Task] = set()
+        self.__games = 0
+        self.__abandoned = 0
+        self.latencies: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+    def start(self, table: Table) -> None:
+        """Start the game of a full table, the table is removed when the game ends.
+
+        :param table: Table to play.
+        """
+        task = asyncio.create_task(table.play())
+        self.__tasks.add(task)
+        task.add_done_callback(lambda done: self.__finish(table, done))
+
+    def __finish(self, table: Table, task: asyncio.Task) -> None:
+        """Remove a table whose game ended, or that every player left.
+
+        :param table: Table that ended.
+        :param task: Task that played the table.
+        """
+        self.__tasks.discard(task)
+        self.__tables.pop(table.name, None)
+        if table.finished:
+            self.__games += 1
+        else:
+            self.__abandoned += 1
+
+    def stats(self) -> tuple:
+        """Returns the server statistics.
+
+        :return: Open tables, finished games, CPU seconds, steps, median and p99 latency in milliseconds and abandoned
+        games.
+        """
+        latencies = sorted(self.latencies)
+        p50 = latencies[len(latencies) // 2] * 1000 if latencies else 0.0
+        p99 = latencies[len(latencies) * 99 // 100] * 1000 if latencies else 0.0
+        return len(self.__tables), self.__games, f"{time.process_time():.3f}", len(latencies), f"{p50:.3f}", \
+            f"{p99:.3f}", self.__abandoned
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Read the commands of a connection until it leaves.
+
+        :param reader: Stream from the connection.
+        :param writer: Stream to the connection.
+        """
+        player: Union[RemotePlayer, None] = None
+        try:
+            while True:
+                try:
+                    # Players of a started game are timed out by the table when they are asked to decide
+                    idle = IDLE_TIMEOUT if player is None or not player.table.started else None
+                    line = await asyncio.wait_for(reader.readline(), idle)
+                except asyncio.TimeoutError:
+                    if player is not None and player.table.started:
+                        continue  # The table filled up while the player waited
+                    writer.write(f"{Replies.TIMEOUT}\n".encode())
+                    break  # A player waiting for the table to fill up leaves their seat
+                if not line:
+                    break
+                fields = line.decode(errors="replace").split(maxsplit=3)
+                if not fields:
+                    continue  # Blank line
+                command, *args = fields
+                match command:
+                    case Commands.JOIN if player is None:
+                        player = self.__join(args, writer)
+                    case Commands.ROLL | Commands.STOP if player is not None and player.asked:
+                        player.decisions.put_nowait((command == Commands.ROLL, time.perf_counter()))
+                    case Commands.ROLL | Commands.STOP:
+                        writer.write(f"{Replies.ERROR} turn\n".encode())
+                    case Commands.STATS:
+                        writer.write(f"{' '.join(str(field) for field in (Replies.STATS, *self.stats()))}\n".encode())
+                    case Commands.QUIT:
+                        break
+                    case _:
+                        writer.write(f"{Replies.ERROR} command\n".encode())
+        except ConnectionError:
+            pass
+        finally:
+            if player is not None:
+                player.connected = False
+                if player.asked:
+                    player.decisions.put_nowait((False, time.perf_counter()))
+                elif not player.table.started:
+                    self.__leave(player)
+            writer.close()
+
+    def __leave(self, player: RemotePlayer) -> None:
+        """Free the seat of a player that left a table waiting for players, removing the table when empty.
+
+        :param player: Player leaving.
+        """
+        player.table.leave(player)
+        if not player.table.players:
+            self.__tables.pop(player.table.name, None)
+
+    def __join(self, args: list[str], writer: asyncio.StreamWriter) -> Union[RemotePlayer, None]:
+        """Seat a player at a table, creating the table if it doesn't exist.
+
+        :param args: Table name, number of players and player name.
+        :param writer: Stream to the connection.
+        :return: Player seated, None if the player couldn't join.
+        """
+        if len(args) < 3 or not args[1].isdigit() or not MIN_PLAYERS <= int(args[1]) <= MAX_PLAYERS:
+            writer.write(f"{Replies.ERROR} size\n".encode())
+            return None
+        name, size, player_name = args[0], int(args[1]), args[2].strip()
+        if len(player_name.split()) != 1:
+            # Fields are space separated, a name with spaces would break the PLAYER reply
+            writer.write(f"{Replies.ERROR} name\n".encode())
+            return None
+        table = self.__tables.get(name)
+        if table is None:
+            table = self.__tables[name] = Table(name, size, self)
+        if table.full:
+            writer.write(f"{Replies.ERROR} full\n".encode())
+            return None
+        player = RemotePlayer(player_name, writer, table)
+        table.join(player)
+        return player
+
+
+async def serve(host: str = HOST, port: int = PORT, ready: Union[multiprocessing.Queue, None] = None) -> None:
+    """Run the server until it is cancelled.
+
+    :param host: Address to listen on.
+    :param port: Port to listen on, 0 picks a free one.
+    :param ready: Queue receiving the port once the server listens.
+    """
+    server = Server()
+    listener = await asyncio.start_server(server.handle, host, port, backlog=4096)
+    port = listener.sockets[0].getsockname()[1]
+    if ready is not None:
+        ready.put(port)
+    else:
+        print(Strings.listening(host, port))
+    async with listener:
+        await listener.serve_forever()
+
+
+def run_server(host: str, port: int, ready: Union[multiprocessing.Queue, None] = None) -> None:
+    """Run the server in its own event loop, the entry point of the server process in a load test.
+
+    :param host: Address to listen on.
+    :param port: Port to listen on.
+    :param ready: Queue receiving the port once the server listens.
+    """
+    asyncio.run(serve(host, port, ready))
+
+
+async def simulated_player(host: str, port: int, table: str, size: int, name: str, think: float,
+                           latencies: list[float]) -> None:
+    """Play a game as a client, continuing the turn while it has less than 2 shotguns and 5 brains.
+
+    :param host: Server address.
+    :param port: Server port.
+    :param table: Table to join.
+    :param size: Number of players of the table.
+    :param name: Player name.
+    :param think: Mean seconds taken to decide.
+    :param latencies: List receiving the seconds between each decision and the server answer.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"{Commands.JOIN} {table} {size} {name}\n".encode())
+    brains = shotguns = 0
+    sent = None
+    while line := await reader.readline():
+        if sent is not None:
+            latencies.append(time.perf_counter() - sent)
+            sent = None
+        reply, *fields = line.decode().split()
+        match reply:
+            case Replies.HAND:
+                brains, shotguns = int(fields[1]), int(fields[2])
+            case Replies.ASK:
+                await asyncio.sleep(random.uniform(0.5, 1.5) * think)  # Spread the decisions of the tables
+                writer.write(f"{Commands.ROLL if shotguns < 2 and brains < 5 else Commands.STOP}\n".encode())
+                sent = time.perf_counter()
+            case Replies.WIN:
+                break
+    writer.close()
+
+
+async def query_stats(host: str, port: int) -> list[float]:
+    """Ask the server statistics.
+
+    :param host: Server address.
+    :param port: Server port.
+    :return: Open tables, finished games, CPU seconds, steps, median and p99 latency in milliseconds and abandoned
+    games.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"{Commands.STATS}\n".encode())
+    fields = (await reader.readline()).decode().split()[1:]
+    writer.close()
+    return [float(field) for field in fields]
+
+
+async def load_test(host: str, port: int, tables: int, players: int, think: float) -> dict[str, float]:
+    """Play many tables at once with simulated players.
+
+    :param host: Server address.
+    :param port: Server port.
+    :param tables: Number of tables played at once.
+    :param players: Number of players of each table.
+    :param think: Mean seconds each player takes to decide.
+    :return: Dict with the measures of the test.
+    """
+    table_latencies: list[list[float]] = [[] for table in range(tables)]
+    before = await query_stats(host, port)
+    start = time.perf_counter()
+    await asyncio.gather(*(simulated_player(host, port, f"load{table}", players, f"bot{seat}", think,
+                                            table_latencies[table])
+                           for table in range(tables) for seat in range(players)))
+    wall = time.perf_counter() - start
+    after = await query_stats(host, port)
+
+    cpu = after[2] - before[2]
+    table_p50 = [median(latencies) for latencies in table_latencies if latencies]
+    table_p99 = [quantiles(latencies, n=100)[98] if len(latencies) > 1 else latencies[0]
+                 for latencies in table_latencies if latencies]
+    return {
+        "tables": tables,
+        "games": after[1] - before[1],
+        "wall_seconds": wall,
+        "cpu_seconds": cpu,
+        "table_p50_ms": median(table_p50) * 1000,
+        "worst_table_p99_ms": max(table_p99) * 1000,
+        "server_p50_ms": after[4],
+        "server_p99_ms": after[5],
+        # Tables one core keeps up with, playing at the same pace
+        "tables_per_core": tables / (cpu / wall) if cpu else float("inf"),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=Strings.description)
+    parser.add_argument("--host", default=HOST, help=Strings.help_host)
+    parser.add_argument("-p", "--port", type=int, default=PORT, help=Strings.help_port)
+    parser.add_argument("--load-test", action="store_true", help=Strings.help_load_test)
+    parser.add_argument("-t", "--tables", type=int, default=200, help=Strings.help_tables)
+    parser.add_argument("-n", "--players", type=int, default=2, help=Strings.help_players)
+    parser.add_argument("--think", type=float, default=0.05, help=Strings.help_think)
+    args = parser.parse_args()
+
+    if not args.load_test:
+        try:
+            asyncio.run(serve(args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+    else:
+        # The server runs in its own process, so only its CPU time is measured
+        context = multiprocessing.get_context("spawn")
+        server_ready = context.Queue()
+        process = context.Process(target=run_server, args=(args.host, 0, server_ready), daemon=True)
+        process.start()
+        try:
+            results = asyncio.run(load_test(args.host, server_ready.get(), args.tables, args.players, args.think))
+        finally:
+            process.terminate()
+        print(Strings.load_report(results))
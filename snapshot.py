@@ -0,0 +1,137 @@
+"""Compact snapshots of games in progress, so idle games can be kept out of memory and restored on their next input.
+A snapshot holds the game and the turn being played, the random generator isn't saved.
+"""
+
+
+import struct
+from random import Random
+from typing import Union
+
+from engine import GameEngine, TurnEngine, Seat, _GameStates, _TurnStates
+from config import BRAIN, RUN, SHOTGUN, DEFAULT_RULES, Rules
+
+
+VERSION = 2
+
+# States and sides stored by their position
+GAME_STATES = (_GameStates.SETUP, _GameStates.GAME, _GameStates.DRAW, _GameStates.END)
+TURN_STATES = (_TurnStates.GAME, _TurnStates.END, _TurnStates.LOST, _TurnStates.EXIT)
+SIDES = (None, BRAIN, RUN, SHOTGUN)
+
+# Version, game state, round count, highest score and number of players
+GAME = struct.Struct("<BBHHH")
+# Score and name length of a player
+PLAYER = struct.Struct("<HB")
+# Seats and dice counts are stored as unsigned shorts, numbers of winners and colors are known before reading them
+COUNT = struct.Struct("<H")
+# Turn player, state with the deciding flag, BRAIN, RUN and SHOTGUN sides, picked dices, dices to pick,
+# dices picked on the last hand, dices in hand and dices on the table
+TURN = struct.Struct("<HBHHHHHHHH")
+DECIDING = 0x80
+NO_TURN = 0xFFFF
+
+
+def _pack_dice(dices: list, color_index: dict[str, int]) -> bytes:
+    """Pack dices in a byte each, the color in the high bits and the side in the 2 low bits.
+
+    :param dices: Dices to pack.
+    :param color_index: Position of each color.
+    :return: Packed dices.
+    """
+    return bytes(color_index[dice.color] << 2 | SIDES.index(dice.value) for dice in dices)
+
+
+def _pack_counts(counts: list[int]) -> bytes:
+    """Pack a list of numbers as unsigned shorts.
+
+    :param counts: Numbers to pack.
+    :return: Packed numbers.
+    """
+    return struct.pack(f"<{len(counts)}H", *counts)
+
+
+def dump(game: GameEngine, turn: Union[TurnEngine, None] = None) -> bytes:
+    """Save a game, usually while a player decides if they keep playing.
+
+    :param game: Game to save, its players need a name.
+    :param turn: Turn being played, if any.
+    :return: Snapshot of the game.
+    """
+    players = game.players
+    data = bytearray(GAME.pack(VERSION, GAME_STATES.index(game.state), game.round_count, game.highest_score,
+                               len(players)))
+    for player in players:
+        # Cut on a character boundary, so accented names still decode
+        name = player.name.encode()[:255].decode(errors="ignore").encode()
+        data += PLAYER.pack(player.score, len(name))
+        data += name
+    data += _pack_counts([len(game.winners), *(player.index for player in game.winners)])
+    data += _pack_counts(game.pool.counts)
+
+    if turn is None:
+        data += COUNT.pack(NO_TURN)
+        return bytes(data)
+    color_index = {color: index for index, color in enumerate(game.pool.colors)}
+    status = turn.round_status
+    data += TURN.pack(turn.player.index, TURN_STATES.index(turn.state) | DECIDING * turn.deciding, status[BRAIN],
+                      status[RUN], status[SHOTGUN], turn.amount_picked_dices, turn.get_dices_amount,
+                      turn.picked_now, len(turn.hand_dices), len(turn.table_dices))
+    data += _pack_dice(turn.hand_dices, color_index)
+    data += _pack_dice(turn.table_dices, color_index)
+    return bytes(data)
+
+
+def load(data: bytes, players: Union[list, None] = None, rng: Union[Random, None] = None,
+         rules: Rules = DEFAULT_RULES) -> tuple[GameEngine, Union[TurnEngine, None]]:
+    """Restore a saved game, resume it by passing the turn to the game play, or by going on with the turn.
+
+    :param data: Snapshot of the game.
+    :param players: Players in seat order, their score and index are restored. Defaults to seats with the saved
+    names and no strategy.
+    :param rng: Random generator of the restored game, defaults to a new randomly seeded stream.
+    :param rules: Rules the game was played with.
+    :return: Game and the turn being played, if any.
+    """
+    version, state, round_count, highest_score, amount = GAME.unpack_from(data)
+    if version != VERSION:
+        raise ValueError("Not a game snapshot or unsupported version.")
+    offset = GAME.size
+    names = []
+    scores = []
+    for i in range(amount):
+        score, length = PLAYER.unpack_from(data, offset)
+        offset += PLAYER.size
+        names.append(bytes(data[offset:offset + length]).decode())
+        scores.append(score)
+        offset += length
+    if players is None:
+        players = [Seat(None, name) for name in names]
+    for index, (player, score) in enumerate(zip(players, scores)):
+        player.index = index
+        player.score = score
+
+    (amount,) = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    winners = [players[index] for index in struct.unpack_from(f"<{amount}H", data, offset)]
+    offset += amount * COUNT.size
+    colors = len(rules.dices)
+    counts = struct.unpack_from(f"<{colors}H", data, offset)
+    offset += colors * COUNT.size
+
+    game = GameEngine(players, rng, rules)
+    spare = game.restore(GAME_STATES[state], round_count, highest_score, winners, counts)
+    if COUNT.unpack_from(data, offset)[0] == NO_TURN:
+        return game, None
+
+    (index, turn_state, brains, runs, shotguns, picked, get_amount, picked_now, hand,
+     table) = TURN.unpack_from(data, offset)
+    offset += TURN.size
+    dices = []
+    for byte in data[offset:offset + hand + table]:
+        dice = spare[byte >> 2].pop()
+        dice.value = SIDES[byte & 0x3]
+        dices.append(dice)
+    turn = TurnEngine(game, players[index])
+    turn.restore(TURN_STATES[turn_state & ~DECIDING], bool(turn_state & DECIDING), (brains, runs, shotguns),
+                 picked, get_amount, picked_now, dices[:hand], dices[hand:])
+    return game, turn
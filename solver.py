@@ -0,0 +1,305 @@
+"""Optimal stop policy, solved once and saved as a compact binary lookup table.
+Solving requires NumPy, loading and querying the table does not.
+
+The game is solved for the player against the best opponent, both playing optimally to win.
+A decision context is the player score, the opponent score and if the player is the last one to play
+in the round, after which the round ends and the highest score wins or ties go to a draw round.
+"""
+
+
+import struct
+from collections import deque
+from hashlib import blake2b
+from typing import Union
+
+import engine
+from config import DEFAULT_RULES, Rules
+from odds import TurnState, start_state, transitions, turn_state
+
+
+# Default lookup table file
+POLICY_FILE = "policy.bin"
+
+# Binary table layout
+MAGIC = b"ZDPT"
+VERSION = 2
+FINGERPRINT_SIZE = 16
+HEADER = struct.Struct(f"<4sBBBBBBBI{FINGERPRINT_SIZE}s")
+
+
+def dices_fingerprint(rules: Rules) -> bytes:
+    """Digest of the dices configuration, so a table is only used with the dice set it was solved for.
+
+    :param rules: Rules holding the dices configuration.
+    :return: Digest of each color, its sides and its amount, in the order of the configuration.
+    """
+    dices = tuple((color, tuple(dice_type.sides), dice_type.amount) for color, dice_type in rules.dices.items())
+    return blake2b(repr(dices).encode(), digest_size=FINGERPRINT_SIZE).digest()
+
+
+def _pack_state(state: TurnState) -> bytes:
+    """Pack a turn state into its lookup key.
+
+    :param state: Turn state.
+    :return: Bytes identifying the state.
+    """
+    return bytes((state.brains, state.shotguns, *state.hand, *state.pool, *state.table))
+
+
+class PolicyTable:
+    """Lookup table of the optimal decision for each context and turn state.
+
+    :param data: Table bytes, as created by the solve function.
+    """
+
+    def __init__(self, data: bytes) -> None:
+        (magic, version, self.__score_limit, self.__shots_limit, self.__dices_per_round,
+         self.__colors, self.__score_cap, self.__brains_cap, states, self.__fingerprint) = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a policy table or unsupported version.")
+        self.__rules: Union[Rules, None] = None  # Last rules checked to match the table
+
+        # Turn states index
+        offset = HEADER.size
+        key_size = 2 + 3 * self.__colors
+        self.__states = {data[offset + index * key_size:offset + (index + 1) * key_size]: index
+                         for index in range(states)}
+        offset += states * key_size
+
+        # Win probability at the start of the turn of each context
+        contexts = 2 * (self.__score_cap + 1) ** 2
+        self.__values = struct.unpack_from(f"<{contexts}f", data, offset)
+        offset += contexts * 4
+
+        # Decision bits, one row of states per context
+        self.__decisions = memoryview(data)[offset:]
+        self.__row_size = states
+
+    @classmethod
+    def load(cls, path: str = POLICY_FILE) -> "PolicyTable":
+        """Load the lookup table from a file.
+
+        :param path: Path of the table file.
+        :return: Policy table.
+        """
+        with open(path, "rb") as file:
+            return cls(file.read())
+
+    def matches(self, rules: Rules) -> bool:
+        """Check if the table was solved for the given rules.
+
+        :param rules: Rules to check.
+        :return: If the table holds decisions for those rules.
+        """
+        return (self.__score_limit, self.__shots_limit, self.__dices_per_round, self.__colors, self.__fingerprint) == \
+               (rules.score_limit, rules.shots_limit, rules.dices_per_round, len(rules.dices), dices_fingerprint(rules))
+
+    def __context(self, score: int, opponent_score: int, last: bool) -> int:
+        """Index of a decision context.
+
+        :param score: Player score.
+        :param opponent_score: Best opponent score.
+        :param last: If the player is the last one to play in the round.
+        :return: Context index.
+        """
+        cap = self.__score_cap
+        return (int(last) * (cap + 1) + min(score, cap)) * (cap + 1) + min(opponent_score, cap)
+
+    def win_probability(self, score: int, opponent_score: int, last: bool) -> float:
+        """Probability of winning the game playing optimally, at the start of the turn.
+
+        :param score: Player score.
+        :param opponent_score: Best opponent score.
+        :param last: If the player is the last one to play in the round.
+        :return: Win probability.
+        """
+        return self.__values[self.__context(score, opponent_score, last)]
+
+    def keep_playing(self, score: int, opponent_score: int, last: bool, state: TurnState) -> bool:
+        """Check if continuing the turn beats stopping.
+
+        :param score: Player score.
+        :param opponent_score: Best opponent score.
+        :param last: If the player is the last one to play in the round.
+        :param state: Turn state after rolling the dices.
+        :return: If the player should continue playing the turn.
+        """
+        index = self.__states.get(_pack_state(state))
+        if index is None:
+            return False  # Beyond the solved turn states, the solver always stops there
+        bit = self.__context(score, opponent_score, last) * self.__row_size + index
+        return bool(self.__decisions[bit >> 3] >> (bit & 7) & 1)
+
+    def __call__(self, turn: "engine.TurnEngine") -> bool:
+        """Decide as a strategy of the rules engine.
+
+        :param turn: Turn being played.
+        :return: If the player should continue playing the turn.
+        """
+        game = turn.game
+        if game.rules is not self.__rules:
+            if not self.matches(game.rules):
+                raise ValueError("The policy table was solved for other rules.")
+            self.__rules = game.rules
+        player = turn.player
+        opponent_score = max((other.score for other in game.players if other is not player), default=0)
+        last = game.round_players[-1] is player
+        return self.keep_playing(player.score, opponent_score, last, turn_state(turn))
+
+
+def _reachable_states(rules: Rules, brains_cap: int) -> list[TurnState]:
+    """Find every turn state reachable from the start of the turn, the turn stops at the brains cap.
+
+    :param rules: Rules to play the turn with.
+    :param brains_cap: Turn brains at which the turn always stops.
+    :return: List of turn states.
+    """
+    start = start_state(rules)
+    states = {start}
+    queue = deque([start])
+    while queue:
+        state = queue.popleft()
+        if state.brains >= brains_cap:
+            continue
+        for next_state, probability in transitions(state, rules):
+            if next_state.shotguns < rules.shots_limit and next_state not in states:
+                states.add(next_state)
+                queue.append(next_state)
+
+    # Transitions always move to a higher level, or back to the same state when every dice is RUN
+    return sorted(states, key=lambda state: (state.brains + state.shotguns, sum(state.hand)), reverse=True)
+
+
+def solve(rules: Rules = DEFAULT_RULES, score_cap: Union[int, None] = None,
+          brains_cap: Union[int, None] = None) -> bytes:
+    """Solve the optimal stop policy by backward induction over the scores.
+    Scores above the score cap count as the cap, and turns stop once they reach the brains cap.
+
+    :param rules: Rules to solve the game for.
+    :param score_cap: Highest score tracked, defaults to the score limit plus 6.
+    :param brains_cap: Turn brains at which the turn always stops, defaults to the score limit.
+    :return: Policy table bytes.
+    """
+    import numpy as np
+
+    score_cap = score_cap or rules.score_limit + 6
+    brains_cap = brains_cap or rules.score_limit
+    states = _reachable_states(rules, brains_cap)
+    index = {state: position for position, state in enumerate(states)}
+    total = len(states)
+    bust = total  # Extra row holding the value of losing the turn
+    start = index[start_state(rules)]
+
+    # Transitions grouped by source state, the self loop of rolling only RUN dices is kept apart
+    sources, targets, weights = [], [], []
+    self_loop = np.zeros(total)
+    expanded = np.zeros(total, dtype=bool)
+    for position, state in enumerate(states):
+        if state.brains >= brains_cap:
+            continue
+        expanded[position] = True
+        for next_state, probability in transitions(state, rules):
+            if next_state == state:
+                self_loop[position] += probability
+                continue
+            sources.append(position)
+            targets.append(bust if next_state.shotguns >= rules.shots_limit else index[next_state])
+            weights.append(probability)
+    sources = np.array(sources)
+    targets = np.array(targets)
+    weights = np.array(weights)
+    brains = np.array([state.brains for state in states])
+
+    # Levels of states sharing brains plus shotguns and hand size, solved from the highest
+    levels = []
+    keys = [(state.brains + state.shotguns, sum(state.hand)) for state in states]
+    first = 0
+    for position in range(1, total + 1):
+        if position == total or keys[position] != keys[first]:
+            mask = (sources >= first) & (sources < position)
+            level_sources = sources[mask]
+            level_expanded = np.flatnonzero(expanded[first:position]) + first
+            starts = np.searchsorted(level_sources, level_expanded)
+            levels.append((first, position, level_expanded, starts, targets[mask], weights[mask]))
+            first = position
+
+    size = score_cap + 1
+    values = np.zeros((2, size, size))
+    decisions = np.zeros((2, size, size, total), dtype=bool)
+    banked = np.arange(size)
+
+    def stop_values(last: int, score: int, opponent: int) -> tuple:
+        """Win probability of banking each score, as constant plus a factor of the partner context value.
+        """
+        constant = np.zeros(size)
+        factor = np.zeros(size)
+        for new_score in range(score, size):
+            if last and max(new_score, opponent) >= rules.score_limit and new_score != opponent:
+                constant[new_score] = float(new_score > opponent)
+            elif new_score == score:
+                constant[new_score] = 1.0
+                factor[new_score] = -1.0
+            elif last:
+                constant[new_score] = 1.0 - values[0, opponent, new_score]
+            else:
+                constant[new_score] = 1.0 - values[1, opponent, new_score]
+        return constant, factor
+
+    # Contexts of the same scores sum depend on each other through turns that bank nothing
+    for scores_sum in range(2 * score_cap, -1, -1):
+        contexts = [(last, score, scores_sum - score) for last in (0, 1)
+                    for score in range(max(0, scores_sum - score_cap), min(score_cap, scores_sum) + 1)]
+        partners = [contexts.index((1 - last, opponent, score)) for last, score, opponent in contexts]
+        columns = len(contexts)
+        stop_constant = np.zeros((columns, size))
+        stop_factor = np.zeros((columns, size))
+        for column, context in enumerate(contexts):
+            stop_constant[column], stop_factor[column] = stop_values(*context)
+        scores = np.array([score for last, score, opponent in contexts])
+        banked_scores = np.minimum(scores[None, :] + brains[:, None], score_cap)
+        state_constant = stop_constant[np.arange(columns)[None, :], banked_scores]
+        state_factor = stop_factor[np.arange(columns)[None, :], banked_scores]
+
+        estimate = np.full(columns, 0.5)
+        previous = None
+        for iteration in range(50):
+            partner_value = estimate[partners]
+            constant = np.vstack([state_constant, stop_constant[np.arange(columns), scores][None, :]])
+            factor = np.vstack([state_factor, stop_factor[np.arange(columns), scores][None, :]])
+            keep = np.zeros((total, columns), dtype=bool)
+            for first, last_position, level_expanded, starts, level_targets, level_weights in levels:
+                if not level_expanded.size:
+                    continue
+                loop = 1.0 - self_loop[level_expanded][:, None]
+                keep_constant = np.add.reduceat(level_weights[:, None] * constant[level_targets], starts) / loop
+                keep_factor = np.add.reduceat(level_weights[:, None] * factor[level_targets], starts) / loop
+                better = (keep_constant + keep_factor * partner_value >
+                          constant[level_expanded] + factor[level_expanded] * partner_value)
+                better[level_expanded == start] = True  # The first hand is always played
+                keep[level_expanded] = better
+                constant[level_expanded] = np.where(better, keep_constant, constant[level_expanded])
+                factor[level_expanded] = np.where(better, keep_factor, factor[level_expanded])
+
+            # Solve each pair of contexts exactly for the current decisions
+            own_constant, own_factor = constant[start], factor[start]
+            estimate = ((own_constant + own_factor * own_constant[partners]) /
+                        (1.0 - own_factor * own_factor[partners]))
+            if previous is not None and np.array_equal(keep, previous):
+                break
+            previous = keep
+
+        for column, (last, score, opponent) in enumerate(contexts):
+            values[last, score, opponent] = estimate[column]
+            decisions[last, score, opponent] = keep[:, column]
+
+    colors = len(rules.dices)
+    header = HEADER.pack(MAGIC, VERSION, rules.score_limit, rules.shots_limit, rules.dices_per_round,
+                         colors, score_cap, brains_cap, total, dices_fingerprint(rules))
+    keys = b"".join(_pack_state(state) for state in states)
+    return (header + keys + values.astype("<f4").tobytes() +
+            np.packbits(decisions.reshape(-1), bitorder="little").tobytes())
+
+
+if __name__ == '__main__':
+    with open(POLICY_FILE, "wb") as policy_file:
+        policy_file.write(solve())
@@ -0,0 +1,333 @@
+"""Streaming statistics of mass simulations, kept in constant memory however many turns are played.
+Values are integers summed with Python integers and counted in fixed buckets, so merging the partial results of
+separate workers or runs gives exactly the same statistics as a single run.
+"""
+
+
+import math
+from typing import Iterable
+
+from gamelog import Events
+
+
+# Metrics of the simulations
+SCORE = "score"          # Brains banked in a turn, nothing when it's lost
+BUSTS = "busts"          # 1 when the turn is lost, 0 otherwise
+HANDS = "hands"          # Hands rolled in a turn
+RECYCLES = "recycles"    # Times BRAIN dices went back to the pool in a turn
+ROUNDS = "rounds"        # Rounds of a game, draw rounds included
+
+# Histogram bins of each metric, one per value from 0, larger values fall in the overflow bin
+BINS = {SCORE: 32, BUSTS: 2, HANDS: 32, RECYCLES: 8, ROUNDS: 64}
+
+# Relative accuracy of the quantile sketches
+ACCURACY = 0.01
+
+
+class Moments:
+    """Count, sum and sum of squares of integer values, the mean and the variance are exact.
+    """
+    __slots__ = ("count", "total", "squares", "maximum")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0
+        self.squares = 0
+        self.maximum = 0
+
+    def add(self, value: int, count: int = 1) -> None:
+        """Add a value.
+
+        :param value: Non-negative integer value.
+        :param count: Times the value happened.
+        """
+        self.count += count
+        self.total += value * count
+        self.squares += value * value * count
+        self.maximum = max(self.maximum, value)
+
+    def merge(self, other: "Moments") -> None:
+        """Add the values of other moments.
+
+        :param other: Moments to add.
+        """
+        self.count += other.count
+        self.total += other.total
+        self.squares += other.squares
+        self.maximum = max(self.maximum, other.maximum)
+
+    @property
+    def mean(self) -> float:
+        """Returns the mean of the values.
+
+        :return: Mean, 0 without values.
+        """
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def variance(self) -> float:
+        """Returns the sample variance of the values.
+
+        :return: Variance, 0 with less than 2 values.
+        """
+        if self.count < 2:
+            return 0.0
+        return (self.count * self.squares - self.total * self.total) / (self.count * (self.count - 1))
+
+
+class Histogram:
+    """Counts of the values in fixed bins of the same width, with an overflow bin.
+
+    :param bins: Number of bins.
+    :param width: Width of each bin, the first bin starts at 0.
+    """
+    __slots__ = ("width", "counts", "overflow")
+
+    def __init__(self, bins: int, width: int = 1) -> None:
+        self.width = width
+        self.counts = [0] * bins
+        self.overflow = 0
+
+    def add(self, value: int, count: int = 1) -> None:
+        """Add a value.
+
+        :param value: Non-negative integer value.
+        :param count: Times the value happened.
+        """
+        index = value // self.width
+        if index < len(self.counts):
+            self.counts[index] += count
+        else:
+            self.overflow += count
+
+    def merge(self, other: "Histogram") -> None:
+        """Add the counts of another histogram with the same bins.
+
+        :param other: Histogram to add.
+        """
+        if other.width != self.width or len(other.counts) != len(self.counts):
+            raise ValueError("Histograms with different bins can't be merged.")
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        self.overflow += other.overflow
+
+
+class QuantileSketch:
+    """Counts of the values in buckets growing geometrically, any quantile is within the relative accuracy.
+    The number of buckets only grows with the logarithm of the largest value.
+
+    :param accuracy: Relative accuracy of the quantiles.
+    """
+    __slots__ = ("accuracy", "__gamma", "__log_gamma", "zeros", "buckets")
+
+    def __init__(self, accuracy: float = ACCURACY) -> None:
+        self.accuracy = accuracy
+        self.__gamma = (1 + accuracy) / (1 - accuracy)
+        self.__log_gamma = math.log(self.__gamma)
+        self.zeros = 0
+        self.buckets: dict[int, int] = {}
+
+    def add(self, value: int, count: int = 1) -> None:
+        """Add a value.
+
+        :param value: Non-negative integer value.
+        :param count: Times the value happened.
+        """
+        if value <= 0:
+            self.zeros += count
+            return
+        key = math.ceil(math.log(value) / self.__log_gamma)
+        self.buckets[key] = self.buckets.get(key, 0) + count
+
+    def merge(self, other: "QuantileSketch") -> None:
+        """Add the counts of another sketch with the same accuracy.
+
+        :param other: Sketch to add.
+        """
+        if other.accuracy != self.accuracy:
+            raise ValueError("Sketches with different accuracies can't be merged.")
+        self.zeros += other.zeros
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile of the values.
+
+        :param q: Quantile, between 0 and 1.
+        :return: Value of the quantile, 0 without values.
+        """
+        rank = q * (self.zeros + sum(self.buckets.values()) - 1)
+        seen = self.zeros
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                return 2 * self.__gamma ** key / (self.__gamma + 1)
+        return 0.0
+
+
+class Metric:
+    """Moments, histogram and quantile sketch of a metric.
+
+    :param bins: Number of bins of the histogram.
+    """
+    __slots__ = ("moments", "histogram", "sketch")
+
+    def __init__(self, bins: int) -> None:
+        self.moments = Moments()
+        self.histogram = Histogram(bins)
+        self.sketch = QuantileSketch()
+
+    def add(self, value: int, count: int = 1) -> None:
+        """Add a value.
+
+        :param value: Non-negative integer value.
+        :param count: Times the value happened.
+        """
+        self.moments.add(value, count)
+        self.histogram.add(value, count)
+        self.sketch.add(value, count)
+
+    def merge(self, other: "Metric") -> None:
+        """Add the values of another metric.
+
+        :param other: Metric to add.
+        """
+        self.moments.merge(other.moments)
+        self.histogram.merge(other.histogram)
+        self.sketch.merge(other.sketch)
+
+
+class SimulationStats:
+    """Statistics of the turns and games of a simulation.
+    """
+    __slots__ = ("metrics",)
+
+    def __init__(self) -> None:
+        self.metrics = {name: Metric(bins) for name, bins in BINS.items()}
+
+    @property
+    def turns(self) -> int:
+        """Returns the number of turns played.
+
+        :return: Number of turns.
+        """
+        return self.metrics[SCORE].moments.count
+
+    @property
+    def games(self) -> int:
+        """Returns the number of games played.
+
+        :return: Number of games.
+        """
+        return self.metrics[ROUNDS].moments.count
+
+    def add_turn(self, score: int, busted: bool, hands: int, recycles: int) -> None:
+        """Add a turn.
+
+        :param score: Brains banked in the turn.
+        :param busted: If the turn was lost.
+        :param hands: Hands rolled in the turn.
+        :param recycles: Times BRAIN dices went back to the pool.
+        """
+        self.metrics[SCORE].add(score)
+        self.metrics[BUSTS].add(int(busted))
+        self.metrics[HANDS].add(hands)
+        self.metrics[RECYCLES].add(recycles)
+
+    def add_game(self, rounds: int) -> None:
+        """Add a game.
+
+        :param rounds: Rounds of the game.
+        """
+        self.metrics[ROUNDS].add(rounds)
+
+    def add_counts(self, name: str, values: Iterable[int], counts: Iterable[int]) -> None:
+        """Add values already counted, such as the unique values of a batch of turns.
+
+        :param name: Name of the metric.
+        :param values: Values.
+        :param counts: Times each value happened.
+        """
+        metric = self.metrics[name]
+        for value, count in zip(values, counts):
+            metric.add(value, count)
+
+    def merge(self, other: "SimulationStats") -> None:
+        """Add the statistics of another worker or run.
+
+        :param other: Statistics to add.
+        """
+        for name, metric in other.metrics.items():
+            self.metrics[name].merge(metric)
+
+    def summary(self) -> list[tuple[str, int, float, float, float, float, float, int]]:
+        """Summarize each metric with values.
+
+        :return: Name, count, mean, standard deviation, median, 90th and 99th percentiles and maximum of each metric.
+        """
+        rows = []
+        for name, metric in self.metrics.items():
+            moments, sketch = metric.moments, metric.sketch
+            if moments.count:
+                rows.append((name, moments.count, moments.mean, math.sqrt(moments.variance), sketch.quantile(0.5),
+                             sketch.quantile(0.9), sketch.quantile(0.99), moments.maximum))
+        return rows
+
+
+class StatsRecorder:
+    """Recorder of the rules engine feeding the statistics of every game it's passed to, in place of a game log
+    recorder.
+
+    :param stats: Statistics to feed.
+    """
+    __slots__ = ("stats", "__scores", "__player", "__hands", "__recycles", "__rounds")
+
+    def __init__(self, stats: SimulationStats) -> None:
+        self.stats = stats
+        self.__scores: list[int] = []
+        self.__player = 0
+        self.__hands = 0
+        self.__recycles = 0
+        self.__rounds = 0
+
+    def record(self, event: int, payload: int = 0) -> None:
+        """Follow an event of the game.
+
+        :param event: Event type.
+        :param payload: Event payload.
+        """
+        match event:
+            case Events.GAME:
+                self.__scores = [0] * payload
+            case Events.ROUND:
+                self.__rounds = payload
+            case Events.TURN:
+                self.__player = payload
+                self.__hands = 1
+                self.__recycles = 0
+            case Events.DECISION:
+                self.__hands += payload
+            case Events.RECYCLE:
+                self.__recycles += 1
+            case Events.BUST:
+                self.stats.add_turn(0, True, self.__hands, self.__recycles)
+            case Events.SCORE:
+                self.stats.add_turn(payload - self.__scores[self.__player], False, self.__hands, self.__recycles)
+                self.__scores[self.__player] = payload
+
+    def roll(self, color: str, side: str, picked: bool) -> None:
+        """Rolled dices aren't part of the statistics.
+
+        :param color: Dice color.
+        :param side: Rolled side.
+        :param picked: If the dice was picked from the pool in this hand.
+        """
+
+    def end(self, winner: int) -> None:
+        """Count the game once it ends.
+
+        :param winner: Winner index.
+        """
+        self.stats.add_game(self.__rounds)
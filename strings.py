@@ -2,12 +2,17 @@
 """
 
 
+from functools import lru_cache
 from math import floor
+from typing import TYPE_CHECKING
 
+import config
 from style import BOLD, UND, style_text as style
 from config import RED, GREEN, BRAIN, SHOTGUN, SHOTS_LIMIT, DICES, SCORE_LIMIT, DICES_PER_ROUND, RUN,\
-                   TERMINAL_WIDTH, MAX_PLAYERS, MIN_PLAYERS
-import dice
+                   MAX_PLAYERS, MIN_PLAYERS
+
+if TYPE_CHECKING:
+    import dice
 
 # Game name
 GAME_NAME = "Bem vindo ao ZOMBIE DICE!!!"
@@ -21,6 +26,25 @@ class GameStrings:
     ask_num_players = f"Quantas pessoas vão jogar? ({MIN_PLAYERS}, {MAX_PLAYERS}): "
     end_game = "\nPressione ENTER para encerrar..."
     ask_continue = "Jogar mais uma vez? "
+    ask_next_page = "\nVer a próxima página? "
+
+    @staticmethod
+    def ask_num_bots(players: int) -> str:
+        """Ask how many of the players are controlled by the computer.
+
+        :param players: Number of players in the game.
+        :return: String asking the number of computer players.
+        """
+        return f"Quantos desses jogadores serão o computador? (0, {players}): "
+
+    @staticmethod
+    def bot_name(number: int) -> str:
+        """Name of a computer player.
+
+        :param number: Number of the computer player.
+        :return: String of the player name.
+        """
+        return f"Computador {number}"
 
     @staticmethod
     def greet_user() -> str:
@@ -28,9 +52,20 @@ class GameStrings:
 
         :return: String presenting the game and explaining its rules.
         """
-        text = (f"{'=' * TERMINAL_WIDTH}\n\n{' ' * int(floor(TERMINAL_WIDTH - len(GAME_NAME)) / 2)}"
+        return GameStrings.__greet_user(config.TERMINAL_WIDTH, config.USE_STYLES)
+
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def __greet_user(width: int, use_styles: bool) -> str:
+        """Build the game presentation, memoized for each terminal width and styles setting.
+
+        :param width: Terminal width.
+        :param use_styles: If ANSI styles are enabled.
+        :return: String presenting the game and explaining its rules.
+        """
+        text = (f"{'=' * width}\n\n{' ' * int(floor(width - len(GAME_NAME)) / 2)}"
                 f"{style(GAME_NAME, BOLD)}\n\n"
-                f"{'=' * TERMINAL_WIDTH}\n"
+                f"{'=' * width}\n"
                 f"\nO {style('Zombie Dice', BOLD)} é um jogo de dados onde o jogador é um zumbi que precisa comer "
                 f"{style(BRAIN.capitalize(), BOLD)} para vencer!\n\n"
                 f"O jogo possui {style(sum([dice_obj.amount for dice_obj in DICES.values()]), BOLD, UND)} dados, "
@@ -57,23 +92,36 @@ class GameStrings:
             f"Caso 2 ou mais jogadores atinjam uma mesma pontuação igual ou acima da condição de vitória, "
             f"haverá uma rodada de desempate até que sobre apenas 1 jogador com uma pontuação máxima.\n"
         )
-        text += f"\n{'=' * TERMINAL_WIDTH}\n"
+        text += f"\n{'=' * width}\n"
         return text
 
     @staticmethod
-    def display_dices(dices: list["dice.Dice"]) -> str:
+    def display_dices(colors: tuple[str, ...], counts: tuple[int, ...]) -> str:
         """Display all dices available in the dice pool for the player to pick.
 
-        :param dices: List of dices
+        :param colors: Dice colors.
+        :param counts: Amount of dices of each color in the pool.
+        :return: String showing all dices available in the dice pool.
+        """
+        return GameStrings.__display_dices(colors, counts, config.USE_STYLES)
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def __display_dices(colors: tuple[str, ...], counts: tuple[int, ...], use_styles: bool) -> str:
+        """Build the dice pool display, memoized for each pool and styles setting.
+        Dices in the pool have no side, so the amount of each color is enough to show them.
+
+        :param colors: Dice colors.
+        :param counts: Amount of dices of each color in the pool.
+        :param use_styles: If ANSI styles are enabled.
         :return: String showing all dices available in the dice pool.
         """
         text = "\nDados disponíveis no pote:"
-        for dice_obj in dices:
-            text += f"\n{INDENT}{dice_obj}"
+        for color, amount in zip(colors, counts):
+            text += f"\n{INDENT}{DiceStrings.display_dice(color, None)}" * amount
 
         text += "\n\nO pote contém os seguintes tipos de dados:"
-        for color in DICES.keys():
-            amount = len([dice for dice_obj in dices if dice_obj.color == color])
+        for color, amount in zip(colors, counts):
             text += f"\n{INDENT}{style(color.capitalize(), BOLD, color) + ':':23} {style(amount, BOLD)}"
 
         return text
@@ -91,17 +139,19 @@ class GameStrings:
         return text
 
     @staticmethod
-    def end_game_players(players: list[str], winner: str) -> str:
-
-        """Show all players final score and congratulates the winner.
+    def end_game_players(players: list[tuple[int, str]], winner: str, page: int = 1, pages: int = 1) -> str:
+        """Show a page of the players final score ranking and congratulates the winner.
 
-        :param players: List of all the players of the game.
+        :param players: List of position and player of the page.
         :param winner: Player winner of the game.
-        :return: String showing all players final score and congratulating the winner.
+        :param page: Number of the page.
+        :param pages: Number of pages of the ranking.
+        :return: String showing the players final score and congratulating the winner.
         """
-        text = "\nPontuação final de cada jogador:\n"
-        for player in players:
-            text += f"{INDENT}{player}\n"
+        text = "\nPontuação final de cada jogador"
+        text += f" (página {page} de {pages}):\n" if pages > 1 else ":\n"
+        for rank, player in players:
+            text += f"{INDENT}{style(f'{rank:>3}º', BOLD)} {player}\n"
         text += f"\nParabéns {style(winner, BOLD, UND)}, você ganhou!!!"
         return text
 
@@ -111,8 +161,25 @@ class TurnStrings:
     """
     ask_throw_dices = "\nPressione ENTER para jogar os dados..."
     prompt_continue = "\nPressione ENTER para continuar..."
-    picked_all_dices = (f"Não há mais dados suficientes no tubo para mais uma rodada. Os dados que deram "
-                        f"{style(BRAIN, BOLD, UND)} serão re-colocados no tubo para continuar o seu turno.")
+
+    @staticmethod
+    def picked_all_dices() -> str:
+        """Inform the player that the BRAIN dices are returned to the pool.
+
+        :return: String informing the dices are returned to the pool.
+        """
+        return TurnStrings.__picked_all_dices(config.USE_STYLES)
+
+    @staticmethod
+    @lru_cache(maxsize=2)
+    def __picked_all_dices(use_styles: bool) -> str:
+        """Build the message of the dices returned to the pool, memoized for each styles setting.
+
+        :param use_styles: If ANSI styles are enabled.
+        :return: String informing the dices are returned to the pool.
+        """
+        return (f"Não há mais dados suficientes no tubo para mais uma rodada. Os dados que deram "
+                f"{style(BRAIN, BOLD, UND)} serão re-colocados no tubo para continuar o seu turno.")
 
     @staticmethod
     def picked_dices(dices: list[str]) -> str:
@@ -161,6 +228,41 @@ class TurnStrings:
                      f"o limite é de {style(SHOTS_LIMIT, BOLD, UND)} tiros!")
         return text
 
+    @staticmethod
+    def thinking(name: str) -> str:
+        """Inform that the computer player is deciding.
+
+        :param name: String of the player name.
+        :return: String informing the computer player is thinking.
+        """
+        return f"\n{style(name, BOLD, UND)} está pensando se continua jogando..."
+
+    @staticmethod
+    def decided(name: str, keep_playing: bool) -> str:
+        """Inform the decision of the computer player.
+
+        :param name: String of the player name.
+        :param keep_playing: If the player continues playing the turn.
+        :return: String informing the decision.
+        """
+        return f"{style(name, BOLD, UND)} decidiu {style('continuar' if keep_playing else 'passar a vez', BOLD)}."
+
+    @staticmethod
+    def advice(bust: float, brains: float, win_continue: float, win_stop: float) -> str:
+        """Show the odds of continuing the turn and the chances of winning with each choice.
+
+        :param bust: Probability of losing the turn on the next hand.
+        :param brains: Expected change of the turn brains on the next hand.
+        :param win_continue: Estimated probability of winning by continuing.
+        :param win_stop: Estimated probability of winning by stopping.
+        :return: String displaying the advice.
+        """
+        best = "continuar" if win_continue > win_stop else "parar"
+        return (f"\nConselho: {style(f'{bust:.0%}', RED, BOLD)} de chance de levar o {SHOTS_LIMIT}º tiro, "
+                f"{style(f'{brains:+.2f}', GREEN, BOLD)} {BRAIN} esperados. Chance de vencer "
+                f"continuando {style(f'{win_continue:.0%}', BOLD)}, parando {style(f'{win_stop:.0%}', BOLD)}"
+                f" - melhor {style(best, BOLD, UND)}.")
+
     @staticmethod
     def enter_turn(round_count: int, index: int, name: str, score: int, current: int) -> str:
         """Announces the start of the player turn.
@@ -172,11 +274,21 @@ class TurnStrings:
         :param current: Number of current turn points.
         :return: String announcing the start of the turn.
         """
-        return (f"\n{'=' * TERMINAL_WIDTH}\n"
+        return (f"\n{TurnStrings.__rule(config.TERMINAL_WIDTH)}\n"
                 f"{style(round_count, BOLD)}º Rodada, turno do {style(index, BOLD, UND)}º jogador - "
                 f"{style(name, BOLD, UND)}.\nA sua pontuação atual é de {style(score, GREEN, BOLD, UND)}"
                 f" pontos, o seu acumulado é {style(score + current, GREEN, BOLD, UND)} pontos;")
 
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def __rule(width: int) -> str:
+        """Horizontal rule across the terminal, memoized for each width.
+
+        :param width: Terminal width.
+        :return: String of the rule.
+        """
+        return "=" * width
+
     @staticmethod
     def round_lost(index: int, name: str, shots: int) -> str:
         """Inform the player about the loss of the turn.
@@ -236,11 +348,295 @@ class DiceStrings:
         :param value: String of the dice rolled side.
         :return: String displaying relevant info about the dice.
         """
+        return DiceStrings.__display_dice(color, value, config.USE_STYLES)
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def __display_dice(color: str, value: str, use_styles: bool) -> str:
+        """Build the dice display, memoized for each color, side and styles setting.
+
+        :param color: String of the dice color.
+        :param value: String of the dice rolled side.
+        :param use_styles: If ANSI styles are enabled.
+        :return: String displaying relevant info about the dice.
+        """
         if not value:
             return f"Dado: {style(color.capitalize(), color)}"
         return f"Dado: {style(color.capitalize(), color):20}Lado: {style(value.capitalize(), BOLD)}"
 
 
+class TournamentStrings:
+    """Class to store all the tournament related strings that interface with the user.
+    """
+    description = "Torneio entre estratégias de jogadores automáticos."
+    help_strategies = "Estratégias participantes, por padrão todas exceto a ótima."
+    help_players = "Quantidade de jogadores em cada partida."
+    help_games = "Quantidade de partidas de cada confronto."
+    help_seed = "Semente do torneio."
+    help_workers = "Quantidade de processos, por padrão um por núcleo."
+    help_stats = "Mostra as estatísticas dos turnos e das partidas."
+    help_database = "Banco de dados SQLite onde as partidas são salvas."
+
+    @staticmethod
+    def unknown_strategy(name: str, names: list[str]) -> str:
+        """Inform the strategy doesn't exist.
+
+        :param name: Name of the strategy.
+        :param names: Names of the available strategies.
+        :return: String informing the available strategies.
+        """
+        return f"Estratégia desconhecida '{name}', escolha entre: {', '.join(names)}."
+
+    @staticmethod
+    def standings(rows: list[tuple[str, float, float, float, list[float]]]) -> str:
+        """Show the results of each strategy in the tournament.
+
+        :param rows: Name, win rate, mean score, mean game length and win rate by seat of each strategy.
+        :return: String showing the tournament standings.
+        """
+        text = f"\n{'Estratégia':12}{'Vitórias':>10}{'Pontos':>10}{'Rodadas':>10}  Vitórias por assento"
+        for name, win_rate, score, rounds, seats in rows:
+            text += (f"\n{style(f'{name:12}', BOLD)}{win_rate:>10.2%}{score:>10.2f}{rounds:>10.2f}  "
+                     f"{' '.join(f'{seat:.2%}' for seat in seats)}")
+        return text
+
+
+class SweepStrings:
+    """Class to store all the rule variants sweep related strings that interface with the user.
+    """
+    description = "Compara o equilíbrio do jogo com variações das regras."
+    help_score_limit = "Pontuações para vencer a partida."
+    help_shots_limit = "Quantidades de tiros que fazem perder o turno."
+    help_dices_per_round = "Quantidades de dados rolados em cada mão."
+    help_dices = ("Conjunto de dados, pode ser repetido. Cada tipo de dado tem cor, lados pela inicial e quantidade, "
+                  "como 'vermelho:cppttt:3,amarelo:ccpptt:4,verde:cccppt:6'. Por padrão os dados da configuração.")
+    help_strategy = "Estratégia de todos os jogadores."
+    help_players = "Quantidade de jogadores em cada partida."
+    help_games = "Quantidade de partidas de cada variação."
+    help_seed = "Semente das partidas."
+    help_workers = "Quantidade de processos, por padrão um por núcleo."
+    invalid_limits = "Os limites devem ser positivos e as partidas precisam de ao menos 2 jogadores."
+
+    @staticmethod
+    def invalid_dices(definition: str) -> str:
+        """Inform the dice set definition is invalid.
+
+        :param definition: Dice set definition.
+        :return: String informing the expected format.
+        """
+        return (f"Conjunto de dados inválido '{definition}', use cor:lados:quantidade separados por vírgula, "
+                f"com os lados {BRAIN[0]}, {RUN[0]} ou {SHOTGUN[0]}.")
+
+    @staticmethod
+    def not_enough_dices(definition: str) -> str:
+        """Inform the dice set has less dices than a hand.
+
+        :param definition: Dice set definition.
+        :return: String informing there aren't enough dices.
+        """
+        return f"O conjunto de dados '{definition or 'padrão'}' tem menos dados do que uma mão."
+
+    @staticmethod
+    def report(rows: list[tuple[int, int, int, int, float, float, float]], definitions: list[str]) -> str:
+        """Show the balance metrics of each rule variant.
+
+        :param rows: Score limit, shots limit, dices per round, dice set index, first player advantage, mean game
+        length and bust rate of each variant.
+        :param definitions: Definition of each dice set.
+        :return: String showing the sweep report.
+        """
+        text = (f"\n{'Pontos':>7}{'Tiros':>7}{'Dados':>7}{'Conjunto':>10}{'Vantagem do 1º':>16}{'Rodadas':>10}"
+                f"{'Perdidos':>10}")
+        for score_limit, shots_limit, dices_per_round, dice_set, advantage, rounds, busts in rows:
+            text += (f"\n{score_limit:>7}{shots_limit:>7}{dices_per_round:>7}{dice_set:>10}"
+                     f"{style(f'{advantage:>+16.2%}', BOLD)}{rounds:>10.2f}{busts:>10.2%}")
+        text += "\n\nConjuntos de dados:"
+        for index, definition in enumerate(definitions):
+            text += f"\n{INDENT}{index}: {definition or 'padrão'}"
+        return text
+
+
+class StatsStrings:
+    """Class to store all the simulation statistics related strings that interface with the user.
+    """
+    metrics = {
+        "score": "Pontos por turno",
+        "busts": "Turnos perdidos",
+        "hands": "Mãos por turno",
+        "recycles": "Reposições por turno",
+        "rounds": "Rodadas por partida",
+    }
+
+    @staticmethod
+    def summary(rows: list[tuple[str, int, float, float, float, float, float, int]], scores: list[int]) -> str:
+        """Show the statistics of each metric and the histogram of the turn scores.
+
+        :param rows: Name, count, mean, standard deviation, median, 90th and 99th percentiles and maximum of each
+        metric.
+        :param scores: Number of turns with each score.
+        :return: String showing the simulation statistics.
+        """
+        text = (f"\n{'Métrica':22}{'Amostras':>12}{'Média':>9}{'Desvio':>9}{'p50':>7}{'p90':>7}{'p99':>7}"
+                f"{'Máximo':>8}")
+        for name, count, mean, deviation, p50, p90, p99, maximum in rows:
+            text += (f"\n{style(f'{StatsStrings.metrics[name]:22}', BOLD)}{count:>12,}{mean:>9.3f}{deviation:>9.3f}"
+                     f"{p50:>7.0f}{p90:>7.0f}{p99:>7.0f}{maximum:>8}")
+        total = sum(scores)
+        if total:
+            text += "\n\nPontos por turno:"
+            for score, count in enumerate(scores):
+                if count:
+                    text += f"\n{INDENT}{score:>3} {count / total:>7.2%} {'#' * round(count / total * 50)}"
+        return text
+
+
+class ResultsStrings:
+    """Class to store all the saved games related strings that interface with the user.
+    """
+    description = "Consulta as partidas salvas no banco de dados."
+    help_database = "Caminho do banco de dados SQLite."
+    help_name = "Mostra a distribuição das pontuações de um jogador ou estratégia, pode ser repetido."
+    help_longest = "Quantidade de partidas mais longas mostradas."
+
+    @staticmethod
+    def seat_wins(rows: list[tuple[int, int, int]]) -> str:
+        """Show how often each seat wins.
+
+        :param rows: Seat index, games and wins of each seat.
+        :return: String showing the win rate of each seat.
+        """
+        text = f"\n{'Assento':>8}{'Partidas':>12}{'Vitórias':>12}"
+        for seat, games, wins in rows:
+            text += f"\n{seat + 1:>7}º{games:>12}{style(f'{wins / games:>12.2%}', BOLD)}"
+        return text
+
+    @staticmethod
+    def scores(name: str, rows: list[tuple[int, int]]) -> str:
+        """Show the distribution of the final scores of a player.
+
+        :param name: Name of the player or strategy.
+        :param rows: Score and number of games of each score.
+        :return: String showing the distribution.
+        """
+        text = f"\nPontuações finais de {style(name, BOLD, UND)}:"
+        total = sum(games for score, games in rows)
+        for score, games in rows:
+            text += f"\n{INDENT}{score:>3} pontos: {games:>9} {games / total:>8.2%}"
+        return text
+
+    @staticmethod
+    def longest_games(rows: list[tuple[int, int, int, int]]) -> str:
+        """Show the games with the most rounds.
+
+        :param rows: Game id, rounds, draw rounds and players of each game.
+        :return: String showing the longest games.
+        """
+        text = f"\n{'Partida':>10}{'Rodadas':>10}{'Desempates':>12}{'Jogadores':>11}"
+        for game, rounds, draws, players in rows:
+            text += f"\n{game:>10}{style(f'{rounds:>10}', BOLD)}{draws:>12}{players:>11}"
+        return text
+
+
+class ServerStrings:
+    """Class to store all the server related strings that interface with the user.
+    """
+    description = "Servidor de partidas com várias mesas, jogadas pela rede."
+    help_host = "Endereço onde o servidor escuta."
+    help_port = "Porta onde o servidor escuta."
+    help_load_test = "Mede a capacidade do servidor com jogadores simulados."
+    help_tables = "Quantidade de mesas jogadas ao mesmo tempo no teste de carga."
+    help_players = "Quantidade de jogadores em cada mesa no teste de carga."
+    help_think = "Segundos que cada jogador simulado leva para decidir."
+
+    @staticmethod
+    def listening(host: str, port: int) -> str:
+        """Inform where the server is listening.
+
+        :param host: Address of the server.
+        :param port: Port of the server.
+        :return: String informing the server address.
+        """
+        return f"Servidor aguardando jogadores em {style(f'{host}:{port}', BOLD)}"
+
+    @staticmethod
+    def load_report(results: dict[str, float]) -> str:
+        """Show the results of a load test.
+
+        :param results: Dict with the measures of the test.
+        :return: String showing the load test results.
+        """
+        tables_per_core = f"{results['tables_per_core']:>10.0f}"
+        return (f"\nMesas simultâneas:            {results['tables']:>10}"
+                f"\nPartidas concluídas:          {results['games']:>10.0f}"
+                f"\nDuração:                      {results['wall_seconds']:>10.2f} s"
+                f"\nCPU do servidor:              {results['cpu_seconds']:>10.2f} s"
+                f"\nLatência mediana por mesa:    {results['table_p50_ms']:>10.2f} ms"
+                f"\nPior p99 entre as mesas:      {results['worst_table_p99_ms']:>10.2f} ms"
+                f"\nLatência no servidor, p50:    {results['server_p50_ms']:>10.3f} ms"
+                f"\nLatência no servidor, p99:    {results['server_p99_ms']:>10.3f} ms"
+                f"\nMesas por núcleo:             {style(tables_per_core, BOLD)}")
+
+
+class BenchmarkStrings:
+    """Class to store all the benchmark related strings that interface with the user.
+    """
+    description = "Mede o desempenho das partes mais usadas do jogo."
+    help_pattern = "Executa apenas as medições com o texto no nome."
+    help_samples = "Quantidade de amostras de cada medição."
+    help_output = "Arquivo JSON onde os resultados são salvos."
+    help_baseline = "Arquivo JSON com os resultados de referência."
+    help_save_baseline = "Salva os resultados como a nova referência, necessário na primeira execução."
+
+    @staticmethod
+    def results(results: dict[str, dict[str, float]]) -> str:
+        """Show the measures of each benchmark.
+
+        :param results: Dict of benchmark name and its measures.
+        :return: String showing the benchmark results.
+        """
+        text = f"\n{'Medição':32}{'op/s':>14}{'p50 ns':>12}{'p90 ns':>12}{'p99 ns':>12}{'Memória':>12}"
+        for name, measures in results.items():
+            text += (f"\n{name:32}{measures['ops_per_sec']:>14,.0f}{measures['p50_ns']:>12,.0f}"
+                     f"{measures['p90_ns']:>12,.0f}{measures['p99_ns']:>12,.0f}"
+                     f"{measures['peak_memory_bytes']:>12,}")
+        return text
+
+    @staticmethod
+    def comparison(changes: list[tuple[str, float, bool]]) -> str:
+        """Show the change of each benchmark against the baseline.
+
+        :param changes: List of benchmark name, relative change of the median latency and if it is a regression.
+        :return: String showing the comparison.
+        """
+        text = "\nComparação com a referência:"
+        for name, change, regression in changes:
+            line = f"{name:32}{change:>+10.1%}"
+            text += f"\n{style(line, RED, BOLD) if regression else line}"
+        return text
+
+    @staticmethod
+    def no_baseline(path: str) -> str:
+        """Inform that there is no baseline to compare the results with.
+
+        :param path: Path of the baseline file.
+        :return: String asking to save the baseline.
+        """
+        return (f"\nNenhuma referência encontrada em {style(path, BOLD)}. Execute com "
+                f"{style('--save-baseline', BOLD)} para salvar os resultados desta máquina como referência.")
+
+    @staticmethod
+    def over_budget(imports: list[tuple[str, float, float]]) -> str:
+        """Show the imports slower than their startup budget.
+
+        :param imports: List of benchmark name, median startup time and budget, in seconds.
+        :return: String showing the slow imports.
+        """
+        text = "\nInicialização acima do limite:"
+        for name, startup, budget in imports:
+            text += f"\n{style(f'{name:32}{startup * 1000:>10.1f} ms', RED, BOLD)}  (limite {budget * 1000:.0f} ms)"
+        return text
+
+
 class UtilsStrings:
     """Class to store all the utils functions strings that interface with the user.
     """
@@ -1,8 +1,12 @@
 """Style strings in the terminal output.
+Styled texts are memoized, keyed by the styles setting so changing it invalidates them.
 """
 
 
-from config import RED, YELLOW, GREEN, USE_STYLES
+from functools import lru_cache
+
+import config
+from config import RED, YELLOW, GREEN
 
 
 # Style identifiers
@@ -18,6 +22,32 @@ STYLE = {
     BOLD: "\033[1m",
     UND: "\033[4m",
 }
+CLOSING_STYLE = "\033[0m"
+
+
+@lru_cache(maxsize=None)
+def _opening(styles: tuple[str, ...]) -> str:
+    """Join the escape codes of the styles.
+
+    :param styles: Tuple of styles.
+    :return: Escape codes opening the styles.
+    """
+    return "".join(STYLE[style] for style in styles)
+
+
+@lru_cache(maxsize=4096, typed=True)
+def _styled(text: str or int, styles: tuple[str, ...], use_styles: bool) -> str:
+    """Apply styles to text, memoized.
+
+    :param text: Text to style.
+    :param styles: Tuple of styles.
+    :param use_styles: If ANSI styles are enabled.
+    :return: Styled text.
+    """
+    # In case ANSI styles aren't compatible with the terminal
+    if not use_styles:
+        return text
+    return f"{_opening(styles)}{text}{CLOSING_STYLE}"
 
 
 def style_text(text: str or int, *styles: str) -> str:
@@ -27,16 +57,10 @@ def style_text(text: str or int, *styles: str) -> str:
     :param styles: List of styles.
     :return: Styled text.
     """
-    # In case ANSI styles aren't compatible with the terminal
-    if not USE_STYLES:
-        return text
-    output = ""
+    return _styled(text, styles, config.USE_STYLES)
 
-    # Add all styles
-    for style in styles:
-        output += STYLE[style]
 
-    # Add text and reset style
-    closing_style = "\033[0m"
-    output += f"{text}{closing_style}"
-    return output
+def clear_cache() -> None:
+    """Forget every memoized styled text.
+    """
+    _styled.cache_clear()
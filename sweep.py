@@ -0,0 +1,178 @@
+"""Balance sweeps over rule variants, spread across worker processes.
+Each variant is built as its own rules, without changing the settings. Variants sharing a dice set share its dice
+types, so the side tables of the dices are built once for all of them, and each worker builds the rules of a variant
+once, keeping the exact odds cached by the rules between its chunks.
+"""
+
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import product
+from typing import Union
+
+from bots import STRATEGIES
+from config import BRAIN, RUN, SHOTGUN, DICES, SCORE_LIMIT, SHOTS_LIMIT, DICES_PER_ROUND, DiceType, Rules
+from engine import GameEngine, Seat
+from rng import StreamRandom
+from stats import BUSTS, ROUNDS, SimulationStats, StatsRecorder
+from strings import SweepStrings as Strings
+
+
+# Games played by a worker at once
+CHUNK_SIZE = 500
+
+# Sides by their initial in the dice set definitions
+SIDE_INITIALS = {side[0]: side for side in (BRAIN, RUN, SHOTGUN)}
+
+# Score limit, shots limit, dices per round and dice set definition of a variant
+Variant = tuple[int, int, int, str]
+
+
+@dataclass
+class VariantResult:
+    """Accumulated results of a rule variant.
+    """
+    games: int = 0
+    seat_wins: list[int] = field(default_factory=list)
+    stats: SimulationStats = field(default_factory=SimulationStats)
+
+    def merge(self, games: int, seat_wins: list[int], stats: SimulationStats) -> None:
+        """Add the results of a chunk of games.
+
+        :param games: Number of games of the chunk.
+        :param seat_wins: Games won by each seat.
+        :param stats: Statistics of the turns and games of the chunk.
+        """
+        self.games += games
+        if not self.seat_wins:
+            self.seat_wins = [0] * len(seat_wins)
+        for seat, wins in enumerate(seat_wins):
+            self.seat_wins[seat] += wins
+        self.stats.merge(stats)
+
+    @property
+    def first_player_advantage(self) -> float:
+        """Returns how much more the first seat wins than a fair share of the games.
+
+        :return: Win rate of the first seat minus the win rate of a fair game.
+        """
+        return self.seat_wins[0] / self.games - 1 / len(self.seat_wins)
+
+
+@lru_cache(maxsize=None)
+def dice_set(definition: str) -> dict[str, DiceType]:
+    """Build a dice set from its definition, such as "vermelho:cppttt:3,amarelo:ccpptt:4,verde:cccppt:6".
+    Each dice type has a color, its sides by their initial and the amount of dices.
+
+    :param definition: Dice set definition, empty for the dices configuration.
+    :return: Dict of dice types by color.
+    """
+    if not definition:
+        return DICES
+    dices = {}
+    try:
+        for dice_type in definition.split(","):
+            color, sides, amount = (part.strip() for part in dice_type.split(":"))
+            dices[color] = DiceType(tuple(SIDE_INITIALS[initial] for initial in sides.lower()), int(amount))
+    except (KeyError, ValueError):
+        raise ValueError(Strings.invalid_dices(definition)) from None
+    if any(not dice_type.sides or dice_type.amount < 1 for dice_type in dices.values()):
+        raise ValueError(Strings.invalid_dices(definition))
+    return dices
+
+
+@lru_cache(maxsize=None)
+def variant_rules(variant: Variant) -> Rules:
+    """Build the rules of a variant once for each process.
+
+    :param variant: Score limit, shots limit, dices per round and dice set definition.
+    :return: Rules of the variant.
+    """
+    score_limit, shots_limit, dices_per_round, definition = variant
+    return Rules(score_limit, shots_limit, dices_per_round, dice_set(definition))
+
+
+def play_chunk(seed: int, index: int, variant: Variant, strategy: str, players: int, first: int,
+               amount: int) -> tuple[int, int, list[int], SimulationStats]:
+    """Play a chunk of games of a variant, every player following the same strategy.
+
+    :param seed: Sweep seed.
+    :param index: Index of the variant.
+    :param variant: Score limit, shots limit, dices per round and dice set definition.
+    :param strategy: Name of the strategy of the players.
+    :param players: Number of players in each game.
+    :param first: Index of the first game of the chunk.
+    :param amount: Number of games to play.
+    :return: Index of the variant, number of games, games won by each seat and statistics of the chunk.
+    """
+    rules = variant_rules(variant)
+    stats = SimulationStats()
+    recorder = StatsRecorder(stats)
+    seat_wins = [0] * players
+    for game_index in range(first, first + amount):
+        seats = [Seat(STRATEGIES[strategy]) for i in range(players)]
+        game = GameEngine(seats, StreamRandom(seed, index, game_index), rules, recorder)
+        seat_wins[game.play().index] += 1
+    return index, amount, seat_wins, stats
+
+
+def run_sweep(variants: list[Variant], strategy: str = "steady", players: int = 2, games: int = 2000, seed: int = 0,
+              workers: Union[int, None] = None) -> list[VariantResult]:
+    """Play the same number of games with every rule variant.
+
+    :param variants: Score limit, shots limit, dices per round and dice set definition of each variant.
+    :param strategy: Name of the strategy of the players.
+    :param players: Number of players in each game.
+    :param games: Number of games of each variant.
+    :param seed: Sweep seed.
+    :param workers: Number of worker processes, defaults to the number of cores.
+    :return: Results of each variant.
+    """
+    tasks = []
+    for index, variant in enumerate(variants):
+        for first in range(0, games, CHUNK_SIZE):
+            tasks.append((seed, index, variant, strategy, players, first, min(CHUNK_SIZE, games - first)))
+
+    results = [VariantResult() for variant in variants]
+    with ProcessPoolExecutor(workers) as executor:
+        for index, amount, seat_wins, stats in executor.map(play_chunk, *zip(*tasks)):
+            results[index].merge(amount, seat_wins, stats)
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=Strings.description)
+    parser.add_argument("--score-limit", type=int, nargs="+", default=[SCORE_LIMIT], help=Strings.help_score_limit)
+    parser.add_argument("--shots-limit", type=int, nargs="+", default=[SHOTS_LIMIT], help=Strings.help_shots_limit)
+    parser.add_argument("--dices-per-round", type=int, nargs="+", default=[DICES_PER_ROUND],
+                        help=Strings.help_dices_per_round)
+    parser.add_argument("--dices", action="append", help=Strings.help_dices)
+    # The optimal policy is solved for the rules of the settings only
+    parser.add_argument("--strategy", default="steady", choices=[name for name in STRATEGIES if name != "optimal"],
+                        help=Strings.help_strategy)
+    parser.add_argument("-p", "--players", type=int, default=2, help=Strings.help_players)
+    parser.add_argument("-g", "--games", type=int, default=2000, help=Strings.help_games)
+    parser.add_argument("-s", "--seed", type=int, default=0, help=Strings.help_seed)
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count(), help=Strings.help_workers)
+    args = parser.parse_args()
+
+    definitions = args.dices or [""]
+    for definition in definitions:
+        try:
+            dices = dice_set(definition)
+        except ValueError as error:
+            parser.error(str(error))
+        if max(args.dices_per_round) > sum(dice_type.amount for dice_type in dices.values()):
+            parser.error(Strings.not_enough_dices(definition))
+    if min(args.score_limit + args.shots_limit + args.dices_per_round) < 1 or args.players < 2:
+        parser.error(Strings.invalid_limits)
+
+    sweep = list(product(args.score_limit, args.shots_limit, args.dices_per_round, definitions))
+    results = run_sweep(sweep, args.strategy, args.players, args.games, args.seed, args.workers)
+    rows = [(score_limit, shots_limit, dices_per_round, definitions.index(definition), result.first_player_advantage,
+             result.stats.metrics[ROUNDS].moments.mean, result.stats.metrics[BUSTS].moments.mean)
+            for (score_limit, shots_limit, dices_per_round, definition), result in zip(sweep, results)]
+    print(Strings.report(rows, definitions))
@@ -0,0 +1,79 @@
+import time
+from random import Random
+
+import pytest
+
+import advisor
+import snapshot
+from config import BRAIN
+from engine import GameEngine, Seat, TurnEngine
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    advisor._cache.clear()
+    yield
+    advisor._cache.clear()
+
+
+def deciding_turn(seed, scores=(0, 0), last=False):
+    """First decision of a turn with some brains, by the first or the last player of the round."""
+    while True:
+        game = GameEngine([Seat(None, "a"), Seat(None, "b")], Random(seed))
+        game.seat_players()
+        players = game.start_round()
+        for player, score in zip(game.players, scores):
+            player.score = score
+        turn = TurnEngine(game, players[-1] if last else players[0])
+        turn.get_dices()
+        turn.roll_dices()
+        if turn.deciding and turn.round_status[BRAIN]:
+            return turn
+        seed += 1
+
+
+def test_same_state_cached():
+    turn = deciding_turn(0)
+    advice = advisor.advise(turn)
+    assert 0 < advice.bust < 1
+    assert advice.rollouts >= 2
+    assert len(advisor._cache) == 1
+
+    # The same position restored in another game is found again
+    game, restored = snapshot.load(snapshot.dump(turn.game, turn), [Seat(None, "c"), Seat(None, "d")], Random(1))
+    assert advisor.canonical_state(restored) == advisor.canonical_state(turn)
+    assert advisor.advise(restored) is advice
+    assert len(advisor._cache) == 1
+
+    other = deciding_turn(0, scores=(5, 0))
+    assert advisor.advise(other) is not advice
+    assert len(advisor._cache) == 2
+
+
+def test_least_recently_used(monkeypatch):
+    monkeypatch.setattr(advisor, "CACHE_SIZE", 2)
+    turns = [deciding_turn(0, scores=(score, 0)) for score in range(3)]
+    first = advisor.advise(turns[0])
+    advisor.advise(turns[1])
+    assert advisor.advise(turns[0]) is first  # Now the most recently used
+    advisor.advise(turns[2])
+    assert list(advisor._cache) == [advisor.canonical_state(turns[0]), advisor.canonical_state(turns[2])]
+
+
+def test_within_budget():
+    turn = deciding_turn(0)
+    start = time.perf_counter()
+    advisor.advise(turn, 0.05)
+    # Past the deadline only the rollouts already started are finished
+    assert time.perf_counter() - start < 0.05 + 0.1
+
+
+def test_stops_once_separated():
+    # Both players at 12 brains, the last player of the round wins by stopping with the brains of the turn
+    turn = deciding_turn(0, scores=(12, 12), last=True)
+    start = time.perf_counter()
+    advice = advisor.advise(turn, 10)
+    assert time.perf_counter() - start < 2
+    assert advice.win_stop == 1
+    assert advice.win_stop > advice.win_continue
+    assert advice.rollouts < 4 * advisor.MIN_ROLLOUTS
@@ -0,0 +1,42 @@
+from math import sqrt
+from random import Random
+from statistics import fmean, pvariance
+
+import numpy as np
+
+from batch import simulate_turns, threshold_rule
+from bots import Threshold
+from config import BRAIN, RUN, SHOTGUN, DiceType, Rules
+from engine import GameEngine, Seat, TurnEngine
+
+
+def engine_turns(strategy, amount, seed, rules=Rules()):
+    """Score and if it busted of turns played by the rules engine, each from a full dice pool."""
+    rng = Random(seed)
+    for i in range(amount):
+        game = GameEngine([Seat(strategy), Seat(strategy)], rng, rules)
+        game.seat_players()
+        game.start_round()
+        player = game.players[0]
+        turn = TurnEngine(game, player)
+        turn.play(strategy)
+        yield player.score, turn.round_status[SHOTGUN] >= rules.shots_limit
+
+
+def test_against_engine():
+    turns = list(engine_turns(Threshold(4, 2), 20000, 0))
+    scores = [score for score, busted in turns]
+    busts = [busted for score, busted in turns]
+    outcomes = simulate_turns(200000, threshold_rule(4, 2), seed=0)
+    for engine_values, batch_values in ((scores, outcomes.score), (busts, outcomes.busted)):
+        error = sqrt(pvariance(engine_values) / len(engine_values) + np.var(batch_values) / len(batch_values))
+        assert abs(fmean(engine_values) - batch_values.mean()) <= 5 * error
+
+
+def test_nothing_left_to_roll():
+    # More shots allowed than dices, a turn always playing on ends once every dice is a shotgun
+    rules = Rules(shots_limit=5, dices={"verde": DiceType((BRAIN, BRAIN, BRAIN, RUN, RUN, SHOTGUN), 3)})
+    outcomes = simulate_turns(10000, lambda brains, shotguns, runs: np.ones(len(brains), dtype=bool), 0, rules)
+    assert not outcomes.busted.any()
+    assert (outcomes.shotguns == 3).all()
+    assert (outcomes.score == outcomes.brains).all()
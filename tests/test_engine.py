@@ -0,0 +1,29 @@
+from random import Random
+
+import pytest
+
+from config import BRAIN, RUN, SHOTGUN, DiceType, Rules
+from engine import GameEngine, Seat
+
+
+SMALL_DICES = {"verde": DiceType((BRAIN, BRAIN, BRAIN, RUN, RUN, SHOTGUN), 3)}
+
+
+@pytest.mark.parametrize("shots_limit", [3, 5])
+def test_small_dice_set_never_runs_out(shots_limit):
+    # Playing on up to the last shot empties the pool, the hand is rolled with the dices left
+    rules = Rules(score_limit=13, shots_limit=shots_limit, dices_per_round=3, dices=SMALL_DICES)
+
+    def daring(turn):
+        return turn.round_status[SHOTGUN] < shots_limit - 1
+
+    for seed in range(200):
+        players = [Seat(daring, "a"), Seat(daring, "b")]
+        winner = GameEngine(players, Random(seed), rules).play()
+        assert winner.score >= rules.score_limit
+
+
+def test_default_rules_play():
+    players = [Seat(lambda turn: turn.round_status[SHOTGUN] < 2, str(seat)) for seat in range(3)]
+    winner = GameEngine(players, Random(0)).play()
+    assert winner.score == max(player.score for player in players) >= 13
@@ -0,0 +1,112 @@
+from math import sqrt
+
+import numpy as np
+
+from config import DEFAULT_RULES
+from env import LOSS_REWARD, ROLL, STOP, WIN_REWARD, VectorEnv, ZombieDiceEnv, observation_size, threshold_actions
+
+
+# Position of the agent score in an observation
+SCORE = 3 + len(DEFAULT_RULES.dices)
+
+
+def trajectory(seed, steps=200):
+    env = ZombieDiceEnv()
+    observation, info = env.reset(seed=seed)
+    observations = [observation]
+    for i in range(steps):
+        observation, reward, terminated, truncated, info = env.step(int(threshold_actions(observation)))
+        observations.append(observation)
+        if terminated:
+            observation, info = env.reset()
+    return np.array(observations)
+
+
+def test_fixed_seed():
+    env = ZombieDiceEnv(players=3)
+    observation, info = env.reset(seed=0)
+    assert observation.shape == (observation_size(3),)
+    assert observation[0] + observation[1] + observation[2] == DEFAULT_RULES.dices_per_round
+    assert info["round"] == 1
+    assert (trajectory(0) == trajectory(0)).all()
+    assert (trajectory(0) != trajectory(1)).any()
+
+    env = VectorEnv(64)
+    first, info = env.reset(seed=0)
+    assert first.shape == (64, observation_size(2))
+    steps = [env.step(threshold_actions(first))[0] for i in range(20)]
+    again, info = env.reset(seed=0)
+    assert (first == again).all()
+    assert all((step == env.step(threshold_actions(again))[0]).all() for step in steps)
+
+
+def test_stop_banks_the_brains():
+    env = ZombieDiceEnv()
+    observation, info = env.reset(seed=0)
+    terminated = False
+    while not terminated:
+        expected = observation[SCORE] + observation[0]
+        observation, reward, terminated, truncated, info = env.step(STOP)
+        # Opponents never change the agent score, the next observation has the brains just banked
+        assert observation[SCORE] == expected
+    assert reward in (WIN_REWARD, LOSS_REWARD)
+
+    env = VectorEnv(256)
+    observations, info = env.reset(seed=0)
+    expected = observations[:, SCORE] + observations[:, 0]
+    observations, rewards, terminated, truncated, info = env.step(np.full(env.amount, STOP))
+    assert (info["final_observation"][:, SCORE] == expected).all()
+    assert (observations[~terminated, SCORE] == expected[~terminated]).all()
+
+
+def test_always_rolling_busts():
+    env = ZombieDiceEnv()
+    observation, info = env.reset(seed=0)
+    terminated = False
+    turns = 1
+    while not terminated:
+        previous = observation
+        observation, reward, terminated, truncated, info = env.step(ROLL)
+        assert observation[SCORE] == 0
+        # Turn brains and shotguns only go down on a new turn, the last one was lost
+        turns += observation[0] < previous[0] or observation[1] < previous[1]
+    assert turns > 1
+    assert reward == LOSS_REWARD
+
+    env = VectorEnv(256)
+    observations, info = env.reset(seed=0)
+    ended = np.zeros(env.amount, dtype=bool)
+    while not ended.all():
+        observations, rewards, terminated, truncated, info = env.step(np.full(env.amount, ROLL))
+        assert (info["final_observation"][:, SCORE] == 0).all()
+        assert (rewards[terminated] == LOSS_REWARD).all()
+        ended |= terminated
+
+
+def test_same_rewards():
+    seed = 0
+    env = ZombieDiceEnv()
+    observation, info = env.reset(seed=seed)
+    single = []
+    while len(single) < 1500:
+        observation, reward, terminated, truncated, info = env.step(int(threshold_actions(observation)))
+        if terminated:
+            single.append(reward)
+            observation, info = env.reset()
+
+    vector_env = VectorEnv(4000)
+    observations, info = vector_env.reset(seed=seed)
+    rewards = np.zeros(vector_env.amount)
+    ended = np.zeros(vector_env.amount, dtype=bool)
+    while not ended.all():
+        observations, step_rewards, terminated, truncated, info = vector_env.step(threshold_actions(observations))
+        first = terminated & ~ended
+        rewards[first] = step_rewards[first]
+        ended |= terminated
+
+    # Both only give the win or loss reward, with the same win rate within 5 standard errors
+    assert set(single) | set(rewards) == {WIN_REWARD, LOSS_REWARD}
+    single_rate = single.count(WIN_REWARD) / len(single)
+    vector_rate = (rewards == WIN_REWARD).mean()
+    error = sqrt(0.25 / len(single) + 0.25 / rewards.size)
+    assert abs(single_rate - vector_rate) < 5 * error
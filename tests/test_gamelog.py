@@ -0,0 +1,59 @@
+from random import Random
+
+from config import SHOTGUN
+from engine import GameEngine, Seat
+from gamelog import Events, GameLog
+
+
+def play(log, seed):
+    players = [Seat(lambda turn: turn.round_status[SHOTGUN] < 2, name) for name in ("ana", "bia")]
+    return GameEngine(players, Random(seed), recorder=log.recorder()).play().index
+
+
+def test_missing_log_is_empty(tmp_path):
+    log = GameLog(str(tmp_path / "games.log"))
+    assert len(log) == 0
+    log.close()
+
+
+def test_round_trip(tmp_path):
+    log = GameLog(str(tmp_path / "games.log"))
+    winners = [play(log, seed) for seed in range(3)]
+    assert len(log) == 3
+
+    # Games appended after the files were mapped are read too
+    winners.append(play(log, 3))
+    assert len(log) == 4
+    for game, winner in enumerate(winners):
+        events = list(log.events(game))
+        assert events[0] == (Events.GAME, 2)
+        assert events[-1] == (Events.END, winner)
+        assert any(True for screen in log.replay(game, ["ana", "bia"]))
+    log.close()
+
+    reopened = GameLog(str(tmp_path / "games.log"))
+    assert len(reopened) == 4
+    assert list(reopened.events(3))[-1] == (Events.END, winners[3])
+    reopened.close()
+
+
+def test_large_payloads(tmp_path):
+    log = GameLog(str(tmp_path / "games.log"))
+    recorder = log.recorder()
+    events = [(Events.GAME, 5000), (Events.ROUND, 1), (Events.TURN, 4500), (Events.DECISION, 0),
+              (Events.SCORE, 70000), (Events.TURN, 4095), (Events.SCORE, 1 << 30)]
+    for event, payload in events:
+        recorder.record(event, payload)
+    recorder.end(4500)
+    assert list(log.events(0)) == [*events, (Events.END, 4500)]
+    log.close()
+
+
+def test_seats_above_4095(tmp_path):
+    log = GameLog(str(tmp_path / "games.log"))
+    players = [Seat(lambda turn: turn.round_status[SHOTGUN] < 2, str(seat)) for seat in range(5000)]
+    winner = GameEngine(players, Random(0), recorder=log.recorder()).play()
+    turns = [payload for event, payload in log.events(0) if event == Events.TURN]
+    assert turns[:5000] == list(range(5000))
+    assert list(log.events(0))[-1] == (Events.END, winner.index)
+    log.close()
@@ -0,0 +1,38 @@
+import time
+
+import mcts
+import odds
+from config import BOT_THINK_TIME
+
+
+def winning_position():
+    """Last player of the round, stopping now wins the game for sure, 2 shotguns risk the 12 brains of the turn."""
+    # A red and a yellow shotgun and a green brain out of the pool, the other brains were returned to it
+    turn = odds.TurnState(12, 2, (0, 0, 0), (2, 3, 5), (0, 0, 1))
+    return mcts.Position(turn, (0, 5), 1, (0, 1))
+
+
+def test_search_stops_on_fixed_seed():
+    visits, wins = mcts.search(winning_position(), 0.1, seed=0)
+    assert sum(visits) > 0
+    assert visits[mcts.STOP] > visits[mcts.CONTINUE]
+    assert wins[mcts.STOP] == visits[mcts.STOP]
+
+
+def test_decide_within_think_time():
+    start = time.perf_counter()
+    keep_playing, visits, wins = mcts.decide(winning_position(), BOT_THINK_TIME / 4, workers=1)
+    assert time.perf_counter() - start < BOT_THINK_TIME
+    assert keep_playing is False
+    assert sum(visits) > 0
+
+
+def test_workers_by_count():
+    mcts.decide(winning_position(), 0.05, workers=1)
+    mcts.decide(winning_position(), 0.05, workers=2)
+    assert sorted(mcts._executors) == [1, 2]
+    mcts.shutdown()
+    assert not mcts._executors
+    # Started again by the next decision
+    assert mcts.decide(winning_position(), 0.05, workers=1)[0] is False
+    mcts.shutdown()
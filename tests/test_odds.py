@@ -0,0 +1,62 @@
+from collections import Counter
+from math import isclose, sqrt
+from random import Random
+
+import odds
+from config import BRAIN, RUN, SHOTGUN, DEFAULT_RULES
+from engine import GameEngine, Seat, TurnEngine, _TurnStates
+
+
+def test_outcomes_are_immutable():
+    state = odds.start_state()
+    distribution = odds.outcomes(state.pool, state.hand, DEFAULT_RULES.dices_per_round)
+    assert isinstance(distribution, tuple)
+    assert isclose(sum(probability for sides, probability in distribution), 1.0)
+    assert all(sum(sides) == DEFAULT_RULES.dices_per_round for sides, probability in distribution)
+    assert odds.outcomes(state.pool, state.hand, DEFAULT_RULES.dices_per_round) is distribution
+
+
+def test_outcomes_pick_no_more_than_the_pool():
+    distribution = odds.outcomes((1, 0, 0), (0, 0, 0), 3)
+    assert all(sum(sides) == 1 for sides, probability in distribution)
+    assert isclose(sum(probability for sides, probability in distribution), 1.0)
+
+
+def sample_hands(seed, hands):
+    """Play the first two hands of many turns with the rules engine."""
+    rng = Random(seed)
+    for i in range(hands):
+        game = GameEngine([Seat(None), Seat(None)], rng)
+        game.seat_players()
+        game.start_round()
+        turn = TurnEngine(game, game.players[0])
+        turn.get_dices()
+        turn.roll_dices()
+        yield turn
+
+
+def test_first_hand_against_engine():
+    samples = 20000
+    counts = Counter()
+    for turn in sample_hands(0, samples):
+        counts[turn.round_status[BRAIN], turn.round_status[RUN], turn.round_status[SHOTGUN]] += 1
+    state = odds.start_state()
+    for sides, probability in odds.outcomes(state.pool, state.hand, DEFAULT_RULES.dices_per_round):
+        deviation = sqrt(samples * probability * (1 - probability))
+        assert abs(counts[sides] - samples * probability) <= 5 * deviation + 1, sides
+
+
+def test_bust_probability_against_engine():
+    # Expected and observed busts on the second hand, summed over every turn still playing
+    expected = variance = busts = 0.0
+    for turn in sample_hands(1, 20000):
+        if turn.state != _TurnStates.GAME:
+            continue
+        probability = odds.bust_probability(odds.turn_state(turn))
+        expected += probability
+        variance += probability * (1 - probability)
+        turn.choose(True)
+        turn.get_dices()
+        turn.roll_dices()
+        busts += turn.state == _TurnStates.LOST
+    assert abs(busts - expected) <= 5 * sqrt(variance)
@@ -0,0 +1,45 @@
+import sqlite3
+from random import Random
+
+from bots import STRATEGIES
+from engine import GameEngine, Seat
+from results import ResultsBatch, ResultsRecorder, ResultsStore
+
+
+def play(batch, seeds):
+    """Play games between two strategies, adding them to the batch."""
+    scores = []
+    for seed in seeds:
+        players = [Seat(STRATEGIES["steady"], "steady"), Seat(STRATEGIES["careful"], "careful")]
+        winner = GameEngine(players, Random(seed), recorder=ResultsRecorder(batch, players)).play()
+        scores.append({player.name: player.score for player in players})
+        assert batch.games[-1][4] == winner.index
+    return scores
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "results.db")
+    store = ResultsStore(path)
+    batch = ResultsBatch()
+    scores = play(batch, range(20))
+    store.add(batch)
+    batch.clear()
+    scores += play(batch, range(20, 30))
+    store.add(batch)
+    assert len(store) == 30
+
+    seat_wins = store.seat_wins()
+    assert sum(games for seat, games, wins in seat_wins) == 60
+    assert sum(wins for seat, games, wins in seat_wins) == 30
+    steady = sorted(game["steady"] for game in scores)
+    assert [score for score, games in store.scores("steady") for i in range(games)] == steady
+    assert len(store.longest_games(5)) == 5
+    store.close()
+
+    # Ids continue after the games already stored, and the banked brains add up to the final scores
+    connection = sqlite3.connect(path)
+    assert connection.execute("SELECT MIN(id), MAX(id) FROM games").fetchone() == (0, 29)
+    banked = connection.execute("SELECT SUM(turns.brains) FROM turns JOIN seats ON turns.game = seats.game AND "
+                                "turns.seat = seats.seat WHERE seats.name = 'steady'").fetchone()[0]
+    assert banked == sum(steady)
+    connection.close()
@@ -0,0 +1,116 @@
+import asyncio
+
+import server
+from server import Commands, Replies, Server
+
+
+async def connect(port):
+    return await asyncio.open_connection("127.0.0.1", port)
+
+
+async def reply(reader):
+    return (await asyncio.wait_for(reader.readline(), 5)).decode().split()
+
+
+async def serve_and(client):
+    server = Server()
+    listener = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+    async with listener:
+        return await client(listener.sockets[0].getsockname()[1])
+
+
+def test_malformed_lines():
+    async def client(port):
+        reader, writer = await connect(port)
+        writer.write(b"\n   \n\xff\xfe\n")
+        replies = [await reply(reader)]
+        writer.write(f"{Commands.JOIN} table 2 two words\n".encode())
+        replies.append(await reply(reader))
+        writer.write(f"{Commands.ROLL}\n".encode())
+        replies.append(await reply(reader))
+        writer.write(f"{Commands.STATS}\n".encode())
+        replies.append(await reply(reader))
+        writer.close()
+        return replies
+
+    errors, name, turn, stats = asyncio.run(serve_and(client))
+    assert errors == [Replies.ERROR, "command"]
+    assert name == [Replies.ERROR, "name"]
+    assert turn == [Replies.ERROR, "turn"]
+    assert stats[0] == Replies.STATS and len(stats) == 8
+
+
+def test_game():
+    async def player(port, name):
+        reader, writer = await connect(port)
+        writer.write(f"{Commands.JOIN} table 2 {name}\n".encode())
+        replies = []
+        while line := await reply(reader):
+            replies.append(line)
+            if line[0] == Replies.ASK:
+                writer.write(f"{Commands.ROLL if len(replies) % 3 else Commands.STOP}\n".encode())
+            elif line[0] == Replies.WIN:
+                break
+        writer.close()
+        return replies
+
+    async def client(port):
+        return await asyncio.gather(player(port, "ana"), player(port, "bia"))
+
+    for replies in asyncio.run(serve_and(client)):
+        players = [fields for fields in replies if fields[0] == Replies.PLAYER]
+        assert sorted(fields[2] for fields in players) == ["ana", "bia"]
+        assert all(len(fields) == 3 for fields in players)
+        scores = {}
+        for fields in replies:
+            if fields[0] == Replies.SCORE:
+                scores[fields[1]] = int(fields[2])
+        assert replies[-1][0] == Replies.WIN
+        assert scores[replies[-1][1]] >= 13
+
+
+async def stats(port):
+    reader, writer = await connect(port)
+    writer.write(f"{Commands.STATS}\n".encode())
+    fields = await reply(reader)
+    writer.close()
+    return fields
+
+
+def test_waiting_player_times_out(monkeypatch):
+    monkeypatch.setattr(server, "IDLE_TIMEOUT", 0.2)
+
+    async def client(port):
+        reader, writer = await connect(port)
+        writer.write(f"{Commands.JOIN} table 3 ana\n".encode())
+        replies = [await reply(reader), await reply(reader)]
+        closed = await asyncio.wait_for(reader.readline(), 5)
+        writer.close()
+        return replies, closed, await stats(port)
+
+    (wait, timeout), closed, fields = asyncio.run(serve_and(client))
+    assert wait == [Replies.WAIT, "1", "3"]
+    assert timeout == [Replies.TIMEOUT]
+    assert closed == b""
+    assert fields[1] == "0"  # The table was removed with its only seat
+
+
+def test_abandoned_game(monkeypatch):
+    monkeypatch.setattr(server, "IDLE_TIMEOUT", 0.2)
+
+    async def player(port, name):
+        reader, writer = await connect(port)
+        writer.write(f"{Commands.JOIN} table 2 {name}\n".encode())
+        while (line := await reply(reader))[0] != Replies.START:
+            pass
+        await asyncio.sleep(0.5)  # Leave after the game started
+        writer.close()
+
+    async def client(port):
+        await asyncio.gather(player(port, "ana"), player(port, "bia"))
+        await asyncio.sleep(0.2)
+        return await stats(port)
+
+    fields = asyncio.run(serve_and(client))
+    # No table left open, and the game counts as abandoned instead of finished
+    assert (fields[1], fields[2], fields[7]) == ("0", "0", "1")
@@ -0,0 +1,62 @@
+from random import Random
+
+import snapshot
+from bots import STRATEGIES
+from engine import GameEngine, Seat
+
+
+def snapshots(seats, seed):
+    """Play a game, saving it with the player deciding at the first decision of each turn."""
+    saved = []
+
+    def strategy(turn):
+        if not saved or saved[-1][1] != turn.player.index:
+            saved.append((snapshot.dump(turn.game, turn), turn.player.index))
+        return STRATEGIES["steady"](turn)
+
+    players = [Seat(strategy, f"p{seat}") for seat in range(seats)]
+    GameEngine(players, Random(seed)).play()
+    return saved
+
+
+def test_round_trip():
+    for data, seat in snapshots(3, 0):
+        names = [player.name for player in snapshot.load(data)[0].players]
+        players = [Seat(STRATEGIES["steady"], name) for name in names]
+        game, turn = snapshot.load(data, players, Random(1))
+        assert turn.deciding
+        assert snapshot.dump(game, turn) == data
+        assert len(game.pool) + len(turn.hand_dices) + len(turn.table_dices) == 13
+        assert game.play(turn) in players
+
+
+def test_many_seats():
+    data = next(data for data, player in snapshots(300, 0) if player > 255)
+    game, turn = snapshot.load(data)
+    assert len(game.players) == 300
+    assert turn.player.index > 255
+    assert sorted(player.name for player in game.players) == sorted(f"p{seat}" for seat in range(300))
+    assert snapshot.dump(game, turn) == data
+
+
+def test_without_turn():
+    players = [Seat(STRATEGIES["steady"], name) for name in ("ana", "bia")]
+    game = GameEngine(players, Random(0))
+    game.seat_players()
+    data = snapshot.dump(game)
+    restored, turn = snapshot.load(data)
+    assert turn is None
+    assert [player.name for player in restored.players] == [player.name for player in players]
+    assert snapshot.dump(restored) == data
+
+
+def test_long_accented_name():
+    name = "João Conceição " * 20  # 360 bytes, the 255th byte is the first half of an accented character
+    players = [Seat(STRATEGIES["steady"], name), Seat(STRATEGIES["steady"], "bia")]
+    game = GameEngine(players, Random(0))
+    game.seat_players()
+    restored, turn = snapshot.load(snapshot.dump(game))
+    names = [player.name for player in restored.players]
+    long_name = max(names, key=len)
+    assert name.startswith(long_name)
+    assert len(long_name.encode()) <= 255
@@ -0,0 +1,30 @@
+from random import Random
+
+import pytest
+
+import solver
+from config import BRAIN, RUN, SHOTGUN, DICES, DiceType, Rules
+from engine import GameEngine, Seat
+
+
+RULES = Rules(score_limit=3)
+
+
+@pytest.fixture(scope="module")
+def table():
+    return solver.PolicyTable(solver.solve(RULES))
+
+
+def test_plays_its_rules(table):
+    assert table.matches(RULES)
+    players = [Seat(table, "a"), Seat(table, "b")]
+    assert GameEngine(players, Random(0), RULES).play() in players
+
+
+def test_refuses_other_dices(table):
+    # Same colors and amounts, the green dices have another side
+    dices = {**DICES, "verde": DiceType((BRAIN, BRAIN, RUN, RUN, SHOTGUN, SHOTGUN), DICES["verde"].amount)}
+    rules = Rules(score_limit=3, dices=dices)
+    assert not table.matches(rules)
+    with pytest.raises(ValueError):
+        GameEngine([Seat(table, "a"), Seat(table, "b")], Random(0), rules).play()
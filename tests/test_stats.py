@@ -0,0 +1,65 @@
+from collections import Counter
+from random import Random
+
+from stats import BINS, BUSTS, HANDS, RECYCLES, ROUNDS, SCORE, QuantileSketch, SimulationStats
+
+
+def sample(amount, seed):
+    """Turns and games with values past the overflow bins of the histograms."""
+    rng = Random(seed)
+    turns = [(rng.randrange(40), rng.random() < 0.3, rng.randrange(1, 40), rng.randrange(10)) for _ in range(amount)]
+    games = [rng.randrange(1, 80) for _ in range(amount // 10)]
+    return turns, games
+
+
+def accumulate(turns, games):
+    stats = SimulationStats()
+    for turn in turns:
+        stats.add_turn(*turn)
+    for rounds in games:
+        stats.add_game(rounds)
+    return stats
+
+
+def assert_equal(merged, single):
+    for name in BINS:
+        a, b = merged.metrics[name], single.metrics[name]
+        assert (a.moments.count, a.moments.total, a.moments.squares, a.moments.maximum) == \
+               (b.moments.count, b.moments.total, b.moments.squares, b.moments.maximum)
+        assert a.moments.mean == b.moments.mean
+        assert a.moments.variance == b.moments.variance
+        assert (a.histogram.counts, a.histogram.overflow) == (b.histogram.counts, b.histogram.overflow)
+        assert (a.sketch.zeros, a.sketch.buckets) == (b.sketch.zeros, b.sketch.buckets)
+
+
+def test_merged_chunks():
+    turns, games = sample(10000, 0)
+    single = accumulate(turns, games)
+    merged = SimulationStats()
+    for start in range(0, len(turns), 1234):
+        merged.merge(accumulate(turns[start:start + 1234], games[start // 10:(start + 1234) // 10]))
+    assert merged.turns == single.turns == 10000
+    assert merged.games == single.games == 1000
+    assert_equal(merged, single)
+    assert merged.summary() == single.summary()
+
+
+def test_counted_values():
+    turns, games = sample(5000, 1)
+    single = accumulate(turns, games)
+    counted = SimulationStats()
+    for index, name in enumerate((SCORE, BUSTS, HANDS, RECYCLES)):
+        counts = Counter(int(turn[index]) for turn in turns)
+        counted.add_counts(name, counts.keys(), counts.values())
+    counts = Counter(games)
+    counted.add_counts(ROUNDS, counts.keys(), counts.values())
+    assert_equal(counted, single)
+
+
+def test_sketch_quantiles():
+    sketch = QuantileSketch()
+    for value in range(1, 10001):
+        sketch.add(value)
+    for q in (0.5, 0.9, 0.99):
+        exact = q * 9999 + 1
+        assert abs(sketch.quantile(q) - exact) <= sketch.accuracy * exact + 1
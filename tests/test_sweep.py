@@ -0,0 +1,15 @@
+import pytest
+
+from sweep import dice_set, run_sweep
+
+
+def test_small_dice_set_sweep():
+    # Fewer dices than a hand and the shots limit need, the pool runs short after the brains are returned
+    results = run_sweep([(13, 5, 3, "verde:cccppt:3")], "daring", games=200, workers=1)
+    assert results[0].games == 200
+    assert sum(results[0].seat_wins) == 200
+
+
+def test_invalid_dice_set():
+    with pytest.raises(ValueError):
+        dice_set("verde:cccxpt:3")
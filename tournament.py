@@ -0,0 +1,164 @@
+"""Round-robin tournament between computer strategies, spread across worker processes.
+Each game draws from its own random stream, so results don't depend on the number of workers.
+"""
+
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import combinations
+from typing import Union
+
+from bots import STRATEGIES
+from engine import GameEngine, Seat
+from results import ResultsBatch, ResultsRecorder, ResultsStore
+from rng import StreamRandom
+from stats import SCORE, SimulationStats, StatsRecorder
+from strings import StatsStrings, TournamentStrings as Strings
+
+
+# Games played by a worker at once
+CHUNK_SIZE = 500
+
+
+@dataclass
+class Standing:
+    """Accumulated results of a strategy.
+    """
+    games: int = 0
+    wins: int = 0
+    score: int = 0
+    rounds: int = 0
+    seat_games: list[int] = field(default_factory=list)
+    seat_wins: list[int] = field(default_factory=list)
+
+    def merge(self, other: "Standing") -> None:
+        """Add the results of another standing of the same strategy.
+
+        :param other: Standing to add.
+        """
+        self.games += other.games
+        self.wins += other.wins
+        self.score += other.score
+        self.rounds += other.rounds
+        for seat, (games, wins) in enumerate(zip(other.seat_games, other.seat_wins)):
+            self.count_seat(seat, games, wins)
+
+    def count_seat(self, seat: int, games: int, wins: int) -> None:
+        """Add games played on a seat.
+
+        :param seat: Seat index.
+        :param games: Number of games played on the seat.
+        :param wins: Number of games won on the seat.
+        """
+        while len(self.seat_games) <= seat:
+            self.seat_games.append(0)
+            self.seat_wins.append(0)
+        self.seat_games[seat] += games
+        self.seat_wins[seat] += wins
+
+
+def game_random(seed: int, match: int, game: int) -> StreamRandom:
+    """Random stream of a single game, so any game can be replayed alone.
+
+    :param seed: Tournament seed.
+    :param match: Index of the match.
+    :param game: Index of the game in the match.
+    :return: Random generator of the game.
+    """
+    return StreamRandom(seed, match, game)
+
+
+def play_chunk(seed: int, match: int, names: tuple[str, ...], first: int, amount: int, collect_stats: bool = False,
+               collect_results: bool = False) -> tuple[dict[str, Standing], Union[SimulationStats, None],
+                                                       Union[ResultsBatch, None]]:
+    """Play a chunk of games of a match, following the same flow as the interactive game.
+
+    :param seed: Tournament seed.
+    :param match: Index of the match.
+    :param names: Names of the strategies playing the match.
+    :param first: Index of the first game of the chunk.
+    :param amount: Number of games to play.
+    :param collect_stats: If the statistics of the turns and games are collected.
+    :param collect_results: If the games are gathered to be saved.
+    :return: Standing of each strategy, and the statistics and the games of the chunk if collected.
+    """
+    standings = {name: Standing() for name in names}
+    stats = SimulationStats() if collect_stats else None
+    stats_recorder = recorder = StatsRecorder(stats) if collect_stats else None
+    batch = ResultsBatch() if collect_results else None
+    for game_index in range(first, first + amount):
+        seats = [Seat(STRATEGIES[name], name) for name in names]
+        if collect_results:
+            recorder = ResultsRecorder(batch, seats, stats_recorder)  # Passes the events on to the statistics
+        game = GameEngine(seats, game_random(seed, match, game_index), recorder=recorder)
+        winner = game.play()
+        for seat in seats:
+            standing = standings[seat.name]
+            standing.games += 1
+            standing.wins += seat is winner
+            standing.score += seat.score
+            standing.rounds += game.round_count
+            standing.count_seat(seat.index, 1, seat is winner)
+    return standings, stats, batch
+
+
+def run_tournament(names: list[str], players: int = 2, games: int = 1000, seed: int = 0,
+                   workers: Union[int, None] = None, stats: Union[SimulationStats, None] = None,
+                   store: Union[ResultsStore, None] = None) -> dict[str, Standing]:
+    """Play every combination of strategies against each other.
+
+    :param names: Names of the strategies.
+    :param players: Number of players in each game.
+    :param games: Number of games of each match.
+    :param seed: Tournament seed.
+    :param workers: Number of worker processes, defaults to the number of cores.
+    :param stats: Statistics the turns and games of every worker are merged into, if they are collected.
+    :param store: Store the games of every worker are saved to, each chunk at once as it's finished.
+    :return: Standing of each strategy.
+    """
+    tasks = []
+    for match, match_names in enumerate(combinations(names, players)):
+        for first in range(0, games, CHUNK_SIZE):
+            tasks.append((seed, match, match_names, first, min(CHUNK_SIZE, games - first), stats is not None,
+                          store is not None))
+
+    standings = {name: Standing() for name in names}
+    with ProcessPoolExecutor(workers) as executor:
+        for chunk, chunk_stats, batch in executor.map(play_chunk, *zip(*tasks)):
+            for name, standing in chunk.items():
+                standings[name].merge(standing)
+            if chunk_stats:
+                stats.merge(chunk_stats)
+            if batch:
+                store.add(batch)
+    return standings
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=Strings.description)
+    parser.add_argument("strategies", nargs="*", default=[name for name in STRATEGIES if name != "optimal"],
+                        help=Strings.help_strategies)
+    parser.add_argument("-p", "--players", type=int, default=2, help=Strings.help_players)
+    parser.add_argument("-g", "--games", type=int, default=1000, help=Strings.help_games)
+    parser.add_argument("-s", "--seed", type=int, default=0, help=Strings.help_seed)
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count(), help=Strings.help_workers)
+    parser.add_argument("--stats", action="store_true", help=Strings.help_stats)
+    parser.add_argument("--db", help=Strings.help_database)
+    args = parser.parse_args()
+    for strategy in args.strategies:
+        if strategy not in STRATEGIES:
+            parser.error(Strings.unknown_strategy(strategy, list(STRATEGIES)))
+    stats = SimulationStats() if args.stats else None
+    store = ResultsStore(args.db) if args.db else None
+    results = run_tournament(args.strategies, args.players, args.games, args.seed, args.workers, stats, store)
+    if store is not None:
+        store.close()
+    rows = sorted(((name, standing.wins / standing.games, standing.score / standing.games,
+                    standing.rounds / standing.games,
+                    [wins / games if games else 0.0 for games, wins in zip(standing.seat_games, standing.seat_wins)])
+                   for name, standing in results.items()), key=lambda row: row[1], reverse=True)
+    print(Strings.standings(rows))
+    if stats:
+        print(StatsStrings.summary(stats.summary(), stats.metrics[SCORE].histogram.counts))
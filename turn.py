@@ -2,21 +2,18 @@
 """
 
 
-import game
+from typing import TYPE_CHECKING
+
 from player import Player
-from dice import Dice
-from config import BRAIN, RUN, SHOTGUN, SHOTS_LIMIT, DICES_PER_ROUND
+from engine import TurnEngine, _TurnStates
+from config import BRAIN, SHOTGUN, ADVISOR
+import instrument
 from strings import TurnStrings as Strings
+from screen import screen
 from utils import clear_console, stringify
 
-
-class _TurnStates:
-    """Class to store turn states
-    """
-    GAME = "game"
-    END = "end"
-    LOST = "lost"
-    EXIT = "exit"
+if TYPE_CHECKING:
+    import game
 
 
 class Turn:
@@ -32,16 +29,7 @@ class Turn:
     def __init__(self, game_ref: "game.Game", player_ref: Player) -> None:
         self.__game = game_ref
         self.__player = player_ref
-        self.__round_status = {
-            BRAIN: 0,
-            RUN: 0,
-            SHOTGUN: 0
-        }
-        self.__amount_picked_dices = 0
-        self.__hand_dices: list[Dice] = []
-        self.__table_dices: list[Dice] = []
-        self.__get_dices_amount = DICES_PER_ROUND
-        self.__state = _TurnStates.GAME
+        self.__engine = TurnEngine(game_ref.engine, player_ref)
         self.__turn()
 
     def __str__(self) -> str:
@@ -51,16 +39,15 @@ class Turn:
         """
         return Strings.display_turn(self.__player.index + 1,
                                     self.__player.name,
-                                    self.__round_status,
-                                    self.__amount_picked_dices,
+                                    self.__engine.round_status,
+                                    self.__engine.amount_picked_dices,
                                     self.__player.score)
 
     def __turn(self) -> None:
         """Control all the player actions in the turn through a loop using state.
         """
-        self.state = _TurnStates.GAME
         while True:
-            match self.__state:
+            match self.__engine.state:
                 case _TurnStates.GAME:
                     self.__play()  # Play a turn
                 case _TurnStates.END:
@@ -70,107 +57,97 @@ class Turn:
                 case _TurnStates.EXIT:
                     return
 
+    @instrument.phase("turn.play")
     def __play(self) -> None:
         """Play one hand.
         """
         # Inform the player it's their turn
         clear_console()
-        print(Strings.enter_turn(self.__game.round_count,
+        screen.print(Strings.enter_turn(self.__game.round_count,
                                  self.__player.index + 1,
                                  self.__player.name,
                                  self.__player.score,
-                                 self.__round_status[BRAIN]))
+                                 self.__engine.round_status[BRAIN]))
         self.__get_dices()  # Get dices
         self.__roll_dices()  # Roll dices in hand
 
         # Check if player lost the turn
-        if self.__round_status[SHOTGUN] >= SHOTS_LIMIT:
-            self.__state = _TurnStates.LOST
+        if self.__engine.state == _TurnStates.LOST:
             return
 
-        # Calculate how many dices to get from the pool on the next turn
-        self.__get_dices_amount = DICES_PER_ROUND - self.__round_status[RUN]
-        print(self)  # Show player current turn status
+        screen.print(self)  # Show player current turn status
 
         self.__ask_continue()  # Ask if player wants to continue playing the turn
 
-        if len(self.__game.dice_pool) < self.__get_dices_amount:
-            # Not enough dices to continue the player turn
-            self.__continue_playing()
-
+    @instrument.phase("turn.get_dices")
     def __get_dices(self) -> None:
         """Get dices from dice pool and store them in the hand.
         """
         # Skip if player already have sufficient dices in hand to roll
-        if self.__get_dices_amount == 0:
+        if self.__engine.get_dices_amount == 0:
             return
 
-        self.__game.shuffle_dice_pool()  # Shuffle dices before picking
         self.__game.display_dices()  # Show available dices in the pool
-        input(Strings.ask_pick_dices(self.__get_dices_amount))  # Ask player to pick the dices
+        self.__wait(Strings.ask_pick_dices(self.__engine.get_dices_amount))  # Ask player to pick the dices
 
         # Pick and display dices to the player
-        self.__amount_picked_dices += self.__get_dices_amount
-        picked_dices = []
-        for i in range(self.__get_dices_amount):
-            dice = self.__game.take_dice()
-            picked_dices.append(dice)
-        print(Strings.picked_dices(stringify(picked_dices)))
-        self.__hand_dices.extend(picked_dices)
+        picked_dices = self.__engine.get_dices()
+        screen.print(Strings.picked_dices(stringify(picked_dices)))
 
+    @instrument.phase("turn.roll_dices")
     def __roll_dices(self) -> None:
         """Roll dices in hand, randomly choosing a side for each.
         """
-        self.__round_status[RUN] = 0  # Reset previous RUN dices count
-        input(Strings.ask_throw_dices)  # Ask player to roll the dices
+        self.__wait(Strings.ask_throw_dices)  # Ask player to roll the dices
+        self.__engine.roll_dices()
+        screen.print(Strings.rolled_dices(stringify(self.__engine.hand_dices)))
+        self.__wait(Strings.prompt_continue)
 
-        # Roll all dices in hand
-        for dice in self.__hand_dices:
-            dice.roll_dice()
-            self.__round_status[dice.value] += 1  # Save result player score
+    def __wait(self, prompt: str) -> None:
+        """Wait for the player to go on with the turn, computer players go on by themselves.
 
-        print(Strings.rolled_dices(stringify(self.__hand_dices)))
-        input(Strings.prompt_continue)
+        :param prompt: Prompt shown to the player.
+        """
+        if self.__player.human:
+            screen.input(prompt)
 
+    @instrument.phase("turn.ask_continue")
     def __ask_continue(self) -> None:
         """Ask if player wants to continue playing more hands in the current turn.
         """
-        answer = self.__player.ask_continue(self.__get_dices_amount)
-        if answer:
-            self.__clear_hand_dices()  # Clear hand dices for next throw
-        else:
-            self.__state = _TurnStates.END
-
-    def __continue_playing(self) -> None:
-        """Return all BRAIN dices to the pool to keep playing.
-        """
-        print(Strings.picked_all_dices)
-        for dice in self.__table_dices:
-            if dice.value == BRAIN:
-                dice.reset_side()
-                self.__game.return_dice(dice)
-
-    def __clear_hand_dices(self) -> None:
-        """Remove all dices that aren't RUN from the hand, preparing for the next throw.
-        """
-        hand_copy = self.__hand_dices.copy()
-        for dice in hand_copy:
-            if not dice.value == RUN:
-                self.__table_dices.append(dice)
-                self.__hand_dices.remove(dice)
-
+        if not self.__player.human:
+            # Show the hand while the computer player thinks
+            screen.print(Strings.thinking(self.__player.name))
+            screen.flush()
+        elif ADVISOR:
+            import advisor  # Only loaded when the advisor is turned on
+            advice = advisor.advise(self.__engine)
+            screen.print(Strings.advice(advice.bust, advice.brains, advice.win_continue, advice.win_stop))
+        answer = self.__player.ask_continue(self.__engine)
+        if not self.__player.human:
+            screen.print(Strings.decided(self.__player.name, answer))
+        recycled = self.__engine.choose(answer)
+        if recycled:
+            # Not enough dices to continue the player turn, BRAIN dices returned to the pool
+            screen.print(Strings.picked_all_dices())
+        if self.__engine.state == _TurnStates.GAME and (recycled or not self.__player.human):
+            # The next hand clears the screen, wait so the messages can be read
+            screen.input(Strings.prompt_continue)
+
+    @instrument.phase("turn.end_round")
     def __end_round(self) -> None:
         """Finish the turn and update player score.
         """
-        self.__player.score += self.__round_status[BRAIN]
-        self.__state = _TurnStates.EXIT  # Update turn state to exit
-        input(Strings.prompt_continue)
+        self.__engine.end_round()
+        screen.input(Strings.prompt_continue)
 
+    @instrument.phase("turn.lost")
     def __lost(self) -> None:
         """Player looses the score accumulated in the turn.
         Inform the loss and proceed to the next player turn or game round.
         """
-        print(self)
-        print(Strings.round_lost(self.__player.index + 1, self.__player.name, self.__round_status[SHOTGUN]))
-        input(Strings.prompt_continue)
-        self.__state = _TurnStates.EXIT
+        screen.print(self)
+        screen.print(Strings.round_lost(self.__player.index + 1, self.__player.name,
+                                 self.__engine.round_status[SHOTGUN]))
+        screen.input(Strings.prompt_continue)
+        self.__engine.lost()
@@ -2,21 +2,19 @@
 """
 
 
-from os import system
-
+import instrument
 from config import OS
+from screen import screen
 from strings import UtilsStrings as Strings
 
 
 def clear_console() -> None:
-    """Clear console terminal.
+    """Clear console terminal, the next frame is drawn over the current one.
     """
-    command = "clear"
-    if OS in ("nt", "dos"):
-        command = "cls"
-    system(command)
+    screen.clear()
 
 
+@instrument.waiting("utils.char_input")
 def char_input() -> str:
     """Capture and return a single character representing the key pressed.
 
@@ -50,7 +48,7 @@ def int_input(message: str, min_val: int, max_val: int) -> int:
     :return: Validated integer input.
     """
     while True:
-        response = input(message)
+        response = screen.input(message)
         try:
             # Input cannot be empty
             if not response:
@@ -60,7 +58,7 @@ def int_input(message: str, min_val: int, max_val: int) -> int:
             if response > max_val or response < min_val:
                 raise ValueError
         except ValueError:
-            print(Strings.int_warning(min_val, max_val))
+            screen.print(Strings.int_warning(min_val, max_val))
         else:
             return response
 
@@ -72,10 +70,10 @@ def text_input(message: str) -> str:
     :return: Validated string input.
     """
     while True:
-        response = input(message)
+        response = screen.input(message)
         if response:
             return response
-        print(Strings.str_warning)
+        screen.print(Strings.str_warning)
 
 
 def bool_input(message: str) -> bool:
@@ -85,15 +83,16 @@ def bool_input(message: str) -> bool:
     :return: Boolean choice from the user.
     """
     while True:
-        print(message)
+        screen.print(message)
+        screen.flush()
         response = char_input().lower()
-        print()
+        screen.print()
         if response in Strings.truthy:
             return True
         elif response in Strings.falsy:
             return False
         else:
-            print(Strings.bool_warning)
+            screen.print(Strings.bool_warning)
 
 
 def stringify(obj_list: list[object]) -> list[str]: